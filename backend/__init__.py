@@ -1 +1,2 @@
-# package marker
+# package marker; importing it starts the cold-start clock in startup.py
+from . import startup  # noqa: F401
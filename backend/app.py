@@ -1,37 +1,127 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from starlette.concurrency import run_in_threadpool
 
+from . import schemas, startup
+from .batch import parse_fields, resolve
 from .config import settings
-from .services.mitra_llm import generate_mitra_reply
+from .fast_json import FastJSONResponse, FastJSONRoute, dumps
+from .metrics import CONTENT_TYPE, MITRA_REPLIES, REGISTRY, MetricsMiddleware, SlowRequestProfiler, run_in_threadpool
+from .response_cache import CompressionMiddleware, ResponseCache
+from .services.admission import PRIORITY_GUEST, PRIORITY_MEMBER, AdmissionQueue, RateLimiter, Shed
+from .services.llm_pool import CircuitOpenError, LLMUnavailable
+from .services.mitra_cache import ReplyCache, normalize_message
+from .services.mitra_llm import POOL, ReplyExtractor, generate_mitra_reply, stream_mitra_reply
+from .services.mitra_memory import ConversationStore, History
+from .pubsub import user_topic
 from .state import (
+    DEFAULT_USER_ID,
+    HUB,
+    LIKES,
+    RULES,
+    USERS,
     add_achievement,
     add_post,
+    add_transactions,
+    flush_likes,
     get_achievements,
     get_banking,
+    get_banking_summary,
     get_feed,
     get_investor_dashboard,
+    get_investor_history,
     get_manifesto,
     get_mitra_tips,
     get_notifications,
     get_opportunities,
     get_user,
+    like_post,
+    record_funding,
+    register_user,
+    remove_opportunity,
+    rescore_users,
+    resolve_user_id,
+    save_feed_index,
+    search_feed,
+    search_opportunities,
+    section_version,
+    sync_funding,
+    sync_opportunities,
+    upsert_opportunity,
 )
+from .static_assets import AssetBundle, asset_response
+from .transaction_import import detect_format, import_transactions
 
 BASE_DIR = Path(__file__).resolve().parent
 FRONTEND_DIR = BASE_DIR.parent / "frontend"
-ASSETS_DIR = FRONTEND_DIR / "assets"
-INDEX_FILE = FRONTEND_DIR / "index.html"
+# Hashed, precompressed copies of frontend/ built at startup (restart to pick up edits); the
+# compressed variants are cached next to the database.
+bundle = AssetBundle(FRONTEND_DIR, Path(settings.database_path).parent / "asset-cache").build()
+profiler = (
+    SlowRequestProfiler(
+        settings.profile_dir or str(Path(settings.database_path).parent / "profiles"),
+        settings.profile_slow_ms / 1000,
+        settings.profile_interval_ms / 1000,
+    )
+    if settings.profile_slow_ms > 0
+    else None
+)
+startup.mark("app imports and asset bundle")
 
-app = FastAPI(title="MeMetrics SuperApp v5", version="5.2.0")
+async def _flush_likes_forever() -> None:
+    while True:
+        await asyncio.sleep(settings.likes_flush_seconds)
+        try:
+            await run_in_threadpool(flush_likes)
+        except Exception:
+            pass  # store busy or locked; the batch stays pending and is retried on the next tick
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await run_in_threadpool(rescore_users)
+    startup.mark("lifespan: rescore users")
+    await HUB.start()
+    if profiler is not None:
+        profiler.start()
+    flusher = asyncio.create_task(_flush_likes_forever())
+    startup.mark("lifespan: push hub and flusher")
+    if settings.profile_startup:
+        print(startup.report(settings.startup_budget_ms), file=sys.stderr, flush=True)
+    yield
+    flusher.cancel()
+    await run_in_threadpool(flush_likes)
+    await run_in_threadpool(save_feed_index)
+    LIKES.close()
+    await HUB.stop()
+    await POOL.aclose()
+    if profiler is not None:
+        profiler.stop()
+
+
+app = FastAPI(
+    title="MeMetrics SuperApp v5", version="5.2.0", lifespan=lifespan, default_response_class=FastJSONResponse
+)
+# Must be set before the first route is declared.
+app.router.route_class = FastJSONRoute
+response_cache = ResponseCache(section_version)
+reply_cache = ReplyCache(settings.mitra_cache_ttl_seconds, settings.mitra_cache_max_entries)
+admission = AdmissionQueue(settings.llm_max_concurrency, settings.mitra_queue_size, settings.mitra_queue_timeout_seconds)
+rate_limiter = RateLimiter(settings.mitra_rate_per_minute / 60, settings.mitra_rate_burst)
+conversations = ConversationStore(
+    settings.mitra_memory_tokens, settings.mitra_memory_idle_seconds, settings.mitra_memory_max_sessions
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,76 +130,38 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compress_min_bytes)
+# Outermost, so latency and response sizes include compression.
+app.add_middleware(MetricsMiddleware, profiler=profiler)
 
-if ASSETS_DIR.exists():
-    app.mount("/assets", StaticFiles(directory=str(ASSETS_DIR)), name="assets")
 
+@app.api_route("/assets/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def static_asset(path: str, request: Request) -> Response:
+    asset, immutable = bundle.lookup(path)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return asset_response(request, asset, immutable)
 
-TIERS = [
-    (0, 300, "Foundation", "Focus on verifying identity, uploading evidence, and logging consistent progress so your DVI climbs steadily."),
-    (300, 600, "Momentum", "Layer public milestones with proof, request recommendations, and keep your repayment streak clean for higher credit tiers."),
-    (600, 901, "Catalyst", "Expand across regions, publish measurable impact, and activate cross-border sponsors to push into the 800s."),
-]
 
-KEYWORD_HINTS = {
-    "loan": "Draft a repayments plan and share a proof-of-income feed post.",
-    "sponsor": "Send a sponsor-ready update that highlights DVI change + social proof.",
-    "resume": "Export a resume snippet from your achievements and attach metrics.",
-    "visa": "Collect verified ID, financial statements, and language certificates into one folder.",
-    "bank": "Review cashflow, repay micro-loans, and request a Mitra credit boost.",
-}
+rules = RULES
 
 
-def _rule_based_mitra(message: str, user: dict) -> tuple[str, list[str]]:
-    lower = message.lower()
-    dvi = int(user.get("dvi") or 0)
-    region = user.get("region") or "Global"
-    user_id = user.get("user_id") or "explorer"
+def _tier_name(dvi: int) -> str:
+    return rules.rules.tier_for(dvi)[0].name
 
-    tier_label = "Catalyst"
-    guidance = "You are already operating at catalyst tier. Keep mentoring others and documenting your influence."
-    next_cap = None
-    for low, high, name, guidance_text in TIERS:
-        if dvi < high:
-            tier_label = name
-            guidance = guidance_text
-            next_cap = high if high <= 900 else None
-            break
-
-    progress_hint = "Keep stacking weekly proof to unlock more achievements."
-    if next_cap and next_cap > dvi:
-        remaining = max(next_cap - dvi, 0)
-        progress_hint = f"Only {remaining} DVI more to unlock the next achievement slot."
-    elif dvi >= 900:
-        progress_hint = "You are at the top of the scale. Focus on mentorship and global sponsorships."
-
-    reply = (
-        f"Hey {user_id}, your DVI is {dvi} which places you in the {tier_label} band for {region}. "
-        f"{guidance} Focus on measurable outcomes, attach proof, and update your feed so Mitra can advocate for you."
+
+def _rule_based_mitra(message: str, user: dict) -> tuple[str, list[str]]:
+    result = rules.evaluate(
+        message,
+        int(user.get("dvi") or 0),
+        user.get("region") or "Global",
+        user.get("user_id") or "explorer",
     )
+    return result["reply"], result["suggestions"]
 
-    suggestions: List[str] = []
-    for keyword, hint in KEYWORD_HINTS.items():
-        if keyword in lower:
-            suggestions.append(hint)
-    if not suggestions:
-        if tier_label == "Foundation":
-            suggestions.extend([
-                "Complete ID verification and upload proof-of-work clips.",
-                "Log a new milestone with metrics and supporting media.",
-            ])
-        elif tier_label == "Momentum":
-            suggestions.extend([
-                "Post a sponsor-ready update highlighting DVI growth.",
-                "Request a mentor testimonial to boost credibility.",
-            ])
-        else:
-            suggestions.extend([
-                "Share your DVI dashboard with an investor for a funding call.",
-                "Bundle repayments plus community impact into a sponsor brief.",
-            ])
-    suggestions.append(progress_hint)
-    return reply, suggestions[:4]
+
+def current_user_id(x_user_id: Optional[str] = Header(None)) -> str:
+    return resolve_user_id(x_user_id)
 
 
 class LoginRequest(BaseModel):
@@ -117,7 +169,6 @@ class LoginRequest(BaseModel):
 
 
 class PostRequest(BaseModel):
-    user_id: str = Field(..., min_length=2)
     text: str = Field(..., min_length=2, max_length=1600)
 
 
@@ -126,49 +177,158 @@ class AchievementRequest(BaseModel):
     year: int = Field(..., ge=1900, le=2100)
 
 
+class OpportunityRequest(BaseModel):
+    id: str = Field(..., min_length=1, max_length=80)
+    title: str = Field(..., min_length=2, max_length=200)
+    org: str = Field("", max_length=160)
+    type: str = Field("Opportunity", max_length=50)
+    summary: str = Field("", max_length=2000)
+    tags: List[str] = Field(default_factory=list, max_length=20)
+    regions: Optional[List[str]] = None
+    min_dvi: Optional[int] = Field(None, ge=0, le=1000)
+    deadline: Optional[date] = None
+    link: Optional[str] = Field(None, max_length=500)
+
+
+class FundingRequest(BaseModel):
+    fund_id: str = Field(..., min_length=1, max_length=80)
+    amount: float = Field(..., gt=0, le=10_000_000)
+    sponsor: str = Field("", max_length=160)
+
+
 class MitraChatRequest(BaseModel):
     message: str = Field(..., min_length=2, max_length=2000)
 
 
-@app.get("/", response_class=HTMLResponse)
-async def index() -> HTMLResponse:
-    if not INDEX_FILE.exists():
+class RuleEvalItem(BaseModel):
+    message: str = Field(..., min_length=1, max_length=2000)
+    dvi: int = Field(0, ge=0, le=1000)
+    region: str = "Global"
+    lang: Optional[str] = None
+
+
+class RuleEvalRequest(BaseModel):
+    items: List[RuleEvalItem] = Field(..., min_length=1, max_length=10000)
+
+
+@app.api_route("/", methods=["GET", "HEAD"], response_class=HTMLResponse, include_in_schema=False)
+async def index(request: Request) -> Response:
+    if bundle.index is None:
         raise HTTPException(status_code=404, detail="Frontend bundle not found")
-    return FileResponse(INDEX_FILE)
+    return asset_response(request, bundle.index)
 
 
 @app.get("/api/health")
 async def health() -> dict:
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "working_set": USERS.stats(),
+        "llm": POOL.snapshot(),
+        "mitra_cache": reply_cache.stats(),
+        "mitra_admission": {**admission.stats(), "rate_limited": rate_limiter.limited},
+        "mitra_memory": conversations.stats(),
+        "push": HUB.stats(),
+        "likes": LIKES.stats(),
+        "assets": bundle.stats(),
+    }
+
+
+REGISTRY.gauge("memetrics_llm_in_flight", "Upstream LLM calls in progress.", collect=lambda: POOL.in_flight)
+REGISTRY.gauge(
+    "memetrics_llm_breaker_open", "1 while the LLM circuit breaker is open.", collect=lambda: int(POOL.breaker.state == "open")
+)
+REGISTRY.gauge("memetrics_working_set_users", "User partitions held in memory.", collect=lambda: USERS.stats()["users"])
+REGISTRY.gauge("memetrics_working_set_bytes", "Approximate size of the user working set.", collect=lambda: USERS.stats()["bytes"])
+REGISTRY.gauge(
+    "memetrics_mitra_queue", "Mitra LLM admission: calls running and waiting.", ("state",),
+    collect=lambda: {("active",): admission.active, ("waiting",): admission.stats()["waiting"]},
+)
+REGISTRY.gauge(
+    "memetrics_mitra_conversations", "Mitra conversations held in memory.", collect=lambda: conversations.stats()["sessions"]
+)
+REGISTRY.gauge("memetrics_push_subscribers", "Open /api/events streams.", collect=lambda: HUB.stats()["subscribers"])
+REGISTRY.gauge("memetrics_likes_pending", "Like toggles not yet flushed to the store.", collect=lambda: LIKES.stats()["pending"])
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
 
 
-@app.post("/api/auth/login")
+@app.post("/api/auth/login", response_model=schemas.Login)
 async def login(payload: LoginRequest) -> dict:
-    user = get_user().copy()
-    user["name"] = payload.name.strip()
-    user["user_id"] = payload.name.strip().lower().replace(" ", "-") or "guest"
+    user = await run_in_threadpool(register_user, payload.name.strip())
     return {"user": user}
 
 
 @app.get("/api/manifesto")
-async def manifesto() -> dict:
-    return get_manifesto()
+async def manifesto(request: Request) -> Response:
+    return response_cache.respond(request, "manifesto", get_manifesto)
+
+
+@app.get("/api/feed", response_model=schemas.FeedPage)
+async def feed(
+    before: Optional[int] = Query(None, ge=0),
+    limit: int = Query(settings.feed_page_size, ge=1, le=settings.feed_page_max),
+    user_id: str = Depends(current_user_id),
+) -> dict:
+    return _feed_page(before, limit, user_id)
+
+
+def _feed_page(before: Optional[int], limit: int, user_id: str) -> dict:
+    items = get_feed(before, limit, user_id)
+    next_before = items[-1]["id"] if len(items) == limit else None
+    return {"items": items, "next_before": next_before}
+
+
+@app.get("/api/feed/search", response_model=schemas.FeedSearch)
+async def feed_search(
+    q: str = Query("", max_length=200),
+    min_dvi: Optional[int] = Query(None, ge=0),
+    max_dvi: Optional[int] = Query(None, ge=0),
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    author: Optional[str] = Query(None, max_length=100),
+    limit: int = Query(settings.feed_page_size, ge=1, le=settings.feed_page_max),
+    user_id: str = Depends(current_user_id),
+) -> dict:
+    # Off the event loop: the first search builds the index from the store.
+    items = await run_in_threadpool(
+        search_feed, q, min_dvi, max_dvi, since, until, author, limit, user_id, task="feed_search"
+    )
+    return {"items": items, "count": len(items)}
 
 
-@app.get("/api/feed")
-async def feed() -> dict:
-    return {"items": get_feed()}
+@app.post("/api/feed", response_model=schemas.PostCreated)
+async def create_post(payload: PostRequest, user_id: str = Depends(current_user_id)) -> dict:
+    # Store writes wait on SQLite's write lock, so they run off the event loop.
+    post = await run_in_threadpool(add_post, user_id, payload.text)
+    return {"post": post, "ok": True}
 
 
-@app.post("/api/feed")
-async def create_post(payload: PostRequest) -> dict:
-    post = add_post(payload.user_id, payload.text)
-    return {"post": post, "ok": True}
+@app.post("/api/feed/{post_id}/like", response_model=schemas.LikeResult)
+async def like(post_id: int, user_id: str = Depends(current_user_id)) -> dict:
+    result = await run_in_threadpool(like_post, user_id, post_id, True)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return result
+
+
+@app.delete("/api/feed/{post_id}/like", response_model=schemas.LikeResult)
+async def unlike(post_id: int, user_id: str = Depends(current_user_id)) -> dict:
+    result = await run_in_threadpool(like_post, user_id, post_id, False)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return result
 
 
-@app.get("/api/profile")
-async def profile() -> dict:
-    user = get_user()
+@app.get("/api/profile", response_model=schemas.Profile)
+async def profile(user_id: str = Depends(current_user_id)) -> dict:
+    return _profile(user_id)
+
+
+def _profile(user_id: str) -> dict:
+    user = get_user(user_id)
     return {
         "user": {
             "user_id": user.get("user_id"),
@@ -181,44 +341,228 @@ async def profile() -> dict:
             "about": user.get("about"),
             "skills": user.get("skills", []),
         },
-        "achievements": get_achievements(),
-        "notifications": get_notifications(),
+        "achievements": get_achievements(user_id),
+        "notifications": get_notifications(user_id),
     }
 
 
-@app.post("/api/profile/achievements")
-async def profile_achievement(payload: AchievementRequest) -> dict:
-    record = add_achievement(payload.title, payload.year)
+@app.post("/api/profile/achievements", response_model=schemas.AchievementCreated)
+async def profile_achievement(payload: AchievementRequest, user_id: str = Depends(current_user_id)) -> dict:
+    record = await run_in_threadpool(add_achievement, payload.title, payload.year, user_id)
     return {"achievement": record, "ok": True}
 
 
 @app.get("/api/opportunities")
-async def opportunities() -> dict:
-    return {"items": get_opportunities()}
+async def opportunities(request: Request) -> Response:
+    sync_opportunities()
+    return response_cache.respond(request, "opportunities", lambda: {"items": get_opportunities()})
+
+
+@app.get("/api/opportunities/search", response_model=schemas.OpportunitySearch)
+async def opportunities_search(
+    q: str = Query("", max_length=200),
+    type: Optional[str] = Query(None, max_length=50),
+    before: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user_id: str = Depends(current_user_id),
+) -> dict:
+    items = search_opportunities(q, type, before, limit, user_id)
+    return {"items": items, "count": len(items)}
+
+
+@app.post("/api/opportunities", response_model=schemas.OpportunitySaved)
+async def opportunity_upsert(payload: OpportunityRequest) -> dict:
+    record = await run_in_threadpool(upsert_opportunity, payload.model_dump(mode="json", exclude_none=True))
+    return {"opportunity": record, "ok": True}
+
+
+@app.delete("/api/opportunities/{opportunity_id}", response_model=schemas.Ok)
+async def opportunity_remove(opportunity_id: str) -> dict:
+    if not await run_in_threadpool(remove_opportunity, opportunity_id):
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    return {"ok": True}
+
+
+@app.get("/api/banking", response_model=schemas.Banking)
+async def banking(user_id: str = Depends(current_user_id)) -> dict:
+    return get_banking(user_id)
+
+
+@app.get("/api/banking/summary", response_model=schemas.BankingSummary)
+async def banking_summary(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    user_id: str = Depends(current_user_id),
+) -> dict:
+    if start and end and end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    return get_banking_summary(user_id, start, end, bucket)
+
+
+@app.post("/api/banking/import", response_model=schemas.ImportResult)
+async def banking_import(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    user_id: str = Depends(current_user_id),
+) -> dict:
+    fmt = detect_format(request.headers.get("content-type"), format)
+
+    async def write(rows: List[dict]) -> int:
+        return len(await run_in_threadpool(add_transactions, user_id, rows))
+
+    report = await import_transactions(
+        request.stream(), fmt, write, settings.import_batch_size, settings.import_max_rejects_reported
+    )
+    if report["rejected"] and not report["accepted"]:
+        # Nothing in the upload was usable, which a client checking only the status would miss.
+        raise HTTPException(status_code=422, detail=report)
+    return report
 
 
-@app.get("/api/banking")
-async def banking() -> dict:
-    return get_banking()
+@app.get("/api/investor")
+async def investor(request: Request) -> Response:
+    # Other workers' funding events first: they bump the section version the cache checks.
+    sync_funding()
+    return response_cache.respond(request, "investor", get_investor_dashboard)
 
 
-@app.get("/api/investor")
-async def investor() -> dict:
-    return get_investor_dashboard()
+def _epoch(moment: Optional[datetime]) -> Optional[float]:
+    if moment is None:
+        return None
+    return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp()
+
+
+@app.get("/api/investor/history", response_model=schemas.InvestorHistory)
+async def investor_history(
+    resolution: str = Query("day", pattern="^(raw|hour|day)$"),
+    fund: Optional[str] = Query(None),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+) -> dict:
+    if start and end and _epoch(end) < _epoch(start):
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    history = get_investor_history(resolution, fund, _epoch(start), _epoch(end))
+    if history is None:
+        raise HTTPException(status_code=404, detail="Fund not found")
+    return history
+
+
+@app.post("/api/investor/funding", response_model=schemas.FundingEvent)
+async def investor_funding(payload: FundingRequest) -> dict:
+    record = await run_in_threadpool(record_funding, payload.fund_id, payload.amount, payload.sponsor.strip())
+    if record is None:
+        raise HTTPException(status_code=404, detail="Fund not found")
+    return record
 
 
 @app.get("/api/mitra/tips")
-async def mitra_tips() -> dict:
-    return get_mitra_tips()
+async def mitra_tips(request: Request) -> Response:
+    return response_cache.respond(request, "mitra", get_mitra_tips)
+
+
+def _bootstrap_resources(user_id: str) -> dict:
+    # Everything the SPA shows on first paint, keyed as in /api/bootstrap?include=.
+    return {
+        "manifesto": get_manifesto,
+        "profile": lambda: _profile(user_id),
+        "feed": lambda: _feed_page(None, settings.feed_page_size, user_id),
+        "opportunities": lambda: {"items": get_opportunities()},
+        "banking": lambda: get_banking(user_id),
+        "investor": get_investor_dashboard,
+        "investor_history": lambda: get_investor_history("day"),
+        "mitra": get_mitra_tips,
+    }
+
+
+@app.get("/api/bootstrap", response_model=schemas.Bootstrap)
+async def bootstrap(
+    include: Optional[str] = Query(None, max_length=500),
+    fields: str = Query("", max_length=4000),
+    user_id: str = Depends(current_user_id),
+) -> dict:
+    # One round trip for several resources: ?include=profile,feed&fields=profile.user.name,feed.items.text
+    builders = _bootstrap_resources(user_id)
+    names = [name.strip() for name in include.split(",") if name.strip()] if include else list(builders)
+    selected = parse_fields(fields)
+    unknown = sorted({name for name in names if name not in builders} | {name for name in selected if name not in builders})
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown resource(s): {', '.join(unknown)}; expected {', '.join(builders)}"
+        )
+    return await resolve(builders, names, selected)
+
+
+def _mitra_cache_key(message: str, band: str, region: str) -> Tuple[str, str, str]:
+    return normalize_message(message), band, region.casefold()
+
+
+def _llm_failure(exc: Exception) -> Tuple[str, Optional[str]]:
+    if isinstance(exc, Shed):
+        return "shed", None
+    if isinstance(exc, CircuitOpenError):
+        return "circuit_open", None
+    if isinstance(exc, LLMUnavailable):
+        return "error", str(exc)
+    if isinstance(exc, RuntimeError):
+        return "fallback", None
+    return "error", f"{exc.__class__.__name__}: {exc}"
+
+
+def _mitra_admission(request: Request, user_id: str) -> Tuple[bool, int]:
+    # (within the caller's rate limit, queue priority). Anonymous visitors share the demo user,
+    # so they are limited per client address instead.
+    if user_id != DEFAULT_USER_ID:
+        return rate_limiter.allow(f"user:{user_id}"), PRIORITY_MEMBER
+    host = request.client.host if request.client else "unknown"
+    return rate_limiter.allow(f"ip:{host}"), PRIORITY_GUEST
+
+
+def _mitra_history(user_id: str) -> Optional[History]:
+    # Only signed-in members get a conversation: anonymous visitors all share the demo user.
+    return conversations.context(user_id) if user_id != DEFAULT_USER_ID else None
+
+
+def _remember(user_id: str, message: str, reply: str) -> None:
+    if user_id != DEFAULT_USER_ID and reply:
+        conversations.record(user_id, message, reply)
+
+
+async def _admitted_reply(
+    priority: int,
+    message: str,
+    user_id: str,
+    region: str,
+    dvi: int,
+    band: Optional[str] = None,
+    history: Optional[History] = None,
+):
+    async with admission.slot(priority):
+        return await generate_mitra_reply(message, user_id, region, dvi, band=band, history=history)
+
+
+async def _mitra_upstream_reply(
+    message: str, user_id: str, region: str, dvi: int, priority: int, history: Optional[History] = None
+) -> Tuple[str, List[str], str]:
+    # A reply that follows on from earlier turns is specific to this conversation, so it skips the shared cache.
+    if history or not settings.mitra_cache_enabled:
+        reply, suggestions = await _admitted_reply(priority, message, user_id, region, dvi, history=history)
+        return reply, suggestions, "openai"
+    band = _tier_name(dvi)
+    (reply, suggestions), status = await reply_cache.get_or_compute(
+        _mitra_cache_key(message, band, region),
+        lambda: _admitted_reply(priority, message, user_id, region, dvi, band=band),
+    )
+    return reply, list(suggestions), "openai" if status == "miss" else "cache"
 
 
-@app.post("/api/mitra/chat")
-async def mitra_chat(payload: MitraChatRequest) -> dict:
+@app.post("/api/mitra/chat", response_model=schemas.MitraReply)
+async def mitra_chat(request: Request, payload: MitraChatRequest, user_id: str = Depends(current_user_id)) -> dict:
     message = payload.message.strip()
     if not message:
         raise HTTPException(status_code=400, detail="Message cannot be empty")
 
-    user = get_user()
+    user = get_user(user_id)
     dvi = int(user.get("dvi") or 0)
     region = user.get("region", "Global")
     user_id = user.get("user_id") or "explorer"
@@ -229,39 +573,186 @@ async def mitra_chat(payload: MitraChatRequest) -> dict:
     error_detail = None
 
     if settings.openai_api_key:
-        try:
-            reply, suggestions = await run_in_threadpool(
-                generate_mitra_reply,
-                message,
-                user_id,
-                region,
-                dvi,
-            )
-            source = "openai"
-        except RuntimeError:
-            source = "fallback"
-        except Exception as exc:  # pragma: no cover - network path
-            source = "error"
-            error_detail = str(exc)
-            reply = ""
-            suggestions = []
+        allowed, priority = _mitra_admission(request, user_id)
+        if not allowed:
+            source = "rate_limited"
+        else:
+            try:
+                reply, suggestions, source = await _mitra_upstream_reply(
+                    message, user_id, region, dvi, priority, _mitra_history(user_id)
+                )
+            except Exception as exc:
+                source, error_detail = _llm_failure(exc)
 
     if not reply:
         reply, suggestions = _rule_based_mitra(message, user)
 
+    _remember(user_id, message, reply)
+    MITRA_REPLIES.inc(endpoint="chat", source=source)
     payload = {"reply": reply, "suggestions": suggestions, "source": source}
     if error_detail:
         payload["detail"] = error_detail
     return payload
 
 
-@app.get("/{path:path}", response_class=HTMLResponse)
-async def spa_router(path: str) -> HTMLResponse:
+@app.delete("/api/mitra/conversation", response_model=schemas.Ok)
+async def mitra_conversation_clear(user_id: str = Depends(current_user_id)) -> dict:
+    # Starts the next chat without earlier context; a no-op when there was none.
+    conversations.clear(user_id)
+    return {"ok": True}
+
+
+@app.post("/api/dvi/rescore", response_model=schemas.RescoreResult)
+async def dvi_rescore() -> dict:
+    return await run_in_threadpool(rescore_users)
+
+
+@app.post("/api/mitra/rules/evaluate", response_model=schemas.RuleEvalResult)
+async def mitra_rules_evaluate(payload: RuleEvalRequest) -> dict:
+    items = [item.model_dump() for item in payload.items]
+    started = time.perf_counter()
+    results = await run_in_threadpool(rules.evaluate_batch, items)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return {
+        "results": results,
+        "count": len(results),
+        "elapsed_ms": round(elapsed_ms, 3),
+        "rules": rules.stats(),
+    }
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+@app.get("/api/events")
+async def events(request: Request, user: Optional[str] = Query(None), x_user_id: Optional[str] = Header(None)) -> StreamingResponse:
+    # EventSource cannot set headers, so the user may also come as ?user=.
+    user_id = resolve_user_id(user or x_user_id)
+    subscription = HUB.subscribe(["feed", user_topic(user_id)])
+
+    async def stream():
+        try:
+            yield b"retry: 3000\n\n"
+            while not subscription.dropped:
+                event = await subscription.next(settings.push_keepalive_seconds)
+                if event is None:
+                    if await request.is_disconnected():
+                        return
+                    yield b": keepalive\n\n"
+                    continue
+                yield _sse(event["type"], event["data"])
+            # Fell too far behind: the client refetches in full and reconnects.
+            yield _sse("reset", {})
+        finally:
+            HUB.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/mitra/chat/stream")
+async def mitra_chat_stream(
+    request: Request, payload: MitraChatRequest, user_id: str = Depends(current_user_id)
+) -> StreamingResponse:
+    message = payload.message.strip()
+    if not message:
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+
+    user = get_user(user_id)
+    dvi = int(user.get("dvi") or 0)
+    region = user.get("region", "Global")
+    user_id = user.get("user_id") or "explorer"
+    allowed, priority = _mitra_admission(request, user_id) if settings.openai_api_key else (True, PRIORITY_GUEST)
+
+    async def events():
+        # A comment frame first so headers and the first byte leave before the upstream call.
+        yield b": mitra\n\n"
+        reply = ""
+        suggestions: List[str] = []
+        source = "rule"
+        error_detail = None
+        shown = ""  # reply text the client has been sent so far
+
+        if settings.openai_api_key and not allowed:
+            source = "rate_limited"
+        elif settings.openai_api_key:
+            history = _mitra_history(user_id)
+            band = _tier_name(dvi) if settings.mitra_cache_enabled and not history else None
+            key = _mitra_cache_key(message, band, region) if band else None
+            try:
+                cached = None
+                if key is not None:
+                    cached = reply_cache.get(key)
+                    future = reply_cache.inflight(key) if cached is None else None
+                    if future is not None:
+                        cached = await asyncio.shield(future)
+                if cached is not None:
+                    reply, suggestions = cached[0], list(cached[1])
+                    source = "cache"
+                    shown = reply
+                    yield _sse("token", {"text": reply})
+                else:
+                    if key is not None:
+                        reply_cache.lead(key)
+                    extractor = ReplyExtractor()
+                    try:
+                        async with admission.slot(priority):
+                            async for text in stream_mitra_reply(
+                                message, user_id, region, dvi, extractor, band=band, history=history
+                            ):
+                                shown += text
+                                yield _sse("token", {"text": text})
+                        reply, suggestions = extractor.result()
+                    except BaseException as exc:
+                        if key is not None:
+                            reply_cache.settle(key, error=exc)
+                        raise
+                    if key is not None:
+                        reply_cache.settle(key, (reply, suggestions))
+                    source = "openai"
+            except Exception as exc:
+                source, error_detail = _llm_failure(exc)
+
+        if not reply:
+            fallback_reply, fallback_suggestions = _rule_based_mitra(message, user)
+            suggestions = suggestions or fallback_suggestions
+            if shown:
+                # The upstream failed part-way; the client keeps the text it already has, so the
+                # conversation remembers that rather than a fallback it never saw.
+                reply = shown
+            else:
+                yield _sse("token", {"text": fallback_reply})
+                reply = fallback_reply
+
+        _remember(user_id, message, reply)
+        MITRA_REPLIES.inc(endpoint="stream", source=source)
+        final = {"suggestions": suggestions, "source": source}
+        if error_detail:
+            final["detail"] = error_detail
+        yield _sse("suggestions", final)
+        yield _sse("done", {})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.api_route("/{path:path}", methods=["GET", "HEAD"], response_class=HTMLResponse, include_in_schema=False)
+async def spa_router(path: str, request: Request) -> Response:
     if path.startswith("api/"):
         raise HTTPException(status_code=404, detail="Endpoint not found")
     if "." in Path(path).name:
         raise HTTPException(status_code=404, detail="Asset not found")
-    if INDEX_FILE.exists():
-        return FileResponse(INDEX_FILE)
+    if bundle.index is not None:
+        return asset_response(request, bundle.index)
     raise HTTPException(status_code=404, detail="Frontend bundle not found")
 
+
+startup.mark("app routes")
+
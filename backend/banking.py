@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from datetime import date, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+import numpy as np
+
+EPOCH = date(1970, 1, 1)
+BUCKETS = ("day", "week", "month")
+RECENT_TRANSACTIONS = 50
+
+
+def category_of(txn: Dict[str, Any]) -> str:
+    if txn.get("category"):
+        return str(txn["category"])
+    return "Income" if float(txn["amount"]) >= 0 else "Uncategorized"
+
+
+def day_numbers(timestamps: Iterable[str]) -> np.ndarray:
+    # Calendar day of each ISO timestamp (as written, no tz shift) as days since 1970-01-01.
+    return np.array([ts[:10] for ts in timestamps], dtype="datetime64[D]").astype(np.int64)
+
+
+def bucket_index(days: np.ndarray, bucket: str) -> np.ndarray:
+    if bucket == "day":
+        return days
+    if bucket == "week":
+        # 1970-01-01 was a Thursday; shifting by 3 makes weeks start on Monday.
+        return (days + 3) // 7
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return months
+
+
+def bucket_start(index: int, bucket: str) -> str:
+    if bucket == "day":
+        return (EPOCH + timedelta(days=int(index))).isoformat()
+    if bucket == "week":
+        return (EPOCH + timedelta(days=int(index) * 7 - 3)).isoformat()
+    return str(np.datetime64(int(index), "M").astype("datetime64[D]"))
+
+
+# Dense per-bucket columns (income, spend, count) over a contiguous index range that
+# grows in either direction as transactions outside it arrive.
+class Rollup:
+    def __init__(self, bucket: str) -> None:
+        self.bucket = bucket
+        self.base = 0
+        self.income = np.zeros(0, dtype=np.float64)
+        self.spend = np.zeros(0, dtype=np.float64)
+        self.count = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.income)
+
+    @property
+    def nbytes(self) -> int:
+        return self.income.nbytes + self.spend.nbytes + self.count.nbytes
+
+    def _cover(self, lo: int, hi: int) -> None:
+        if len(self.income) == 0:
+            self.base = lo
+            size = max(hi - lo + 1, 32)
+            self.income = np.zeros(size, dtype=np.float64)
+            self.spend = np.zeros(size, dtype=np.float64)
+            self.count = np.zeros(size, dtype=np.int32)
+            return
+        front = max(0, self.base - lo)
+        back = max(0, hi - (self.base + len(self.income) - 1))
+        if not front and not back:
+            return
+        # Grow geometrically so appending in time order stays amortized O(1).
+        if back:
+            back = max(back, len(self.income))
+        if front:
+            front = max(front, len(self.income) // 2)
+        self.income = np.pad(self.income, (front, back))
+        self.spend = np.pad(self.spend, (front, back))
+        self.count = np.pad(self.count, (front, back))
+        self.base -= front
+
+    def add(self, indices: np.ndarray, amounts: np.ndarray) -> None:
+        self.add_totals(
+            indices, np.where(amounts > 0, amounts, 0.0), np.where(amounts < 0, -amounts, 0.0), np.ones(len(indices))
+        )
+
+    def add_totals(self, indices: np.ndarray, income: np.ndarray, spend: np.ndarray, count: np.ndarray) -> None:
+        if len(indices) == 0:
+            return
+        self._cover(int(indices.min()), int(indices.max()))
+        offsets = indices - self.base
+        np.add.at(self.income, offsets, income)
+        np.add.at(self.spend, offsets, spend)
+        np.add.at(self.count, offsets, count.astype(np.int32))
+
+    def window(self, lo: Optional[int], hi: Optional[int]) -> Dict[str, Any]:
+        if len(self.income) == 0:
+            return {"index": np.zeros(0, dtype=np.int64), "income": self.income, "spend": self.spend, "count": self.count}
+        first = self.base if lo is None else max(lo, self.base)
+        last = self.base + len(self.income) - 1 if hi is None else min(hi, self.base + len(self.income) - 1)
+        if last < first:
+            first, last = self.base, self.base - 1
+        a, b = first - self.base, last - self.base + 1
+        return {
+            "index": np.arange(first, last + 1, dtype=np.int64),
+            "income": self.income[a:b],
+            "spend": self.spend[a:b],
+            "count": self.count[a:b],
+        }
+
+
+# Running balance, income, spend and per-category spend for one user, updated as
+# transactions are appended, plus day/week/month rollups for range queries.
+class BankingLedger:
+    def __init__(self, opening_balance: float = 0.0) -> None:
+        self.opening_balance = float(opening_balance)
+        self.balance = float(opening_balance)
+        self.income = 0.0
+        self.spend = 0.0
+        self.count = 0
+        self.categories: Dict[str, float] = {}
+        self.rollups = {bucket: Rollup(bucket) for bucket in BUCKETS}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=RECENT_TRANSACTIONS)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(rollup.nbytes for rollup in self.rollups.values())
+
+    def append(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        amounts = np.fromiter((float(row["amount"]) for row in rows), dtype=np.float64, count=len(rows))
+        days = day_numbers(row["timestamp"] for row in rows)
+        self.balance += float(amounts.sum())
+        self.income += float(amounts[amounts > 0].sum())
+        self.spend += float(-amounts[amounts < 0].sum())
+        self.count += len(rows)
+        for row, amount in zip(rows, amounts):
+            if amount < 0:
+                category = category_of(row)
+                self.categories[category] = self.categories.get(category, 0.0) - float(amount)
+        for bucket, rollup in self.rollups.items():
+            rollup.add(bucket_index(days, bucket), amounts)
+        # Newest by timestamp across what is already held and this batch, however old the batch is;
+        # among equal timestamps the later insert counts as newer, as in Store.banking_aggregates.
+        merged = [*self.recent, *rows]
+        newest = heapq.nlargest(RECENT_TRANSACTIONS, range(len(merged)), key=lambda i: (merged[i]["timestamp"], i))
+        self.recent.clear()
+        self.recent.extend(merged[i] for i in reversed(newest))
+
+    def restore(self, aggregates: Dict[str, Any]) -> None:
+        # Loads grouped totals (see Store.banking_aggregates) in place of replaying every transaction:
+        # per-day income/spend/count feed all three rollups, since weeks and months are unions of days.
+        days = aggregates["days"]
+        if days:
+            index = day_numbers(row[0] for row in days)
+            income = np.fromiter((row[1] for row in days), dtype=np.float64, count=len(days))
+            spend = np.fromiter((row[2] for row in days), dtype=np.float64, count=len(days))
+            count = np.fromiter((row[3] for row in days), dtype=np.int64, count=len(days))
+            self.balance += float(income.sum() - spend.sum())
+            self.income += float(income.sum())
+            self.spend += float(spend.sum())
+            self.count += int(count.sum())
+            for bucket, rollup in self.rollups.items():
+                rollup.add_totals(bucket_index(index, bucket), income, spend, count)
+        for category, total in aggregates["categories"]:
+            self.categories[category] = self.categories.get(category, 0.0) + float(total)
+        self.recent.extend(aggregates["recent"])
+
+    def window_totals(self, days: int = 30, today: Optional[date] = None) -> Dict[str, float]:
+        today = today or date.today()
+        end = (today - EPOCH).days
+        window = self.rollups["day"].window(end - days + 1, end)
+        return {
+            "days": days,
+            "income": round(float(window["income"].sum()), 2),
+            "spend": round(float(window["spend"].sum()), 2),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "balance": round(self.balance, 2),
+            "income": round(self.income, 2),
+            "spend": round(self.spend, 2),
+            "categories": {name: round(total, 2) for name, total in sorted(self.categories.items())},
+            "transaction_count": self.count,
+            "window_30d": self.window_totals(30),
+            "transactions": list(reversed(self.recent)),
+        }
+
+    def range_summary(self, start: Optional[date], end: Optional[date], bucket: str) -> Dict[str, Any]:
+        rollup = self.rollups[bucket]
+        lo = None if start is None else int(bucket_index(np.array([(start - EPOCH).days]), bucket)[0])
+        hi = None if end is None else int(bucket_index(np.array([(end - EPOCH).days]), bucket)[0])
+        window = rollup.window(lo, hi)
+        income, spend, count = window["income"], window["spend"], window["count"]
+        # Only buckets that saw activity; an empty year costs nothing in the payload.
+        active = np.nonzero(count)[0]
+        buckets = [
+            {
+                "start": bucket_start(window["index"][i], bucket),
+                "income": round(float(income[i]), 2),
+                "spend": round(float(spend[i]), 2),
+                "net": round(float(income[i] - spend[i]), 2),
+                "count": int(count[i]),
+            }
+            for i in active
+        ]
+        return {
+            "bucket": bucket,
+            "from": start.isoformat() if start else None,
+            "to": end.isoformat() if end else None,
+            "income": round(float(income.sum()), 2),
+            "spend": round(float(spend.sum()), 2),
+            "net": round(float(income.sum() - spend.sum()), 2),
+            "count": int(count.sum()),
+            "buckets": buckets,
+        }
+
+
+def build_ledger(summary: Dict[str, Any], transactions: List[Dict[str, Any]]) -> BankingLedger:
+    ledger = BankingLedger(summary.get("opening_balance", 0.0))
+    ledger.append(transactions)
+    return ledger
+
+
+def restore_ledger(summary: Dict[str, Any], aggregates: Dict[str, Any]) -> BankingLedger:
+    ledger = BankingLedger(summary.get("opening_balance", 0.0))
+    ledger.restore(aggregates)
+    return ledger
+
+
+__all__ = ["BankingLedger", "Rollup", "BUCKETS", "RECENT_TRANSACTIONS", "build_ledger", "category_of", "restore_ledger"]
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Dict, Iterable, List
+
+from .metrics import run_in_threadpool
+
+# A parsed sparse fieldset: {"user": {"name": {}}, "items": {"text": {}}}. An empty tree keeps
+# the whole value.
+FieldTree = Dict[str, "FieldTree"]
+
+
+def parse_fields(spec: str) -> Dict[str, FieldTree]:
+    # "profile.user.name,feed.items.text" -> {"profile": {"user": {"name": {}}}, "feed": {"items": {"text": {}}}}
+    trees: Dict[str, FieldTree] = {}
+    whole: set = set()  # paths that were asked for in full ("feed" beats "feed.items.text")
+    for raw in spec.split(","):
+        parts = [part for part in raw.strip().split(".") if part]
+        if not parts:
+            continue
+        node = trees
+        for depth, part in enumerate(parts):
+            if tuple(parts[:depth]) in whole:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node.clear()
+            whole.add(tuple(parts))
+    return trees
+
+
+def select(value: Any, tree: FieldTree) -> Any:
+    if not tree:
+        return value
+    if isinstance(value, dict):
+        return {key: select(value[key], sub) for key, sub in tree.items() if key in value}
+    if isinstance(value, list):
+        return [select(item, tree) for item in value]
+    return value
+
+
+# Builds several named resources at once, each in the threadpool so store reads overlap, and
+# trims each to its fieldset. A resource that fails is reported under "errors" instead of
+# failing the whole batch.
+async def resolve(
+    builders: Dict[str, Callable[[], Any]], names: Iterable[str], fields: Dict[str, FieldTree]
+) -> Dict[str, Any]:
+    ordered: List[str] = list(dict.fromkeys(names))
+    results = await asyncio.gather(
+        *(run_in_threadpool(builders[name], task=f"batch:{name}") for name in ordered), return_exceptions=True
+    )
+    payload: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for name, result in zip(ordered, results):
+        if isinstance(result, Exception):
+            errors[name] = str(getattr(result, "detail", "") or result.__class__.__name__)
+            continue
+        payload[name] = select(result, fields.get(name, {}))
+    if errors:
+        payload["errors"] = errors
+    return payload
+
+
+__all__ = ["FieldTree", "parse_fields", "resolve", "select"]
@@ -1,15 +1,18 @@
 import os
 from pathlib import Path
 
-from dotenv import load_dotenv
 from pydantic import BaseModel
 
-# Load environment variables from standard locations
+from . import startup
+
+# Load environment variables from standard locations (python-dotenv is only imported when one exists)
 for candidate in (
     Path(__file__).resolve().parent / ".env",
     Path(__file__).resolve().parent.parent / ".env",
 ):
     if candidate.exists():
+        from dotenv import load_dotenv
+
         load_dotenv(candidate)
 
 
@@ -18,6 +21,73 @@ class Settings(BaseModel):
     app_name: str = "MeMetrics SuperApp"
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     openai_model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")
+    llm_max_concurrency: int = int(os.getenv("MITRA_LLM_CONCURRENCY", "8"))
+    llm_timeout_seconds: float = float(os.getenv("MITRA_LLM_TIMEOUT", "15"))
+    llm_breaker_failures: int = int(os.getenv("MITRA_BREAKER_FAILURES", "5"))
+    llm_breaker_reset_seconds: float = float(os.getenv("MITRA_BREAKER_RESET", "30"))
+    llm_slow_call_seconds: float = float(os.getenv("MITRA_SLOW_CALL", "10"))
+    mitra_cache_enabled: bool = os.getenv("MITRA_CACHE", "1") != "0"
+    mitra_cache_ttl_seconds: float = float(os.getenv("MITRA_CACHE_TTL", "3600"))
+    mitra_cache_max_entries: int = int(os.getenv("MITRA_CACHE_SIZE", "2048"))
+    # Mitra admission control: LLM calls beyond llm_max_concurrency wait in a queue of this size
+    # (members ahead of guests) for at most mitra_queue_timeout_seconds, otherwise they are shed to
+    # a rule-based reply; each user (or anonymous client address) gets mitra_rate_per_minute calls
+    # with bursts of mitra_rate_burst (0 disables the rate limit)
+    mitra_queue_size: int = int(os.getenv("MITRA_QUEUE_SIZE", "32"))
+    mitra_queue_timeout_seconds: float = float(os.getenv("MITRA_QUEUE_TIMEOUT", "5"))
+    mitra_rate_per_minute: float = float(os.getenv("MITRA_RATE_PER_MINUTE", "20"))
+    mitra_rate_burst: float = float(os.getenv("MITRA_RATE_BURST", "5"))
+    # Server-side Mitra conversations for signed-in members: recent turns plus a rolling summary
+    # within mitra_memory_tokens, dropped after mitra_memory_idle_seconds without a message
+    mitra_memory_tokens: int = int(os.getenv("MITRA_MEMORY_TOKENS", "800"))
+    mitra_memory_idle_seconds: float = float(os.getenv("MITRA_MEMORY_IDLE", "1800"))
+    mitra_memory_max_sessions: int = int(os.getenv("MITRA_MEMORY_SESSIONS", "10000"))
+    # Offline weekly nudges (python -m backend.nudges): async workers sharing the LLM pool
+    nudge_concurrency: int = int(os.getenv("MEMETRICS_NUDGE_CONCURRENCY", "16"))
+    mitra_rules_path: str = os.getenv(
+        "MITRA_RULES_PATH", str(Path(__file__).resolve().parent / "services" / "mitra_rules.json")
+    )
+    mitra_rules_reload_seconds: float = float(os.getenv("MITRA_RULES_RELOAD", "5"))
+    # "sqlite" (shared across workers, survives restarts) or "memory" (per-process dict)
+    storage_backend: str = os.getenv("MEMETRICS_STORAGE", "sqlite")
+    database_path: str = os.getenv(
+        "MEMETRICS_DB_PATH", str(Path(__file__).resolve().parent / "data" / "memetrics.db")
+    )
+    # newest posts kept by the in-memory feed log; SQLite keeps full history
+    feed_retention: int = int(os.getenv("MEMETRICS_FEED_RETENTION", "50000"))
+    # feed search index snapshot for the SQLite store (default: "feed-index.bin" next to the
+    # database; "0" turns it off), read on the first search and rewritten at shutdown
+    feed_index_snapshot: str = os.getenv("MEMETRICS_FEED_INDEX_SNAPSHOT", "")
+    feed_page_size: int = 20
+    feed_page_max: int = 100
+    # hot per-user partitions kept in memory in front of the store
+    user_cache_max_users: int = int(os.getenv("MEMETRICS_USER_CACHE_USERS", "5000"))
+    user_cache_max_bytes: int = int(os.getenv("MEMETRICS_USER_CACHE_BYTES", str(64 * 1024 * 1024)))
+    # rows per store write (and per aggregate update) in /api/banking/import
+    import_batch_size: int = int(os.getenv("MEMETRICS_IMPORT_BATCH", "20000"))
+    import_max_rejects_reported: int = 100
+    # push events (/api/events): "local" (one process) or "sqlite" (fans out across workers
+    # through an events table in database_path); events buffered per client before it is dropped
+    push_broker: str = os.getenv("MEMETRICS_PUSH_BROKER", "local")
+    push_queue_size: int = int(os.getenv("MEMETRICS_PUSH_QUEUE", "256"))
+    push_keepalive_seconds: float = 15.0
+    # likes are counted in memory and written to the store in one batch every likes_flush_seconds;
+    # unflushed likes are kept in a flush log (default: a "likes" folder next to the database)
+    likes_flush_seconds: float = float(os.getenv("MEMETRICS_LIKES_FLUSH", "1"))
+    likes_log_dir: str = os.getenv("MEMETRICS_LIKES_LOG", "")
+    # JSON responses at least this large are sent brotli/gzip-compressed when the client accepts it
+    compress_min_bytes: int = int(os.getenv("MEMETRICS_COMPRESS_MIN", "1024"))
+    # opt-in sampling profiler: requests slower than this many ms dump folded stacks (flame-graph
+    # input) to profile_dir (default: a "profiles" folder next to the database); 0 disables it
+    profile_slow_ms: float = float(os.getenv("MEMETRICS_PROFILE_SLOW_MS", "0"))
+    profile_interval_ms: float = float(os.getenv("MEMETRICS_PROFILE_INTERVAL_MS", "5"))
+    profile_dir: str = os.getenv("MEMETRICS_PROFILE_DIR", "")
+    # MEMETRICS_PROFILE_STARTUP=1 prints how long each startup phase took once the app is serving,
+    # against a cold-start budget of startup_budget_ms (scripts/profile_startup.py adds import times)
+    profile_startup: bool = os.getenv("MEMETRICS_PROFILE_STARTUP", "0") == "1"
+    startup_budget_ms: float = float(os.getenv("MEMETRICS_STARTUP_BUDGET_MS", "2000"))
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+startup.mark("imports and settings")
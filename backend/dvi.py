@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from datetime import date
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .banking import BankingLedger
+from .services.mitra_rules import CompiledRules
+
+# Inputs to the Development Value Index, one column each in the feature matrix.
+FEATURES = (
+    "achievements",         # verified milestones on the profile
+    "recent_achievements",  # the same, halved for every year of age
+    "posts",                # feed updates written by the user
+    "active_months",        # months with banking activity in the last year
+    "positive_months",      # months in the last year that closed with income above spend
+    "savings_ratio",        # lifetime (income - spend) / income, clipped to 0..1
+)
+# Share of the scale each feature can earn, and the value at which it earns ~63% of it.
+WEIGHTS = np.array([0.20, 0.15, 0.15, 0.15, 0.20, 0.15], dtype=np.float64)
+SCALES = np.array([5.0, 2.0, 10.0, 6.0, 4.0, 0.3], dtype=np.float64)
+WINDOW_MONTHS = 12
+
+
+def month_number(day: date) -> int:
+    # Same numbering as the ledger's month rollup (months since 1970-01).
+    return (day.year - 1970) * 12 + day.month - 1
+
+
+def score(features: np.ndarray, scale_max: int = 900) -> np.ndarray:
+    # Saturating per-feature credit, so no single input can carry a user up the scale.
+    credit = -np.expm1(-np.maximum(features, 0.0) / SCALES)
+    return np.rint(scale_max * (credit @ WEIGHTS)).astype(np.int32)
+
+
+def bands(rules: CompiledRules, dvi: np.ndarray) -> np.ndarray:
+    # Vectorized CompiledRules.tier_for: past the last tier is the ceiling entry.
+    highs = np.array([tier.high for tier in rules.tiers], dtype=np.int64)
+    names = np.array([tier.name for tier in rules.tiers] + [rules.ceiling.name], dtype=object)
+    return names[np.searchsorted(highs, dvi, side="right")]
+
+
+def user_features(
+    achievements: Sequence[Dict[str, Any]], post_count: int, ledger: BankingLedger, today: Optional[date] = None
+) -> np.ndarray:
+    today = today or date.today()
+    years = np.array([int(item.get("year") or today.year) for item in achievements], dtype=np.float64)
+    monthly = ledger.rollups["month"]
+    current = month_number(today)
+    window = monthly.window(current - WINDOW_MONTHS + 1, current)
+    return np.array([
+        len(years),
+        np.power(0.5, np.maximum(today.year - years, 0)).sum(),
+        post_count,
+        np.count_nonzero(window["count"]),
+        np.count_nonzero(window["income"] > window["spend"]),
+        np.clip((ledger.income - ledger.spend) / ledger.income, 0.0, 1.0) if ledger.income > 0 else 0.0,
+    ], dtype=np.float64)
+
+
+def _rows(index: Dict[str, int], table: List[Tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    # Row of each record's user id, plus a mask of the ids that are users at all (the feed
+    # also carries posts by people without a profile; those point at row 0 and are masked out).
+    rows = np.fromiter(
+        (index.get(user_id, -1) for user_id in map(itemgetter(0), table)), dtype=np.int64, count=len(table)
+    )
+    known = rows >= 0
+    return np.where(known, rows, 0), known
+
+
+def _column(table: List[Tuple], position: int) -> np.ndarray:
+    return np.fromiter(map(itemgetter(position), table), dtype=np.float64, count=len(table))
+
+
+def feature_matrix(inputs: Dict[str, List[Tuple]], today: Optional[date] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Builds every user's feature row from grouped store aggregates (see Store.scoring_inputs)
+    # with one id lookup per record and bincount scatter-adds, so the cost is a pass over each table.
+    today = today or date.today()
+    users = [row[0] for row in inputs["users"]]
+    index = {user_id: row for row, user_id in enumerate(users)}
+    size = len(users)
+    features = np.zeros((size, len(FEATURES)), dtype=np.float64)
+
+    achievements = inputs["achievements"]
+    if size and achievements:
+        rows, known = _rows(index, achievements)
+        counts = np.where(known, _column(achievements, 2), 0.0)
+        age = np.maximum(today.year - _column(achievements, 1), 0)
+        features[:, 0] += np.bincount(rows, counts, minlength=size)
+        features[:, 1] += np.bincount(rows, counts * np.power(0.5, age), minlength=size)
+
+    posts = inputs["posts"]
+    if size and posts:
+        rows, known = _rows(index, posts)
+        features[:, 2] += np.bincount(rows, np.where(known, _column(posts, 1), 0.0), minlength=size)
+
+    months = inputs["months"]
+    if size and months:
+        rows, known = _rows(index, months)
+        positive = _column(months, 2) > _column(months, 3)
+        features[:, 3] += np.bincount(rows, known.astype(np.float64), minlength=size)
+        features[:, 4] += np.bincount(rows, (known & positive).astype(np.float64), minlength=size)
+
+    totals = inputs["totals"]
+    if size and totals:
+        rows, known = _rows(index, totals)
+        income = _column(totals, 1)
+        spend = _column(totals, 2)
+        ratio = np.divide(income - spend, income, out=np.zeros_like(income), where=income > 0)
+        features[rows[known], 5] = np.clip(ratio[known], 0.0, 1.0)
+    return np.array(users, dtype=object), features
+
+
+def window_start(today: Optional[date] = None) -> str:
+    # First day of the oldest month in the banking window, as an ISO prefix for range filters.
+    number = month_number(today or date.today()) - WINDOW_MONTHS + 1
+    return f"{1970 + number // 12:04d}-{number % 12 + 1:02d}"
+
+
+__all__ = ["FEATURES", "bands", "feature_matrix", "score", "user_features", "window_start"]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+from typing import Any, Callable
+
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # NumPy scalars and arrays
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(payload: Any) -> bytes:
+        return orjson.dumps(payload, default=_default, option=_OPTIONS)
+
+else:
+
+    def dumps(payload: Any) -> bytes:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Endpoints keep returning plain dicts; the route wraps them in FastJSONResponse before
+# FastAPI's serializer sees them, so neither jsonable_encoder nor response_model validation runs.
+# response_model still documents the shape in the OpenAPI schema.
+class FastJSONRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _wrap(endpoint), **kwargs)
+
+
+def _wrap(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def wrapped(*args: Any, **kwargs: Any) -> Any:
+            result = await endpoint(*args, **kwargs)
+            return result if isinstance(result, Response) else FastJSONResponse(result)
+
+    else:
+
+        @functools.wraps(endpoint)
+        def wrapped(*args: Any, **kwargs: Any) -> Any:
+            result = endpoint(*args, **kwargs)
+            return result if isinstance(result, Response) else FastJSONResponse(result)
+
+    # FastAPI resolves string annotations against the endpoint's module, which the wrapper
+    # does not share, so hand it the already-resolved signature.
+    wrapped.__signature__ = inspect.signature(endpoint, eval_str=True)
+    return wrapped
+
+
+__all__ = ["FastJSONResponse", "FastJSONRoute", "dumps"]
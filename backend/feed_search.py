@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import json
+import math
+import mmap
+import os
+import sys
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .opportunity_index import tokenize
+
+# BM25 term-frequency saturation and document-length normalisation.
+K1 = 1.2
+B = 0.75
+
+SNAPSHOT_MAGIC = b"MMFEEDIX1\n"
+_EMPTY = np.zeros(0, dtype=np.uint8)
+
+
+def _day(created_at: Any) -> int:
+    try:
+        return date.fromisoformat(str(created_at)[:10]).toordinal()
+    except ValueError:
+        return 0
+
+
+def _put_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varints(data: Any) -> np.ndarray:
+    # LEB128 varints, decoded without a Python loop: each value is the sum of its 7-bit groups.
+    raw = data if isinstance(data, np.ndarray) else np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    if len(ends) == len(raw):
+        return raw.astype(np.int64)
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    shifts = (np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)) * 7
+    return np.add.reduceat((raw & 0x7F).astype(np.int64) << shifts, starts)
+
+
+# One term's postings as interleaved (slot gap, term frequency) varints. Slots only grow, so the
+# gaps are small and most postings take two bytes. After a snapshot load, `base` is a read-only
+# view into the mapped file and `data` holds only what was appended since.
+class _Postings:
+    __slots__ = ("base", "data", "last", "df")
+
+    def __init__(self, base: np.ndarray = _EMPTY, last: int = -1, df: int = 0) -> None:
+        self.base = base
+        self.data = bytearray()
+        self.last = last
+        self.df = df
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.data)
+
+    def add(self, slot: int, tf: int) -> None:
+        _put_varint(self.data, slot - self.last)
+        _put_varint(self.data, tf)
+        self.last = slot
+        self.df += 1
+
+    def raw(self) -> np.ndarray:
+        if not self.data:
+            return self.base
+        tail = np.frombuffer(bytes(self.data), dtype=np.uint8)
+        return np.concatenate((self.base, tail)) if len(self.base) else tail
+
+    def decode(self) -> Tuple[np.ndarray, np.ndarray]:
+        values = decode_varints(self.raw())
+        return np.cumsum(values[0::2]) - 1, values[1::2]
+
+
+# Inverted index over post text and author names, appended to in post-id order, with per-slot
+# columns for the filters (author DVI, posting day, author) and BM25 ranking. Posts are kept by id
+# only; callers fetch the hits from the store. Posts the store no longer has are forgotten (masked
+# out) when a search runs into them.
+class FeedSearchIndex:
+    def __init__(self, posts: Iterable[Dict[str, Any]] = ()) -> None:
+        self._lock = threading.RLock()
+        self._postings: Dict[str, _Postings] = {}
+        self._authors: Dict[str, int] = {}
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._dvi = np.zeros(0, dtype=np.int32)
+        self._day = np.zeros(0, dtype=np.int32)
+        self._author = np.zeros(0, dtype=np.int32)
+        self._length = np.zeros(0, dtype=np.uint16)
+        self._alive = np.zeros(0, dtype=bool)
+        self._size = 0
+        self._live = 0
+        self._total_length = 0
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._norms_average = 0.0
+        self.last_id = -1
+        self.extend(posts)
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _grow(self, needed: int) -> None:
+        size = len(self._ids)
+        if needed <= size:
+            return
+        extra = max(needed - size, size, 1024)
+        self._ids = np.pad(self._ids, (0, extra))
+        self._dvi = np.pad(self._dvi, (0, extra))
+        self._day = np.pad(self._day, (0, extra))
+        self._author = np.pad(self._author, (0, extra))
+        self._length = np.pad(self._length, (0, extra))
+        self._alive = np.pad(self._alive, (0, extra))
+
+    def _insert(self, post: Dict[str, Any]) -> bool:
+        post_id = int(post["id"])
+        if post_id <= self.last_id:
+            return False
+        slot = self._size
+        self._grow(slot + 1)
+        tokens = tokenize(str(post.get("text") or ""))
+        tokens += tokenize(f"{post.get('display_name') or ''} {post.get('user_id') or ''}")
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.add(slot, tf)
+        length = min(len(tokens), 0xFFFF)
+        self._ids[slot] = post_id
+        self._dvi[slot] = int(post.get("dvi") or 0)
+        self._day[slot] = _day(post.get("created_at"))
+        self._author[slot] = self._authors.setdefault(str(post.get("user_id") or ""), len(self._authors))
+        self._length[slot] = length
+        self._alive[slot] = True
+        self._size += 1
+        self._live += 1
+        self._total_length += length
+        self.last_id = post_id
+        return True
+
+    def add(self, post: Dict[str, Any]) -> bool:
+        # Posts at or below last_id are already indexed (or too old to append) and are skipped.
+        with self._lock:
+            return self._insert(post)
+
+    def extend(self, posts: Iterable[Dict[str, Any]]) -> int:
+        with self._lock:
+            return sum(self._insert(post) for post in posts)
+
+    def forget(self, post_ids: Iterable[int]) -> None:
+        with self._lock:
+            ids = self._ids[: self._size]
+            for post_id in post_ids:
+                slot = int(np.searchsorted(ids, post_id))
+                if slot < self._size and ids[slot] == post_id and self._alive[slot]:
+                    self._alive[slot] = False
+                    self._live -= 1
+                    self._total_length -= int(self._length[slot])
+
+    def _length_norms(self) -> np.ndarray:
+        # BM25's per-post length term, reused across queries until the average length moves by 1%.
+        average = self._total_length / self._live
+        if abs(average - self._norms_average) > 0.01 * self._norms_average or not self._norms_average:
+            self._norms_average = average
+            self._norms = np.zeros(0, dtype=np.float32)
+        if len(self._norms) < self._size:
+            lengths = self._length[len(self._norms):self._size].astype(np.float32)
+            tail = K1 * (1.0 - B + B * lengths / np.float32(self._norms_average))
+            self._norms = np.concatenate([self._norms, tail.astype(np.float32)])
+        return self._norms
+
+    def search(
+        self,
+        q: str = "",
+        min_dvi: Optional[int] = None,
+        max_dvi: Optional[int] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        author: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Tuple[int, Optional[float]]]:
+        # (post id, score) best first; without a query, the newest matching posts with no score.
+        with self._lock:
+            if not self._live or limit <= 0:
+                return []
+            scores: Optional[np.ndarray] = None
+            terms = list(dict.fromkeys(tokenize(q)))
+            if terms:
+                found = [self._postings[term] for term in terms if term in self._postings]
+                if not found:
+                    return []
+                # Every term is scored: BM25's idf already weighs common terms down, and posts that
+                # match only those must still be found. df counts every slot ever indexed, forgotten
+                # ones included, so idf is taken over all slots too; over live posts alone it turns
+                # negative for common terms once posts are forgotten.
+                slot_parts: List[np.ndarray] = []
+                score_parts: List[np.ndarray] = []
+                norms = self._length_norms()
+                for postings in found:
+                    slots, tfs = postings.decode()
+                    idf = math.log(1.0 + (self._size - postings.df + 0.5) / (postings.df + 0.5))
+                    tfs = tfs.astype(np.float32)
+                    slot_parts.append(slots)
+                    score_parts.append(np.float32(idf * (K1 + 1.0)) * tfs / (tfs + norms[slots]))
+                if len(slot_parts) == 1:
+                    candidates, scores = slot_parts[0], score_parts[0]
+                else:
+                    slots, weights = np.concatenate(slot_parts), np.concatenate(score_parts)
+                    if len(slots) * 8 > self._size:
+                        # Long lists: accumulate over every slot rather than sort the union.
+                        scores = np.bincount(slots, weights=weights, minlength=self._size)
+                        candidates = np.flatnonzero(np.bincount(slots, minlength=self._size))
+                        scores = scores[candidates]
+                    else:
+                        candidates, inverse = np.unique(slots, return_inverse=True)
+                        scores = np.bincount(inverse, weights=weights)
+                keep = self._alive[candidates]
+            else:
+                candidates = np.arange(self._size)
+                keep = self._alive[: self._size].copy()
+            if min_dvi is not None:
+                keep &= self._dvi[candidates] >= min_dvi
+            if max_dvi is not None:
+                keep &= self._dvi[candidates] <= max_dvi
+            if since is not None:
+                keep &= self._day[candidates] >= since.toordinal()
+            if until is not None:
+                keep &= self._day[candidates] <= until.toordinal()
+            if author is not None:
+                code = self._authors.get(author)
+                if code is None:
+                    return []
+                keep &= self._author[candidates] == code
+            candidates = candidates[keep]
+            if scores is None:
+                newest = candidates[::-1][:limit]
+                return [(int(post_id), None) for post_id in self._ids[newest]]
+            scores = scores[keep]
+            if len(candidates) > limit:
+                # The limit-th best score, then everything above it and the newest posts tied with
+                # it (candidates are in slot order), so ties are not cut arbitrarily.
+                cutoff = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+                above = np.flatnonzero(scores > cutoff)
+                tied = np.flatnonzero(scores == cutoff)[::-1][: limit - len(above)]
+                top = np.concatenate((above, tied))
+            else:
+                top = np.arange(len(candidates))
+            # Best score first, newest first among equals.
+            top = top[np.lexsort((-candidates[top], -scores[top]))]
+            return [
+                (int(post_id), round(float(score), 4))
+                for post_id, score in zip(self._ids[candidates[top]], scores[top])
+            ]
+
+    # Snapshot file: a JSON header (counters, last_id, the caller's tag and the array layout), then
+    # the filter columns, every term's postings back to back, and the term and author names, each
+    # 8-byte aligned. load() maps it copy-on-write, so a restart pages the index in as searches
+    # touch it instead of re-reading every post from the store.
+    def save(self, path: Path, tag: str = "") -> int:
+        with self._lock:
+            size = self._size
+            terms = list(self._postings)
+            postings = [self._postings[term] for term in terms]
+            arrays = {
+                "ids": self._ids[:size],
+                "dvi": self._dvi[:size],
+                "day": self._day[:size],
+                "author": self._author[:size],
+                "length": self._length[:size],
+                "alive": self._alive[:size],
+                "postings_length": np.fromiter((len(p) for p in postings), dtype=np.int64, count=len(postings)),
+                "postings_last": np.fromiter((p.last for p in postings), dtype=np.int64, count=len(postings)),
+                "postings_df": np.fromiter((p.df for p in postings), dtype=np.int64, count=len(postings)),
+                "postings": np.concatenate([p.raw() for p in postings]) if postings else _EMPTY,
+                "terms": np.frombuffer("\0".join(terms).encode("utf-8"), dtype=np.uint8),
+                "authors": np.frombuffer("\0".join(self._authors).encode("utf-8"), dtype=np.uint8),
+            }
+            layout: Dict[str, List[Any]] = {}
+            offset = 0
+            for name, array in arrays.items():
+                layout[name] = [array.dtype.str, len(array), offset]
+                offset += -(-array.nbytes // 8) * 8
+            header = json.dumps({
+                "size": size,
+                "live": self._live,
+                "total_length": self._total_length,
+                "last_id": self.last_id,
+                "terms": len(terms),
+                "authors": len(self._authors),
+                "tag": tag,
+                "arrays": layout,
+            }).encode("utf-8")
+            prefix = len(SNAPSHOT_MAGIC) + 8 + len(header)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # A temporary name of its own in the same directory: every worker may be saving at once,
+            # and each os.replace swaps in one complete snapshot.
+            fd, partial = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(SNAPSHOT_MAGIC + len(header).to_bytes(8, "little") + header)
+                    handle.write(bytes(-prefix % 8))
+                    for array in arrays.values():
+                        handle.write(np.ascontiguousarray(array).tobytes())
+                        handle.write(bytes(-array.nbytes % 8))
+                    written = handle.tell()
+                os.replace(partial, path)
+            except BaseException:
+                os.unlink(partial)
+                raise
+            return written
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["FeedSearchIndex", str]:
+        # (index, tag). Raises ValueError if the file is not a snapshot.
+        with open(path, "rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_COPY)
+        start = len(SNAPSHOT_MAGIC)
+        if mapped[:start] != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a feed index snapshot")
+        length = int.from_bytes(mapped[start:start + 8], "little")
+        header = json.loads(mapped[start + 8:start + 8 + length])
+        base = start + 8 + length
+        base += -base % 8
+        arrays = {
+            name: np.frombuffer(mapped, dtype=np.dtype(dtype), count=count, offset=base + offset)
+            for name, (dtype, count, offset) in header["arrays"].items()
+        }
+        index = cls()
+        index._ids = arrays["ids"]
+        index._dvi = arrays["dvi"]
+        index._day = arrays["day"]
+        index._author = arrays["author"]
+        index._length = arrays["length"]
+        index._alive = arrays["alive"]
+        index._size = header["size"]
+        index._live = header["live"]
+        index._total_length = header["total_length"]
+        index.last_id = header["last_id"]
+        terms = arrays["terms"].tobytes().decode("utf-8").split("\0") if header["terms"] else []
+        blob = arrays["postings"]
+        ends = np.cumsum(arrays["postings_length"]).tolist()
+        for term, end, size, last, df in zip(
+            terms, ends, arrays["postings_length"].tolist(), arrays["postings_last"].tolist(), arrays["postings_df"].tolist()
+        ):
+            index._postings[term] = _Postings(blob[end - size:end], last, df)
+        authors = arrays["authors"].tobytes().decode("utf-8").split("\0") if header["authors"] else []
+        index._authors = {name: code for code, name in enumerate(authors)}
+        return index, header["tag"]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            postings = sum(len(p) for p in self._postings.values())
+            columns = sum(
+                array[: self._size].nbytes
+                for array in (self._ids, self._dvi, self._day, self._author, self._length, self._alive, self._norms)
+            )
+            # Payload plus the per-term objects and dict slots that hold them.
+            overhead = len(self._postings) * (sys.getsizeof(_Postings()) + sys.getsizeof(bytearray()) + 100)
+            return {
+                "posts": self._live,
+                "slots": self._size,
+                "terms": len(self._postings),
+                "postings_bytes": postings,
+                "bytes": postings + columns + overhead,
+            }
+
+
+__all__ = ["FeedSearchIndex", "SNAPSHOT_MAGIC", "decode_varints"]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+
+# Append-only post log made of fixed-size segments. Posts arrive with increasing ids, so
+# appends are O(1), a keyset page is a bisect plus O(limit), and the retention cap is
+# enforced by dropping whole segments from the old end.
+class FeedLog:
+    def __init__(self, retention: int = 50_000, segment_size: int = 1024) -> None:
+        self.segment_size = max(1, segment_size)
+        self.retention = max(self.segment_size, retention)
+        self._segments: Deque[List[Dict[str, Any]]] = deque()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, post: Dict[str, Any]) -> None:
+        if self._segments and post["id"] <= self._segments[-1][-1]["id"]:
+            raise ValueError("FeedLog ids must be strictly increasing")
+        if not self._segments or len(self._segments[-1]) >= self.segment_size:
+            self._segments.append([])
+        self._segments[-1].append(post)
+        self._size += 1
+        while self._size - len(self._segments[0]) >= self.retention:
+            self._size -= len(self._segments.popleft())
+
+    def extend(self, posts: List[Dict[str, Any]]) -> None:
+        for post in sorted(posts, key=lambda item: item["id"]):
+            self.append(post)
+
+    def last_id(self) -> Optional[int]:
+        return self._segments[-1][-1]["id"] if self._segments else None
+
+    def newest_first(self, before: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        if not self._segments:
+            return
+        seg_index = len(self._segments) - 1
+        offset = len(self._segments[-1])
+        if before is not None:
+            seg_index, offset = self._locate(before)
+        while seg_index >= 0:
+            segment = self._segments[seg_index]
+            for i in range(offset - 1, -1, -1):
+                yield segment[i]
+            seg_index -= 1
+            if seg_index >= 0:
+                offset = len(self._segments[seg_index])
+
+    def oldest_first(self, after: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        seg_index, offset = (0, 0) if after is None else self._locate(after + 1)
+        if seg_index < 0:
+            seg_index, offset = 0, 0
+        while seg_index < len(self._segments):
+            segment = self._segments[seg_index]
+            for i in range(offset, len(segment)):
+                yield segment[i]
+            seg_index += 1
+            offset = 0
+
+    def get(self, post_id: int) -> Optional[Dict[str, Any]]:
+        seg_index, offset = self._locate(post_id + 1)
+        if seg_index < 0 or offset == 0:
+            return None
+        post = self._segments[seg_index][offset - 1]
+        return post if post["id"] == post_id else None
+
+    def page(self, before: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        items: List[Dict[str, Any]] = []
+        if limit <= 0:
+            return items
+        for post in self.newest_first(before):
+            items.append(post)
+            if len(items) >= limit:
+                break
+        return items
+
+    def _locate(self, before: int) -> tuple[int, int]:
+        # Last segment whose first id is below the cursor, then the cut point inside it.
+        lo, hi = 0, len(self._segments)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._segments[mid][0]["id"] < before:
+                lo = mid + 1
+            else:
+                hi = mid
+        seg_index = lo - 1
+        if seg_index < 0:
+            return -1, 0
+        segment = self._segments[seg_index]
+        offset = bisect_left(segment, before, key=lambda item: item["id"])
+        return seg_index, offset
+
+
+__all__ = ["FeedLog"]
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Ring sizes per resolution: the last 4096 funding events, 120 days of hours, 5 years of days.
+RAW_CAPACITY = 4096
+RESOLUTIONS = {"hour": (3600, 24 * 120), "day": (86400, 366 * 5)}
+MAX_POINTS = 2000
+
+
+def to_epoch(timestamp: str) -> float:
+    moment = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def to_iso(epochs: np.ndarray) -> List[str]:
+    return np.datetime_as_string(epochs.astype("datetime64[s]"), unit="s", timezone="UTC").tolist()
+
+
+# Fixed-size ring of the most recent events: time, amount and the series level after each.
+class RawRing:
+    def __init__(self, capacity: int = RAW_CAPACITY) -> None:
+        self.capacity = capacity
+        self.time = np.zeros(capacity, dtype=np.float64)
+        self.amount = np.zeros(capacity, dtype=np.float64)
+        self.level = np.zeros(capacity, dtype=np.float64)
+        self.size = 0
+        self.head = 0  # next slot to write
+
+    def extend(self, times: np.ndarray, amounts: np.ndarray, levels: np.ndarray) -> None:
+        times, amounts, levels = times[-self.capacity:], amounts[-self.capacity:], levels[-self.capacity:]
+        slots = (self.head + np.arange(len(times))) % self.capacity
+        self.time[slots] = times
+        self.amount[slots] = amounts
+        self.level[slots] = levels
+        self.head = (self.head + len(times)) % self.capacity
+        self.size = min(self.size + len(times), self.capacity)
+
+    def query(self, start: float, end: float, limit: int) -> Dict[str, np.ndarray]:
+        order = (self.head - self.size + np.arange(self.size)) % self.capacity
+        times = self.time[order]
+        lo, hi = np.searchsorted(times, start, side="left"), np.searchsorted(times, end, side="right")
+        lo = max(lo, hi - limit)
+        picked = order[lo:hi]
+        return {"time": self.time[picked], "amount": self.amount[picked], "level": self.level[picked]}
+
+
+# One downsampled resolution. Bucket b lives in slot b % capacity next to its bucket number, so
+# recording is O(1) per bucket, old buckets are overwritten in place and a slot holding another
+# bucket number reads as empty.
+class BucketRing:
+    def __init__(self, seconds: int, capacity: int) -> None:
+        self.seconds = seconds
+        self.capacity = capacity
+        self.bucket = np.full(capacity, -1, dtype=np.int64)
+        self.level = np.zeros(capacity, dtype=np.float64)  # series level at the end of the bucket
+        self.inflow = np.zeros(capacity, dtype=np.float64)
+        self.events = np.zeros(capacity, dtype=np.int64)
+
+    def extend(self, times: np.ndarray, amounts: np.ndarray, levels: np.ndarray) -> None:
+        buckets = (times // self.seconds).astype(np.int64)
+        uniq, first = np.unique(buckets, return_index=True)
+        last = np.append(first[1:], len(buckets)) - 1
+        inflow = np.add.reduceat(amounts, first)
+        counts = np.diff(np.append(first, len(buckets)))
+        keep = uniq > uniq[-1] - self.capacity
+        uniq, last, inflow, counts = uniq[keep], last[keep], inflow[keep], counts[keep]
+        slots = uniq % self.capacity
+        current = self.bucket[slots]
+        fresh = current <= uniq  # never let a late event overwrite a newer bucket
+        same = current == uniq
+        slots, uniq, last, inflow, counts, same = slots[fresh], uniq[fresh], last[fresh], inflow[fresh], counts[fresh], same[fresh]
+        self.inflow[slots] = np.where(same, self.inflow[slots], 0.0) + inflow
+        self.events[slots] = np.where(same, self.events[slots], 0) + counts
+        self.level[slots] = levels[last]
+        self.bucket[slots] = uniq
+
+    def query(self, first: int, last: int, default: float = 0.0) -> Dict[str, np.ndarray]:
+        # Dense buckets first..last, read straight from their slots; empty buckets carry the
+        # previous level forward. `default` is the level when the ring holds nothing at all.
+        wanted = first + np.arange(last - first + 1)
+        slots = wanted % self.capacity
+        present = self.bucket[slots] == wanted
+        inflow = np.where(present, self.inflow[slots], 0.0)
+        events = np.where(present, self.events[slots], 0)
+        # Level going into the window: the last bucket before it, else derived from the next one.
+        before = np.flatnonzero((self.bucket >= 0) & (self.bucket < first))
+        after = np.flatnonzero(self.bucket > last)
+        if len(before):
+            opening = self.level[before[np.argmax(self.bucket[before])]]
+        elif present.any():
+            slot = slots[np.argmax(present)]
+            opening = self.level[slot] - self.inflow[slot]
+        elif len(after):
+            slot = after[np.argmin(self.bucket[after])]
+            opening = self.level[slot] - self.inflow[slot]
+        else:
+            opening = default
+        filled = np.where(present, np.arange(len(wanted)), -1)
+        np.maximum.accumulate(filled, out=filled)
+        level = np.where(filled >= 0, self.level[slots[np.maximum(filled, 0)]], opening)
+        return {"time": wanted * float(self.seconds), "inflow": inflow, "events": events, "level": level}
+
+
+# A running total (AUM or a fund's funded amount) at every resolution.
+class Series:
+    def __init__(self, opening: float = 0.0) -> None:
+        self.current = opening
+        self.raw = RawRing()
+        self.rings = {name: BucketRing(seconds, capacity) for name, (seconds, capacity) in RESOLUTIONS.items()}
+
+    def extend(self, times: np.ndarray, amounts: np.ndarray) -> None:
+        if not len(times):
+            return
+        levels = self.current + np.cumsum(amounts)
+        self.current = float(levels[-1])
+        self.raw.extend(times, amounts, levels)
+        for ring in self.rings.values():
+            ring.extend(times, amounts, levels)
+
+    def history(self, resolution: str, start: float, end: float, limit: int = MAX_POINTS) -> List[Dict[str, Any]]:
+        if resolution == "raw":
+            data = self.raw.query(start, end, limit)
+            return [
+                {"t": t, "amount": round(a, 2), "level": round(v, 2)}
+                for t, a, v in zip(to_iso(data["time"]), data["amount"].tolist(), data["level"].tolist())
+            ]
+        ring = self.rings[resolution]
+        last = int(end // ring.seconds)
+        first = max(int(start // ring.seconds), last - limit + 1)
+        data = ring.query(first, last, self.current)
+        return [
+            {"t": t, "inflow": round(i, 2), "events": e, "level": round(v, 2)}
+            for t, i, e, v in zip(
+                to_iso(data["time"]), data["inflow"].tolist(), data["events"].tolist(), data["level"].tolist()
+            )
+        ]
+
+
+# Investor dashboard aggregates kept in step with the funding events: each event moves its
+# fund, the portfolio totals and their time series, so nothing is recomputed on read.
+class Portfolio:
+    def __init__(self, funds: List[Dict[str, Any]], aum: float = 0.0, roi: float = 0.0) -> None:
+        self._lock = threading.Lock()
+        self.roi = roi
+        self.funds: Dict[str, Dict[str, Any]] = {}
+        self._sponsors: Dict[str, set] = {}
+        self.series: Dict[str, Series] = {}
+        for fund in funds:
+            self.funds[fund["id"]] = {
+                "id": fund["id"],
+                "title": fund["title"],
+                "focus": fund.get("focus", ""),
+                "target": float(fund.get("target") or 0),
+                "funded": 0.0,
+                "sponsors": 0,
+            }
+            self._sponsors[fund["id"]] = set()
+            self.series[fund["id"]] = Series()
+        # Capital under management that is not committed to a listed fund.
+        self.reserve = max(aum - sum(float(fund.get("funded") or 0) for fund in funds), 0.0)
+        self.total = Series(self.reserve)
+        self.funded = 0.0
+        self.active_sponsorships = 0
+
+    def record(self, events: List[Dict[str, Any]]) -> None:
+        # Events must be in time order; unknown funds are skipped.
+        events = [event for event in events if event["fund_id"] in self.funds]
+        if not events:
+            return
+        times = np.array([to_epoch(event["timestamp"]) for event in events], dtype=np.float64)
+        amounts = np.array([float(event["amount"]) for event in events], dtype=np.float64)
+        fund_ids = np.array([event["fund_id"] for event in events], dtype=object)
+        with self._lock:
+            for event in events:
+                fund = self.funds[event["fund_id"]]
+                fund["funded"] += float(event["amount"])
+                sponsors = self._sponsors[event["fund_id"]]
+                if event.get("sponsor") and event["sponsor"] not in sponsors:
+                    sponsors.add(event["sponsor"])
+                    fund["sponsors"] += 1
+                    self.active_sponsorships += 1
+            self.funded += float(amounts.sum())
+            self.total.extend(times, amounts)
+            for fund_id in set(fund_ids.tolist()):
+                mask = fund_ids == fund_id
+                self.series[fund_id].extend(times[mask], amounts[mask])
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "aum": round(self.total.current, 2),
+                "active_sponsorships": self.active_sponsorships,
+                "roi": self.roi,
+                "funded": round(self.funded, 2),
+                "target": round(sum(fund["target"] for fund in self.funds.values()), 2),
+                "funds": [
+                    {**fund, "funded": round(fund["funded"], 2), "target": round(fund["target"], 2)}
+                    for fund in self.funds.values()
+                ],
+            }
+
+    def history(
+        self, resolution: str, fund_id: Optional[str] = None, start: Optional[float] = None, end: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        series = self.total if fund_id is None else self.series.get(fund_id)
+        if series is None:
+            return None
+        end = end if end is not None else datetime.now(timezone.utc).timestamp()
+        if start is None:
+            start = 0.0 if resolution == "raw" else end - RESOLUTIONS[resolution][0] * (168 if resolution == "hour" else 180)
+        with self._lock:
+            points = series.history(resolution, start, end)
+        return {"resolution": resolution, "fund": fund_id, "metric": "funded" if fund_id else "aum", "points": points}
+
+
+def seed_funding_events(
+    funds: List[Dict[str, Any]], sponsors: Dict[str, List[str]], days: int = 180, now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    # Demo history: each fund's seeded "funded" split into dated contributions over `days`.
+    rng = random.Random(7)
+    now = now or datetime.now(timezone.utc)
+    events: List[Tuple[datetime, Dict[str, Any]]] = []
+    for fund in funds:
+        total = float(fund.get("funded") or 0)
+        count = 24
+        weights = [rng.uniform(0.5, 1.5) for _ in range(count)]
+        amounts = [round(total * weight / sum(weights), 2) for weight in weights]
+        amounts[-1] = round(total - sum(amounts[:-1]), 2)
+        names = sponsors.get(fund["id"]) or [""]
+        for i, amount in enumerate(amounts):
+            moment = now - timedelta(days=days) + timedelta(seconds=rng.uniform(0, days * 86400))
+            events.append((moment, {"fund_id": fund["id"], "sponsor": names[i % len(names)], "amount": amount}))
+    events.sort(key=lambda item: item[0])
+    return [
+        {"id": index, **event, "timestamp": moment.isoformat()} for index, (moment, event) in enumerate(events, start=1)
+    ]
+
+
+__all__ = ["MAX_POINTS", "Portfolio", "RESOLUTIONS", "Series", "seed_funding_events", "to_epoch"]
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, TextIO, Tuple
+
+from .storage import Store
+
+# Another worker's segment is only replayed once it has gone this long without being touched,
+# which a live worker never lets happen: it rotates its segment on every flush and refreshes the
+# ones it keeps after a failed flush.
+ORPHAN_SECONDS = 30.0
+
+
+# Append-only record of likes not yet in the store, one JSON line per toggle. Each worker
+# writes its own segments, created on the first append after a flush; a flushed segment is
+# deleted. Segments left behind by a crashed worker are picked up by whichever worker flushes next.
+class FlushLog:
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._owner = uuid.uuid4().hex[:12]
+        self._seq = 0
+        self._file: Optional[TextIO] = None
+
+    def append(self, user_id: str, post_id: int, liked: bool) -> None:
+        if self._file is None:
+            self._seq += 1
+            self._file = open(self.directory / f"{self._owner}-{self._seq:06d}.log", "a", encoding="utf-8")
+        self._file.write(json.dumps([user_id, post_id, int(liked)]) + "\n")
+        self._file.flush()
+
+    def rotate(self) -> Optional[Path]:
+        # Closes the current segment and returns it (None if nothing was appended since the last rotate).
+        finished, self._file = self._file, None
+        if finished is None:
+            return None
+        os.fsync(finished.fileno())
+        finished.close()
+        return Path(finished.name)
+
+    def orphans(self, min_age: float = ORPHAN_SECONDS) -> List[Path]:
+        cutoff = time.time() - min_age
+        found = []
+        for path in sorted(self.directory.glob("*.log")):
+            if path.name.startswith(self._owner):
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    found.append(path)
+            except FileNotFoundError:
+                continue
+        return found
+
+    @staticmethod
+    def keep(paths: List[Path]) -> None:
+        # Marks segments still owned by this live worker, so no other worker takes them for orphans.
+        for path in paths:
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+
+    @staticmethod
+    def read(path: Path) -> List[Tuple[str, int, bool]]:
+        ops = []
+        try:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        user_id, post_id, liked = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of a crashed writer
+                    ops.append((str(user_id), int(post_id), bool(liked)))
+        except FileNotFoundError:
+            pass
+        return ops
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _Shard:
+    __slots__ = ("lock", "base", "delta", "ops")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.base: Dict[int, Tuple[int, float]] = {}  # stored like_count and when it was read (monotonic)
+        self.delta: Dict[int, int] = {}  # likes minus unlikes since the last flush
+        self.ops: Dict[Tuple[str, int], bool] = {}  # latest state of each (user, post) since the last flush
+
+
+# Write-coalesced like counters. Toggles are checked against the user's liked set, counted in
+# the post's shard and logged; flush() writes everything since the previous flush as one
+# store batch, so a popular post costs one row update per flush instead of one per like.
+# Stored counts are re-read once older than base_seconds, which picks up other workers' flushes.
+class LikeBook:
+    def __init__(
+        self, store: Store, log_dir: Optional[str] = None, shards: int = 16, base_seconds: float = 1.0
+    ) -> None:
+        self.store = store
+        self.base_seconds = base_seconds
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._log = FlushLog(log_dir) if log_dir else None
+        self._log_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._retained: List[Path] = []
+        self.likes = 0
+        self.unlikes = 0
+        self.flushes = 0
+        self.flushed_ops = 0
+
+    def _shard(self, post_id: int) -> _Shard:
+        return self._shards[post_id % len(self._shards)]
+
+    def toggle(self, liked_set: Set[int], user_id: str, post_id: int, liked: bool) -> Optional[int]:
+        # Returns the post's current like count, or None if there is no such post.
+        shard = self._shard(post_id)
+        with shard.lock:
+            now = time.monotonic()
+            base, read_at = shard.base.get(post_id, (None, 0.0))
+            if base is None or now - read_at > self.base_seconds:
+                base = self.store.like_counts([post_id]).get(post_id)
+                if base is None:
+                    return None
+                shard.base[post_id] = (base, now)
+            if (post_id in liked_set) != liked:
+                if liked:
+                    liked_set.add(post_id)
+                    self.likes += 1
+                else:
+                    liked_set.discard(post_id)
+                    self.unlikes += 1
+                shard.delta[post_id] = shard.delta.get(post_id, 0) + (1 if liked else -1)
+                shard.ops[(user_id, post_id)] = liked
+                if self._log is not None:
+                    with self._log_lock:
+                        self._log.append(user_id, post_id, liked)
+            return max(base + shard.delta.get(post_id, 0), 0)
+
+    def pending_for(self, user_id: str) -> Dict[int, bool]:
+        # Unflushed toggles by one user, for rebuilding their liked set from the store.
+        pending: Dict[int, bool] = {}
+        for shard in self._shards:
+            with shard.lock:
+                for (owner, post_id), liked in shard.ops.items():
+                    if owner == user_id:
+                        pending[post_id] = liked
+        return pending
+
+    def overlay(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Stored posts with unflushed likes added in (copies only where a count moved).
+        result = []
+        for post in posts:
+            delta = self._shard(post["id"]).delta.get(post["id"], 0)
+            result.append({**post, "like_count": max(post.get("like_count", 0) + delta, 0)} if delta else post)
+        return result
+
+    def flush(self) -> Dict[int, int]:
+        # Returns the stored like_count of every post touched since the last flush.
+        with self._flush_lock:
+            segment = None
+            orphans: List[Path] = []
+            if self._log is not None:
+                with self._log_lock:
+                    segment = self._log.rotate()
+                orphans = self._log.orphans()
+            ops: Dict[Tuple[str, int], bool] = {}
+            for path in orphans:
+                for user_id, post_id, liked in FlushLog.read(path):
+                    ops[(user_id, post_id)] = liked
+            taken = []
+            for shard in self._shards:
+                with shard.lock:
+                    taken.append((shard, shard.ops, shard.delta))
+                    shard.ops, shard.delta = {}, {}
+                for key, liked in taken[-1][1].items():
+                    ops.pop(key, None)
+                    ops[key] = liked
+            if segment is not None:
+                self._retained.append(segment)
+            if not ops:
+                self._discard(orphans)
+                return {}
+            try:
+                counts = self.store.apply_likes([(user_id, post_id, liked) for (user_id, post_id), liked in ops.items()])
+            except Exception:
+                # Put the batch back under anything toggled since; the log segments stay on disk,
+                # touched so they still read as this worker's rather than orphans.
+                if self._log is not None:
+                    self._log.keep(self._retained)
+                for shard, shard_ops, shard_delta in taken:
+                    with shard.lock:
+                        shard.ops = {**shard_ops, **shard.ops}
+                        for post_id, delta in shard_delta.items():
+                            shard.delta[post_id] = shard.delta.get(post_id, 0) + delta
+                raise
+            for post_id, count in counts.items():
+                shard = self._shard(post_id)
+                with shard.lock:
+                    shard.base[post_id] = (count, time.monotonic())
+                    if len(shard.base) > 4096:
+                        shard.base = {key: value for key, value in shard.base.items() if key in shard.delta}
+            self._discard(orphans)
+            self.flushes += 1
+            self.flushed_ops += len(ops)
+            return counts
+
+    def _discard(self, orphans: List[Path]) -> None:
+        for path in self._retained + orphans:
+            try:
+                path.unlink()
+            except OSError:
+                pass  # already replayed by another worker
+        self._retained = []
+
+    def close(self) -> None:
+        if self._log is not None:
+            self._log.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "likes": self.likes,
+            "unlikes": self.unlikes,
+            "pending": sum(len(shard.ops) for shard in self._shards),
+            "flushes": self.flushes,
+            "flushed_ops": self.flushed_ops,
+            "log": str(self._log.directory) if self._log is not None else None,
+        }
+
+
+__all__ = ["FlushLog", "LikeBook"]
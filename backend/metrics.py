@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import bisect
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool as _run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152)
+LLM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Labels:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, key)} {_number(value)}" for key, value in items]
+
+
+# A gauge is either set directly or read from `collect` at scrape time; `collect` returns a
+# number, or {label values: number} for a labelled gauge.
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, help: str, labels: Sequence[str] = (), collect: Optional[Callable[[], Any]] = None
+    ) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+        self._collect = collect
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        if self._collect is not None:
+            collected = self._collect()
+            values = collected if isinstance(collected, dict) else {(): collected}
+        else:
+            with self._lock:
+                values = dict(self._values)
+        return [
+            f"{self.name}{_label_text(self.labels, key if isinstance(key, tuple) else (key,))} {_number(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, List[float]] = {}  # per-bucket counts, then +Inf count, then sum
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[slot] += 1
+            series[-1] += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            running = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                running += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {_number(running)}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {_number(running)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = (), collect: Optional[Callable[[], Any]] = None) -> Gauge:
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        # Prometheus text exposition format, version 0.0.4.
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUESTS = REGISTRY.counter("memetrics_http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "memetrics_http_request_duration_seconds", "Time from request start to last response byte.", ("method", "route")
+)
+HTTP_REQUEST_SIZE = REGISTRY.histogram(
+    "memetrics_http_request_size_bytes", "Request body size.", ("method", "route"), SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = REGISTRY.histogram(
+    "memetrics_http_response_size_bytes", "Response body size as sent (after compression).", ("method", "route"), SIZE_BUCKETS
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge("memetrics_http_requests_in_flight", "Requests being served (open event streams included).")
+LLM_LATENCY = REGISTRY.histogram(
+    "memetrics_llm_request_duration_seconds", "Upstream LLM call time.", ("call", "outcome"), LLM_BUCKETS
+)
+LLM_TOKENS = REGISTRY.counter("memetrics_llm_tokens_total", "Tokens reported by the upstream LLM.", ("kind",))
+MITRA_REPLIES = REGISTRY.counter(
+    "memetrics_mitra_replies_total", "Mitra replies by source (openai, cache, rule, fallback, error, circuit_open, shed, rate_limited).",
+    ("endpoint", "source"),
+)
+THREADPOOL_WAIT = REGISTRY.histogram(
+    "memetrics_threadpool_queue_wait_seconds", "Time work waited for a threadpool thread.", ("task",)
+)
+
+
+async def run_in_threadpool(func: Callable[..., Any], *args: Any, task: Optional[str] = None) -> Any:
+    # starlette.concurrency.run_in_threadpool, recording how long the call queued for a thread.
+    submitted = time.perf_counter()
+    label = task or getattr(func, "__name__", "call")
+
+    def call() -> Any:
+        THREADPOOL_WAIT.observe(time.perf_counter() - submitted, task=label)
+        return func(*args)
+
+    return await _run_in_threadpool(call)
+
+
+# Opt-in sampling profiler: a daemon thread records every thread's stack each `interval`
+# seconds into a short ring, and slow requests dump the samples taken while they ran as folded
+# stacks ("thread;outer;...;inner count"), which flamegraph.pl and speedscope read directly.
+# Requests share the event loop, so a dump also holds whatever ran alongside the slow request.
+class SlowRequestProfiler:
+    def __init__(self, directory: str, threshold_seconds: float, interval: float = 0.005, keep: int = 50) -> None:
+        self.directory = Path(directory)
+        self.threshold = threshold_seconds
+        self.interval = interval
+        self.keep = keep
+        self._samples: Deque[Tuple[float, List[str]]] = deque(maxlen=max(int(30 / interval), 1))
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.dumps = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memetrics-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            stacks = []
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    parts.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                    frame = frame.f_back
+                parts.append(names.get(ident, str(ident)))
+                stacks.append(";".join(reversed(parts)))
+            self._samples.append((time.perf_counter(), stacks))
+
+    def finished(self, method: str, route: str, started: float, elapsed: float) -> Optional[Path]:
+        if self._thread is None or elapsed < self.threshold:
+            return None
+        folded: Dict[str, int] = {}
+        for taken, stacks in list(self._samples):
+            if started <= taken <= started + elapsed:
+                for stack in stacks:
+                    folded[stack] = folded.get(stack, 0) + 1
+        if not folded:
+            return None
+        slug = route.strip("/").replace("/", "_").replace("{", "").replace("}", "") or "root"
+        path = self.directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{elapsed * 1000:.0f}ms.folded"
+        path.write_text("".join(f"{stack} {count}\n" for stack, count in sorted(folded.items())), encoding="utf-8")
+        self.dumps += 1
+        for stale in sorted(self.directory.glob("*.folded"))[: -self.keep]:
+            stale.unlink(missing_ok=True)
+        return path
+
+
+# Per-route request metrics. The route label is the matched path template (/api/feed/{post_id}/like),
+# so a label is never created per URL; requests no route matched are counted as "unmatched".
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, profiler: Optional[SlowRequestProfiler] = None) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        started = time.perf_counter()
+        received = 0
+        sent = 0
+        status = 500
+        route = "unmatched"
+        HTTP_IN_FLIGHT.inc()
+
+        async def counting_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message: Message) -> None:
+            nonlocal sent, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            matched = scope.get("route")
+            if matched is not None:
+                route = getattr(matched, "path", route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            HTTP_REQUEST_SIZE.observe(received, method=method, route=route)
+            HTTP_RESPONSE_SIZE.observe(sent, method=method, route=route)
+            if self.profiler is not None:
+                self.profiler.finished(method, route, started, elapsed)
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "LLM_LATENCY",
+    "LLM_TOKENS",
+    "MITRA_REPLIES",
+    "MetricsMiddleware",
+    "REGISTRY",
+    "Registry",
+    "SlowRequestProfiler",
+    "THREADPOOL_WAIT",
+    "run_in_threadpool",
+]
@@ -0,0 +1,240 @@
+"""Weekly Mitra nudges for every stored user, generated offline.
+
+    python -m backend.nudges
+    python -m backend.nudges --week 2026-W42 --concurrency 32 --checkpoint backend/data/nudges-2026-W42.json
+
+Pages users out of the store in user_id order and builds a prompt from each user's band,
+latest achievements, post count and recent banking months. The prompts run through
+generate_mitra_reply on a bounded pool of async workers, and each reply is written to the user's
+notifications. Progress is checkpointed, so an interrupted run resumes where it stopped when
+started again for the same week. Users who already have that week's nudge are not sent a second
+one. To run it without a real model, point OPENAI_BASE_URL at scripts/stub_llm_server.py.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import deque
+from datetime import date
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from . import dvi
+from .config import settings
+from .metrics import run_in_threadpool
+from .services.llm_pool import CircuitOpenError
+from .services.mitra_llm import POOL, generate_mitra_reply
+from .state import STATE, STORE, deliver_notification
+
+
+def iso_week(today: Optional[date] = None) -> str:
+    year, week, _ = (today or date.today()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def nudge_title(week: str) -> str:
+    return f"Mitra's nudge for {week}"
+
+
+def build_prompt(profile: Dict[str, Any], activity: Dict[str, Any]) -> str:
+    tips = " ".join(STATE["mitra"]["tips"])
+    achievements = "; ".join(activity["achievements"]) or "none logged yet"
+    months = ", ".join(
+        f"{month} +{income:.0f}/-{spend:.0f}" for month, income, spend in activity["months"][-3:]
+    ) or "no recent transactions"
+    return (
+        f"Write this member's weekly nudge: two or three sentences in the spirit of these tips: {tips} "
+        f"Band: {profile.get('band') or 'unranked'}. Latest achievements: {achievements}. "
+        f"Posts shared: {activity['posts']}. Banking by month (income/spend): {months}."
+    )
+
+
+# Progress of one week's run. Users are dispatched in user_id order but finish out of order, so
+# the file keeps a low-water mark (everyone up to `cursor` is settled), the settled ids above it,
+# and the users whose nudge failed, which a resumed run retries first.
+class Checkpoint:
+    def __init__(self, path: Path, week: str, save_every: float = 2.0) -> None:
+        self.path = path
+        self.week = week
+        self.save_every = save_every
+        self.cursor: Optional[str] = None
+        self.done: Set[str] = set()
+        self.failed: Set[str] = set()
+        self._pending: Deque[str] = deque()
+        self._saved = time.monotonic()
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("week") == week:
+                self.cursor = data.get("cursor")
+                self.done = set(data.get("done", []))
+                self.failed = set(data.get("failed", []))
+
+    def dispatched(self, user_id: str) -> None:
+        self._pending.append(user_id)
+
+    def settle(self, user_id: str, ok: bool, retry: bool = False) -> None:
+        if ok:
+            self.failed.discard(user_id)
+        else:
+            self.failed.add(user_id)
+        if retry:
+            return
+        self.done.add(user_id)
+        while self._pending and self._pending[0] in self.done:
+            self.cursor = self._pending.popleft()
+            self.done.discard(self.cursor)
+        self.save()
+
+    def save(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._saved < self.save_every:
+            return
+        self._saved = now
+        data = {"week": self.week, "cursor": self.cursor, "done": sorted(self.done), "failed": sorted(self.failed)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self.path.with_suffix(".tmp")
+        partial.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(partial, self.path)
+
+
+def _has_nudge(user_id: str, title: str) -> bool:
+    return any(item.get("title") == title for item in STORE.list_notifications(user_id))
+
+
+async def _nudge_reply(profile: Dict[str, Any], activity: Dict[str, Any]) -> str:
+    prompt = build_prompt(profile, activity)
+    while True:
+        try:
+            reply, _ = await generate_mitra_reply(
+                prompt, profile["user_id"], profile.get("region") or "Global", int(profile.get("dvi") or 0)
+            )
+            return reply
+        except CircuitOpenError:
+            # Half-open lets a single probe through; the other workers wait for its verdict.
+            if POOL.breaker.state != "half_open":
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def run(
+    week: str, checkpoint_path: Path, concurrency: int, page_size: int = 500, limit: Optional[int] = None
+) -> Dict[str, Any]:
+    checkpoint = Checkpoint(checkpoint_path, week)
+    title = nudge_title(week)
+    since = dvi.window_start()
+    queue: "asyncio.Queue[Optional[tuple[Dict[str, Any], Dict[str, Any], bool]]]" = asyncio.Queue(concurrency * 2)
+    stop = asyncio.Event()
+    counts = {"written": 0, "skipped": 0, "failed": 0}
+    errors: List[str] = []
+
+    async def enqueue(profiles: List[Dict[str, Any]], retry: bool) -> None:
+        user_ids = [profile["user_id"] for profile in profiles]
+        activity = await run_in_threadpool(STORE.nudge_inputs, user_ids, since, task="nudges")
+        for profile in profiles:
+            if stop.is_set():
+                return
+            if not retry:
+                checkpoint.dispatched(profile["user_id"])
+            await queue.put((profile, activity[profile["user_id"]], retry))
+
+    async def produce() -> None:
+        # Users that failed last time first, then everyone past the checkpoint.
+        retries = [STORE.get_user(user_id) for user_id in sorted(checkpoint.failed)]
+        await enqueue([profile for profile in retries if profile], retry=True)
+        after, sent = checkpoint.cursor, 0
+        while not stop.is_set() and (limit is None or sent < limit):
+            profiles = await run_in_threadpool(STORE.list_users, after, page_size, task="nudges")
+            if not profiles:
+                break
+            after = profiles[-1]["user_id"]
+            fresh = [profile for profile in profiles if profile["user_id"] not in checkpoint.done]
+            if limit is not None:
+                fresh = fresh[: limit - sent]
+            sent += len(fresh)
+            await enqueue(fresh, retry=False)
+
+    async def work() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if stop.is_set():
+                # Drain without running, so the producer is never left blocked on a full queue.
+                continue
+            profile, activity, retry = item
+            user_id = profile["user_id"]
+            try:
+                # Checked on every run, not only resumed ones: a run that died before its first
+                # checkpoint, or one started with a new --checkpoint, has no record of who was sent.
+                if await run_in_threadpool(_has_nudge, user_id, title, task="nudges"):
+                    counts["skipped"] += 1
+                else:
+                    reply = await _nudge_reply(profile, activity)
+                    await run_in_threadpool(deliver_notification, user_id, title, reply, task="nudges")
+                    counts["written"] += 1
+            except CircuitOpenError as exc:
+                # The model is down: stop here, and leave this user for the resumed run.
+                errors.append(str(exc))
+                stop.set()
+                continue
+            except Exception as exc:
+                counts["failed"] += 1
+                if len(errors) < 5:
+                    errors.append(f"{user_id}: {exc.__class__.__name__}: {exc}")
+                checkpoint.settle(user_id, False, retry)
+                continue
+            checkpoint.settle(user_id, True, retry)
+
+    started = time.perf_counter()
+    workers = [asyncio.create_task(work()) for _ in range(max(concurrency, 1))]
+    try:
+        await produce()
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        checkpoint.save(force=True)
+    seconds = time.perf_counter() - started
+    processed = sum(counts.values())
+    return {
+        "week": week,
+        **counts,
+        "complete": not stop.is_set(),
+        "cursor": checkpoint.cursor,
+        "seconds": round(seconds, 2),
+        "users_per_sec": round(processed / seconds, 1) if seconds else 0.0,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--week", default=iso_week(), help="ISO week the nudges are for, e.g. 2026-W42")
+    parser.add_argument("--checkpoint", type=Path, help="defaults to nudges-<week>.json next to the database")
+    parser.add_argument("--concurrency", type=int, default=settings.nudge_concurrency)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--limit", type=int, help="stop after this many users (for trial runs)")
+    args = parser.parse_args()
+    if not settings.openai_api_key:
+        sys.exit("OPENAI_API_KEY is not set; point OPENAI_BASE_URL at scripts/stub_llm_server.py to run without a model")
+    checkpoint = args.checkpoint or Path(settings.database_path).parent / f"nudges-{args.week}.json"
+
+    async def go() -> Dict[str, Any]:
+        try:
+            return await run(args.week, checkpoint, args.concurrency, args.page_size, args.limit)
+        finally:
+            await POOL.aclose()
+
+    report = asyncio.run(go())
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["complete"] and not report["failed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Per-field weight of a term occurrence; titles and tags say more than the summary.
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "org": 1.5, "summary": 1.0, "type": 1.0}
+# Personal boosts stay below a strong text match so the query still decides what is relevant.
+SKILL_WEIGHT = 1.5
+REGION_WEIGHT = 1.0
+BAND_WEIGHT = 1.0
+NO_DEADLINE = date.max.toordinal()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+def _deadline_days(value: Optional[str]) -> int:
+    if not value:
+        return NO_DEADLINE
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return NO_DEADLINE
+
+
+def _terms(opportunity: Dict[str, Any]) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for name, weight in FIELD_WEIGHTS.items():
+        value = opportunity.get(name) or ""
+        text = " ".join(value) if isinstance(value, (list, tuple)) else str(value)
+        for token in tokenize(text):
+            weights[token] = weights.get(token, 0.0) + weight
+    for region in opportunity.get("regions") or ():
+        for token in tokenize(region):
+            weights.setdefault(token, 0.0)
+    return weights
+
+
+# One term's postings: Python lists take appends, the NumPy arrays are rebuilt on the next
+# query after a change.
+class _Postings:
+    __slots__ = ("slots", "weights", "_arrays")
+
+    def __init__(self) -> None:
+        self.slots: List[int] = []
+        self.weights: List[float] = []
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def add(self, slot: int, weight: float) -> None:
+        self.slots.append(slot)
+        self.weights.append(weight)
+        self._arrays = None
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = (np.array(self.slots, dtype=np.int64), np.array(self.weights, dtype=np.float32))
+        return self._arrays
+
+
+# Inverted index over title/org/summary/tags with per-slot type and deadline columns and
+# postings per min_dvi gate. Each version of an opportunity gets a fresh slot; replaced and removed slots are
+# masked out and reclaimed by compaction once they make up half the index.
+class OpportunityIndex:
+    def __init__(self, opportunities: Iterable[Dict[str, Any]] = ()) -> None:
+        self._lock = threading.RLock()
+        self._reset()
+        self.extend(opportunities)
+
+    def _reset(self) -> None:
+        self._docs: List[Optional[Dict[str, Any]]] = []
+        self._slot_of: Dict[str, int] = {}
+        self._postings: Dict[str, _Postings] = {}
+        self._type_codes: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._type = np.zeros(0, dtype=np.int32)
+        self._deadline = np.zeros(0, dtype=np.int32)
+        # Slots gated behind each distinct min_dvi, so band scoring only touches gated slots.
+        self._gates: Dict[int, _Postings] = {}
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def _grow(self, needed: int) -> None:
+        size = len(self._alive)
+        if needed <= size:
+            return
+        extra = max(needed - size, size, 64)
+        self._alive = np.pad(self._alive, (0, extra))
+        self._type = np.pad(self._type, (0, extra), constant_values=-1)
+        self._deadline = np.pad(self._deadline, (0, extra), constant_values=NO_DEADLINE)
+
+    def _type_code(self, value: str) -> int:
+        return self._type_codes.setdefault(value.casefold(), len(self._type_codes))
+
+    def _insert(self, opportunity: Dict[str, Any]) -> None:
+        previous = self._slot_of.get(opportunity["id"])
+        if previous is not None:
+            self._alive[previous] = False
+            self._docs[previous] = None
+            self._live -= 1
+        slot = len(self._docs)
+        self._grow(slot + 1)
+        self._docs.append(opportunity)
+        self._slot_of[opportunity["id"]] = slot
+        self._alive[slot] = True
+        self._type[slot] = self._type_code(str(opportunity.get("type") or ""))
+        self._deadline[slot] = _deadline_days(opportunity.get("deadline"))
+        min_dvi = int(opportunity.get("min_dvi") or 0)
+        if min_dvi > 0:
+            gate = self._gates.get(min_dvi)
+            if gate is None:
+                gate = self._gates[min_dvi] = _Postings()
+            gate.add(slot, 1.0)
+        for term, weight in _terms(opportunity).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.add(slot, weight)
+        self._live += 1
+
+    def extend(self, opportunities: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for opportunity in opportunities:
+                self._insert(opportunity)
+
+    def upsert(self, opportunity: Dict[str, Any]) -> None:
+        with self._lock:
+            self._insert(opportunity)
+            self._maybe_compact()
+
+    def remove(self, opportunity_id: str) -> bool:
+        with self._lock:
+            slot = self._slot_of.pop(opportunity_id, None)
+            if slot is None:
+                return False
+            self._alive[slot] = False
+            self._docs[slot] = None
+            self._live -= 1
+            self._maybe_compact()
+            return True
+
+    def _maybe_compact(self) -> None:
+        if len(self._docs) >= 1024 and self._live * 2 < len(self._docs):
+            live = self.items()
+            self._reset()
+            self.extend(live)
+
+    def get(self, opportunity_id: str) -> Optional[Dict[str, Any]]:
+        slot = self._slot_of.get(opportunity_id)
+        return self._docs[slot] if slot is not None else None
+
+    def items(self) -> List[Dict[str, Any]]:
+        return [doc for doc in self._docs if doc is not None]
+
+    def _boost(self, scores: np.ndarray, tokens: Iterable[str], weight: float) -> None:
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is not None:
+                scores[postings.arrays()[0]] += weight
+
+    def search(
+        self,
+        q: str = "",
+        type: Optional[str] = None,
+        before: Optional[date] = None,
+        limit: int = 20,
+        profile: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            size = len(self._docs)
+            if not size or limit <= 0:
+                return []
+            scores = np.zeros(size, dtype=np.float64)
+            mask: Optional[np.ndarray] = None
+            terms = list(dict.fromkeys(tokenize(q)))
+            if terms:
+                mask = np.zeros(size, dtype=bool)
+                for term in terms:
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        continue
+                    slots, weights = postings.arrays()
+                    idf = math.log(1.0 + (self._live - len(slots) + 0.5) / (len(slots) + 0.5))
+                    scores[slots] += weights * idf
+                    mask[slots] = True
+            if type:
+                code = self._type_codes.get(type.casefold())
+                if code is None:
+                    return []
+                matches = self._type[:size] == code
+                mask = matches if mask is None else mask & matches
+            if before is not None:
+                matches = self._deadline[:size] <= before.toordinal()
+                mask = matches if mask is None else mask & matches
+            if profile:
+                skills = {token for skill in profile.get("skills") or () for token in tokenize(str(skill))}
+                if skills:
+                    self._boost(scores, skills, SKILL_WEIGHT / len(skills))
+                self._boost(scores, set(tokenize(str(profile.get("region") or ""))), REGION_WEIGHT)
+                dvi = int(profile.get("dvi") or 0)
+                for min_dvi, gate in self._gates.items():
+                    scores[gate.arrays()[0]] += BAND_WEIGHT if dvi >= min_dvi else -BAND_WEIGHT
+            # Best score first; equal scores go to the closest deadline (at most ~4e-6 of key).
+            if mask is None:
+                keys = self._deadline[:size] * 1e-12 - scores
+                if self._live < size:
+                    keys[~self._alive[:size]] = np.inf
+                candidates = None
+                count = self._live
+            else:
+                candidates = np.flatnonzero(mask & self._alive[:size])
+                keys = self._deadline[candidates] * 1e-12 - scores[candidates]
+                count = len(candidates)
+            if not count:
+                return []
+            if len(keys) > limit:
+                top = np.argpartition(keys, limit - 1)[:limit]
+            else:
+                top = np.arange(len(keys))
+            top = top[np.argsort(keys[top], kind="stable")]
+            top = top[np.isfinite(keys[top])]
+            slots = top if candidates is None else candidates[top]
+            return [{**self._docs[slot], "score": round(float(scores[slot]), 3)} for slot in slots]
+
+    def stats(self) -> Dict[str, int]:
+        return {"opportunities": self._live, "slots": len(self._docs), "terms": len(self._postings)}
+
+
+__all__ = ["OpportunityIndex", "tokenize"]
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+Deliver = Callable[[Dict[str, Any]], None]
+
+
+def user_topic(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+# Moves published events to every worker's hub. `publish` may be called from any thread;
+# `deliver` is handed to the broker by Hub.start and must be called for each event once per worker.
+class Broker:
+    name = "base"
+
+    async def start(self, deliver: Deliver) -> None:
+        raise NotImplementedError
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+
+# Single process: events go straight to the local hub.
+class LocalBroker(Broker):
+    name = "local"
+
+    def __init__(self) -> None:
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        if self._deliver is not None:
+            self._deliver(event)
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+
+# Stand-in for a real broker when several uvicorn workers share one SQLite file: publishers
+# append to an events table and every worker tails it from the id it started at.
+class SQLiteBroker(Broker):
+    name = "sqlite"
+
+    def __init__(self, path: str, poll_seconds: float = 0.25, retention_seconds: float = 300.0) -> None:
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_id = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, created REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    async def start(self, deliver: Deliver) -> None:
+        with self._lock:
+            row = self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()
+        self._last_id = row[0]
+        self._task = asyncio.create_task(self._tail(deliver))
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        payload = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self._connection().execute("INSERT INTO events (created, payload) VALUES (?, ?)", (time.time(), payload))
+
+    def _fetch(self) -> List[tuple]:
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute("SELECT id, payload FROM events WHERE id > ? ORDER BY id", (self._last_id,)).fetchall()
+            if rows and rows[-1][0] % 1000 < len(rows):
+                conn.execute("DELETE FROM events WHERE created < ?", (time.time() - self.retention_seconds,))
+        return rows
+
+    async def _tail(self, deliver: Deliver) -> None:
+        while True:
+            try:
+                rows = await asyncio.to_thread(self._fetch)
+            except sqlite3.Error:
+                rows = []
+            for event_id, payload in rows:
+                self._last_id = event_id
+                deliver(json.loads(payload))
+            await asyncio.sleep(self.poll_seconds)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def open_broker(backend: str, path: str) -> Broker:
+    if backend == "local":
+        return LocalBroker()
+    if backend == "sqlite":
+        return SQLiteBroker(path)
+    raise ValueError(f"Unknown broker backend: {backend!r}")
+
+
+# One connected client. The queue is bounded: a client that falls `maxsize` events behind is
+# dropped (it reconnects and refetches) instead of growing memory or stalling the publishers.
+class Subscription:
+    def __init__(self, topics: Iterable[str], maxsize: int) -> None:
+        self.topics: Set[str] = set(topics)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        # None on timeout, so the caller can send a keepalive.
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# Fans broker events out to the subscriptions on this worker's event loop.
+class Hub:
+    def __init__(self, broker: Broker, queue_size: int = 256) -> None:
+        self.broker = broker
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._listeners: Dict[str, List[Deliver]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[int] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.get_ident()
+        await self.broker.start(self._deliver)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+        self._loop = None
+        self._thread = None
+
+    def publish(self, topic: str, type: str, data: Dict[str, Any]) -> None:
+        # Safe from the event loop and from threadpool workers; a no-op until the hub is started.
+        if self._loop is None:
+            return
+        self.published += 1
+        self.broker.publish({"topic": topic, "type": type, "data": data})
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        if threading.get_ident() == self._thread:
+            self._fanout(event)
+        else:
+            loop.call_soon_threadsafe(self._fanout, event)
+
+    def _fanout(self, event: Dict[str, Any]) -> None:
+        topic = event.get("topic")
+        for listener in self._listeners.get(topic, ()):
+            listener(event)
+        for subscription in list(self._subscriptions):
+            if topic not in subscription.topics:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                subscription.dropped = True
+                self._subscriptions.discard(subscription)
+                self.dropped += 1
+
+    def listen(self, topic: str, listener: Deliver) -> None:
+        # In-process consumer rather than a client: called on the event loop for each event on `topic`,
+        # including this worker's own.
+        self._listeners.setdefault(topic, []).append(listener)
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        subscription = Subscription(topics, self.queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "broker": self.broker.name,
+            "subscribers": len(self._subscriptions),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+__all__ = ["Broker", "Hub", "LocalBroker", "SQLiteBroker", "Subscription", "open_broker", "user_topic"]
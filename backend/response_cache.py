@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .fast_json import dumps
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are only gzip-compressed
+    brotli = None
+
+GZIP_MIN_BYTES = 512
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    version: int
+    etag: str
+    body: bytes
+    gzipped: bytes | None
+    brotli: bytes | None = None
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = [part.strip() for part in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    # Each encoding of a body is a different representation, so it needs its own strong tag.
+    return etag if encoding is None else f'{etag[:-1]}-{encoding}"'
+
+
+def pick_encoding(header: str, offered: Tuple[str, ...] = ("br", "gzip")) -> Optional[str]:
+    # Best of `offered` (in server preference order) that Accept-Encoding allows; None for identity.
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token.strip().lower()] = quality
+    wildcard = weights.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in offered:
+        quality = weights.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encode_body(payload: Any) -> bytes:
+    return dumps(payload)
+
+
+# Serialized JSON bodies (plain, gzip and brotli) keyed by state section and reused until the
+# section's version counter in state.py moves.
+class ResponseCache:
+    def __init__(self, version_of: Callable[[str], int]) -> None:
+        self._version_of = version_of
+        self._entries: Dict[str, CachedBody] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def entry(self, section: str, build: Callable[[], Any]) -> CachedBody:
+        version = self._version_of(section)
+        cached = self._entries.get(section)
+        if cached is not None and cached.version == version:
+            self.hits += 1
+            return cached
+        with self._lock:
+            cached = self._entries.get(section)
+            if cached is not None and cached.version == version:
+                self.hits += 1
+                return cached
+            body = encode_body(build())
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            gzipped = compressed = None
+            if len(body) >= GZIP_MIN_BYTES:
+                gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+                if brotli is not None:
+                    compressed = brotli.compress(body, quality=11)
+            cached = CachedBody(version, etag, body, gzipped, compressed)
+            self._entries[section] = cached
+            self.misses += 1
+            return cached
+
+    def respond(self, request: Request, section: str, build: Callable[[], Any]) -> Response:
+        cached = self.entry(section, build)
+        offered = tuple(name for name, body in (("br", cached.brotli), ("gzip", cached.gzipped)) if body is not None)
+        encoding = pick_encoding(request.headers.get("accept-encoding", ""), offered) if offered else None
+        etag = encoded_etag(cached.etag, encoding)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match", ""), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+            body = cached.brotli if encoding == "br" else cached.gzipped
+            return Response(body, media_type="application/json", headers=headers)
+        return Response(cached.body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "not_modified": self.not_modified}
+
+
+# Compresses JSON bodies of at least `minimum_size` bytes with the best encoding the client
+# accepts (br, then gzip). Responses that already carry a Content-Encoding (the section cache,
+# static assets) and streamed responses pass through untouched.
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 5, brotli_quality: int = 4) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.offered = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = pick_encoding(accept, self.offered) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: dict = {}
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                eligible = (
+                    headers.get(b"content-type", b"").startswith(b"application/json")
+                    and b"content-encoding" not in headers
+                )
+                if not eligible:
+                    start = {}
+                    await send(message)
+                    return
+                start = message
+                return
+            if not start:
+                await send(message)
+                return
+            # A JSON response built in one piece; anything streamed is passed on as is.
+            body = message.get("body", b"")
+            if message.get("more_body") or len(body) < self.minimum_size:
+                await send(start)
+                start = {}
+                await send(message)
+                return
+            if encoding == "br":
+                body = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                body = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+            headers = [(k, v) for k, v in start.get("headers", []) if k != b"content-length"]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": headers})
+            start = {}
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+__all__ = [
+    "CachedBody",
+    "CompressionMiddleware",
+    "ResponseCache",
+    "encode_body",
+    "encoded_etag",
+    "etag_matches",
+    "pick_encoding",
+]
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+# Response shapes of the /api endpoints. Routes declare them as response_model for the OpenAPI
+# schema; bodies are encoded straight from the handlers' dicts (see fast_json.FastJSONRoute), so
+# these are never instantiated on the request path.
+class Schema(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+class Post(Schema):
+    id: int
+    user_id: str
+    display_name: str
+    dvi: int = 0
+    text: str
+    created_at: str
+    like_count: int = 0
+    liked: bool = False
+
+
+class FeedPage(Schema):
+    items: List[Post]
+    next_before: Optional[int] = None
+
+
+class FeedHit(Post):
+    score: Optional[float] = None
+
+
+class FeedSearch(Schema):
+    items: List[FeedHit]
+    count: int
+
+
+class PostCreated(Schema):
+    post: Post
+    ok: bool = True
+
+
+class LikeResult(Schema):
+    post_id: int
+    liked: bool
+    like_count: int
+
+
+class User(Schema):
+    user_id: str
+    name: str
+    role: Optional[str] = None
+    region: str = "Global"
+    dvi: Optional[int] = None
+    band: Optional[str] = None
+    headline: Optional[str] = None
+    about: Optional[str] = None
+    skills: List[str] = []
+
+
+class Login(Schema):
+    user: User
+
+
+class Achievement(Schema):
+    id: Optional[int] = None
+    title: str
+    year: int
+
+
+class Profile(Schema):
+    user: User
+    achievements: List[Achievement]
+    notifications: List[Dict[str, Any]]
+
+
+class AchievementCreated(Schema):
+    achievement: Achievement
+    ok: bool = True
+
+
+class OpportunitySearch(Schema):
+    items: List[Dict[str, Any]]
+    count: int
+
+
+class OpportunitySaved(Schema):
+    opportunity: Dict[str, Any]
+    ok: bool = True
+
+
+class Ok(Schema):
+    ok: bool = True
+
+
+class Banking(Schema):
+    iban_like: Optional[str] = None
+    balance: float
+    income: float
+    spend: float
+    categories: Dict[str, float]
+    transaction_count: int
+    window_30d: Dict[str, Any]
+    transactions: List[Dict[str, Any]]
+
+
+class BankingBucket(Schema):
+    start: str
+    income: float
+    spend: float
+    net: float
+    count: int
+
+
+class BankingSummary(Schema):
+    bucket: str
+    income: float
+    spend: float
+    net: float
+    count: int
+    buckets: List[BankingBucket]
+
+
+class ImportResult(Schema):
+    format: str
+    lines: int
+    accepted: int
+    inserted: int
+    duplicates: int
+    rejected: int
+    rejected_lines: List[Dict[str, Any]]
+    batches: int
+
+
+class HistoryPoint(Schema):
+    t: str
+    level: float
+    amount: Optional[float] = None
+    inflow: Optional[float] = None
+    events: Optional[int] = None
+
+
+class InvestorHistory(Schema):
+    resolution: str
+    fund: Optional[str] = None
+    metric: str
+    points: List[HistoryPoint]
+
+
+class FundingEvent(Schema):
+    id: int
+    fund_id: str
+    sponsor: str = ""
+    amount: float
+    timestamp: str
+
+
+class MitraReply(Schema):
+    reply: str
+    suggestions: List[str]
+    source: str
+    detail: Optional[str] = None
+
+
+class RescoreResult(Schema):
+    users: int
+    changed: int
+    seconds: float
+
+
+# Shapes before any ?fields= trimming.
+class Bootstrap(Schema):
+    manifesto: Optional[Dict[str, Any]] = None
+    profile: Optional[Profile] = None
+    feed: Optional[FeedPage] = None
+    opportunities: Optional[Dict[str, Any]] = None
+    banking: Optional[Banking] = None
+    investor: Optional[Dict[str, Any]] = None
+    investor_history: Optional[InvestorHistory] = None
+    mitra: Optional[Dict[str, Any]] = None
+    errors: Optional[Dict[str, str]] = None
+
+
+class RuleEvalResult(Schema):
+    results: List[Dict[str, Any]]
+    count: int
+    elapsed_ms: float
+    rules: Dict[str, Any]
+
+
+__all__ = [
+    "Achievement",
+    "AchievementCreated",
+    "Banking",
+    "BankingSummary",
+    "Bootstrap",
+    "FeedPage",
+    "FundingEvent",
+    "ImportResult",
+    "InvestorHistory",
+    "LikeResult",
+    "Login",
+    "MitraReply",
+    "Ok",
+    "OpportunitySaved",
+    "OpportunitySearch",
+    "Post",
+    "PostCreated",
+    "Profile",
+    "RescoreResult",
+    "RuleEvalResult",
+]
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+# Lower runs first: signed-in members ahead of anonymous visitors.
+PRIORITY_MEMBER = 0
+PRIORITY_GUEST = 1
+
+
+class Shed(Exception):
+    pass
+
+
+# Per-key token buckets: `burst` requests at once, refilled at `rate` per second. Only the most
+# recently seen `max_keys` keys are tracked. A rate of 0 disables limiting.
+class RateLimiter:
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self.limited = 0
+
+    def allow(self, key: str) -> bool:
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        else:
+            self.limited += 1
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed
+
+
+# Bounded, priority-ordered admission for upstream LLM work. At most `concurrency` holders run at
+# once and at most `max_waiting` wait; a full queue sheds the newcomer, or the lowest-priority
+# waiter when the newcomer outranks it, and a waiter that is not admitted within `timeout` is shed
+# too. Shed callers get Shed immediately instead of queueing behind work they would time out on.
+class AdmissionQueue:
+    def __init__(self, concurrency: int, max_waiting: int, timeout: float) -> None:
+        self.concurrency = max(concurrency, 1)
+        self.max_waiting = max(max_waiting, 0)
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.shed = 0
+        self.timeouts = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_GUEST) -> AsyncIterator[None]:
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_waiting:
+            worst = max(self._waiters) if self._waiters else None
+            if worst is None or worst[0] <= priority:
+                self.shed += 1
+                raise Shed("Mitra queue is full")
+            self._discard(worst)
+            worst[2].set_exception(Shed("Mitra queue is full"))
+            self.shed += 1
+        entry = (priority, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        future = entry[2]
+        try:
+            await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self._discard(entry)
+            self.timeouts += 1
+            self.shed += 1
+            raise Shed("Timed out waiting for Mitra capacity") from None
+        except asyncio.CancelledError:
+            # Handed a slot just as the caller went away: pass it on.
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self._release()
+            else:
+                self._discard(entry)
+            raise
+        self.admitted += 1
+
+    def _discard(self, entry: Tuple[int, int, asyncio.Future]) -> None:
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+
+    def _release(self) -> None:
+        # The slot moves straight to the best waiter, so `active` only drops when nobody waits.
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "concurrency": self.concurrency,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timeouts": self.timeouts,
+        }
+
+
+__all__ = ["AdmissionQueue", "PRIORITY_GUEST", "PRIORITY_MEMBER", "RateLimiter", "Shed"]
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..metrics import LLM_LATENCY, LLM_TOKENS, run_in_threadpool
+
+# openai is by far the slowest import in the app, so it is only loaded (off the event loop) when the
+# first call needs a client; until then, whether it is installed is all that is checked.
+OPENAI_INSTALLED = importlib.util.find_spec("openai") is not None
+_client_class: Any = None
+
+
+def _import_client_class() -> Any:
+    from openai import AsyncOpenAI  # pip install openai
+
+    return AsyncOpenAI
+
+
+class LLMUnavailable(RuntimeError):
+    pass
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+# closed -> open after `failure_threshold` consecutive failures (errors, timeouts or calls
+# slower than `slow_call_seconds`); open -> half_open after `reset_seconds`, where a
+# single probe call decides whether to close again or re-open.
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, slow_call_seconds: float = 10.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                self.rejected += 1
+                return False
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.rejected += 1
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self, latency: float) -> None:
+        if latency > self.slow_call_seconds:
+            self.record_failure()
+            return
+        self.failures = 0
+        self.state = "closed"
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        # A cancelled call says nothing about upstream health; let the next request probe.
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = 0.0
+        if self.state == "open":
+            retry_in = max(0.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "retry_in_seconds": round(retry_in, 1),
+        }
+
+
+def _outcome(exc: Exception) -> str:
+    return "timeout" if isinstance(exc, asyncio.TimeoutError) else "error"
+
+
+def _record_usage(usage: Any) -> None:
+    if usage is None:
+        return
+    LLM_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, kind="prompt")
+    LLM_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, kind="completion")
+
+
+# One AsyncOpenAI client (and connection pool) per event loop, shared by every chat
+# request, with a concurrency cap, a per-call deadline and a circuit breaker.
+class LLMPool:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        timeout_seconds: float = 15.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url or None
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self._client: Any = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_flight = 0
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key) and OPENAI_INSTALLED
+
+    async def _ensure(self) -> None:
+        global _client_class
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._client is not None:
+            return
+        if not self.configured:
+            raise RuntimeError("OPENAI_API_KEY not set or openai not installed")
+        if _client_class is None:
+            try:
+                _client_class = await run_in_threadpool(_import_client_class, task="openai_import")
+            except Exception as exc:
+                raise RuntimeError("OPENAI_API_KEY not set or openai not installed") from exc
+            if self._loop is loop and self._client is not None:
+                return
+        self._client = _client_class(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            timeout=self.timeout_seconds,
+            max_retries=0,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._loop = loop
+
+    async def _admit(self) -> None:
+        await self._ensure()
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+    async def complete(self, messages: List[Dict[str, str]], **params: Any) -> str:
+        await self._admit()
+        assert self._semaphore is not None
+        async with self._semaphore:
+            self.in_flight += 1
+            started = time.monotonic()
+            try:
+                resp = await asyncio.wait_for(
+                    self._client.chat.completions.create(model=self.model, messages=messages, **params),
+                    timeout=self.timeout_seconds,
+                )
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            except Exception as exc:
+                self.breaker.record_failure()
+                LLM_LATENCY.observe(time.monotonic() - started, call="complete", outcome=_outcome(exc))
+                raise LLMUnavailable(f"LLM call failed: {exc.__class__.__name__}") from exc
+            finally:
+                self.in_flight -= 1
+            elapsed = time.monotonic() - started
+            self.breaker.record_success(elapsed)
+            LLM_LATENCY.observe(elapsed, call="complete", outcome="ok")
+            _record_usage(getattr(resp, "usage", None))
+        return resp.choices[0].message.content or ""
+
+    async def stream(self, messages: List[Dict[str, str]], **params: Any) -> AsyncIterator[str]:
+        await self._admit()
+        assert self._semaphore is not None
+        async with self._semaphore:
+            self.in_flight += 1
+            started = time.monotonic()
+            deadline = started + self.timeout_seconds
+            completed = False
+            stream = None
+            try:
+                stream = await asyncio.wait_for(
+                    self._client.chat.completions.create(model=self.model, messages=messages, stream=True, **params),
+                    timeout=self.timeout_seconds,
+                )
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(0.0, deadline - time.monotonic()))
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices:
+                        yield chunk.choices[0].delta.content or ""
+                    _record_usage(getattr(chunk, "usage", None))
+                completed = True
+            except (asyncio.CancelledError, GeneratorExit):
+                self.breaker.release_probe()
+                raise
+            except Exception as exc:
+                self.breaker.record_failure()
+                LLM_LATENCY.observe(time.monotonic() - started, call="stream", outcome=_outcome(exc))
+                raise LLMUnavailable(f"LLM stream failed: {exc.__class__.__name__}") from exc
+            finally:
+                self.in_flight -= 1
+                if stream is not None:
+                    await stream.close()
+                if completed:
+                    self.breaker.record_success(time.monotonic() - started)
+                    LLM_LATENCY.observe(time.monotonic() - started, call="stream", outcome="ok")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+        self._loop = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "configured": self.configured,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout_seconds,
+            "breaker": self.breaker.snapshot(),
+        }
+
+
+__all__ = ["CircuitBreaker", "CircuitOpenError", "LLMPool", "LLMUnavailable"]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+_PUNCT = re.compile(r"[^\w\s]+", re.UNICODE)
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    text = _PUNCT.sub(" ", message.casefold())
+    return _SPACE.sub(" ", text).strip()
+
+
+# TTL + LRU cache of Mitra replies with single-flight: while one upstream call for a key
+# is running, identical requests wait on its future instead of starting their own.
+class ReplyCache:
+    def __init__(self, ttl_seconds: float = 3600.0, max_entries: int = 2048) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def inflight(self, key: Hashable) -> Optional[asyncio.Future]:
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        return future
+
+    def lead(self, key: Hashable) -> asyncio.Future:
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def settle(self, key: Hashable, value: Any = None, error: Optional[BaseException] = None) -> None:
+        future = self._inflight.pop(key, None)
+        if error is None:
+            self.put(key, value)
+        elif not isinstance(error, Exception):
+            # The leader's client went away; followers should fall back, not be cancelled.
+            error = RuntimeError("Coalesced Mitra call was cancelled")
+        if future is None or future.done():
+            return
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+            # Followers re-raise it; this keeps asyncio quiet when there are none.
+            future.exception()
+
+    async def get_or_compute(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        value = self.get(key)
+        if value is not None:
+            return value, "hit"
+        future = self.inflight(key)
+        if future is not None:
+            return await asyncio.shield(future), "coalesced"
+        self.lead(key)
+        try:
+            value = await factory()
+        except BaseException as exc:
+            self.settle(key, error=exc)
+            raise
+        self.settle(key, value)
+        return value, "miss"
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+__all__ = ["ReplyCache", "normalize_message"]
@@ -1,12 +1,9 @@
-﻿import os, json
-from typing import Tuple, List
+﻿import json
+from typing import AsyncIterator, List, Optional, Tuple
 
-try:
-    from openai import OpenAI  # pip install openai
-except Exception:
-    OpenAI = None
-
-DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+from ..config import settings
+from .llm_pool import CircuitBreaker, LLMPool
+from .mitra_memory import History
 
 SYSTEM_PROMPT = """You are Mitra, a warm, practical career and opportunity coach inside the MeMetrics app.
 Return concise, supportive, actionable replies.
@@ -15,34 +12,144 @@ Always respond in strict JSON with:
 - suggestions: list of up to 4 strings.
 """
 
+# The completion was not the JSON object asked for. Callers fall back to the rule-based coach
+# rather than show (or cache) an apology in its place.
+class UnparseableReply(RuntimeError):
+    pass
+
+POOL = LLMPool(
+    api_key=settings.openai_api_key,
+    model=settings.openai_model,
+    base_url=settings.openai_base_url,
+    max_concurrency=settings.llm_max_concurrency,
+    timeout_seconds=settings.llm_timeout_seconds,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.llm_breaker_failures,
+        reset_seconds=settings.llm_breaker_reset_seconds,
+        slow_call_seconds=settings.llm_slow_call_seconds,
+    ),
+)
+
+
+def _messages(
+    message: str, user_id: str, region: str, dvi: int, band: Optional[str] = None, history: Optional[History] = None
+) -> List[dict]:
+    # With a band the prompt is user-agnostic, so the reply can be shared by everyone in it.
+    if band:
+        user_context = f"Audience: members in the {band} DVI band | Region: {region}."
+    else:
+        user_context = f"User: {user_id} | Region: {region} | DVI: {dvi}."
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    if history:
+        summary, turns = history
+        if summary:
+            messages.append({"role": "system", "content": "Earlier in this conversation: " + summary})
+        messages.extend({"role": role, "content": text} for role, text in turns)
+    messages.append({"role": "user", "content": user_context + " Message: " + message})
+    return messages
+
+
+async def generate_mitra_reply(
+    message: str, user_id: str, region: str, dvi: int, band: Optional[str] = None, history: Optional[History] = None
+) -> Tuple[str, List[str]]:
+    text = await POOL.complete(
+        _messages(message, user_id, region, dvi, band, history),
+        temperature=0.6,
+        response_format={"type": "json_object"}
+    )
+    return _parse_reply(text)
+
 
-def _client():
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key or OpenAI is None:
-        raise RuntimeError("OPENAI_API_KEY not set or openai not installed")
-    return OpenAI(api_key=api_key)
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
 
 
-def generate_mitra_reply(message: str, user_id: str, region: str, dvi: int) -> Tuple[str, List[str]]:
-    client = _client()
-    user_context = f"User: {user_id} | Region: {region} | DVI: {dvi}."
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": user_context + " Message: " + message}
-    ]
+# Pulls the "reply" string out of the streamed JSON object as its characters arrive.
+class ReplyExtractor:
+    def __init__(self) -> None:
+        self.raw = ""
+        self._pos = 0
+        self._state = "seek"  # seek -> value -> done
+        self._escape: Optional[str] = None
+        self._high_surrogate: Optional[int] = None
+
+    def feed(self, chunk: str) -> str:
+        self.raw += chunk
+        out: List[str] = []
+        while self._pos < len(self.raw) and self._state != "done":
+            if self._state == "seek":
+                key = self.raw.find('"reply"', self._pos)
+                if key < 0:
+                    self._pos = max(self._pos, len(self.raw) - len('"reply"'))
+                    return ""
+                quote = self.raw.find('"', key + len('"reply"'))
+                colon = self.raw.find(":", key + len('"reply"'))
+                if quote < 0 or colon < 0 or quote < colon:
+                    return ""
+                self._pos = quote + 1
+                self._state = "value"
+                continue
+            ch = self.raw[self._pos]
+            if self._escape is not None:
+                self._escape += ch
+                if self._escape.startswith("u"):
+                    if len(self._escape) < 5:
+                        self._pos += 1
+                        continue
+                    code = int(self._escape[1:], 16)
+                    if 0xD800 <= code < 0xDC00:
+                        self._high_surrogate = code
+                    elif 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+                        out.append(chr(0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)))
+                        self._high_surrogate = None
+                    else:
+                        out.append(chr(code))
+                else:
+                    out.append(_ESCAPES.get(self._escape, self._escape))
+                self._escape = None
+            elif ch == "\\":
+                self._escape = ""
+            elif ch == '"':
+                self._state = "done"
+            else:
+                out.append(ch)
+            self._pos += 1
+        return "".join(out)
+
+    def result(self) -> Tuple[str, List[str]]:
+        return _parse_reply(self.raw)
+
+
+def _parse_reply(text: str) -> Tuple[str, List[str]]:
+    # Shared by the plain and streamed paths, so both fall back (and cache nothing) on the same output.
     try:
-        resp = client.chat.completions.create(
-            model=DEFAULT_MODEL,
-            messages=messages,
-            temperature=0.6,
-            response_format={"type": "json_object"}
-        )
-        text = resp.choices[0].message.content or '{"reply":"(empty)","suggestions":["+50 plan"]}'
         data = json.loads(text)
-        reply = data.get("reply", "Sorry, something went wrong.")
-        suggestions = data.get("suggestions", ["+50 plan","Match opps"])
-        if not isinstance(suggestions, list):
-            suggestions = [str(suggestions)]
-        return reply, suggestions[:4]
-    except Exception:
-        return ("I couldn't reach my brain right now. Try again later.", ["+50 plan","Match opps","Resume tips"])
+    except ValueError as exc:
+        raise UnparseableReply("Mitra's reply was not the JSON object asked for") from exc
+    if not isinstance(data, dict) or not isinstance(data.get("reply"), str):
+        raise UnparseableReply("Mitra's reply had no reply string")
+    reply = data["reply"]
+    suggestions = data.get("suggestions", ["+50 plan","Match opps"])
+    if not isinstance(suggestions, list):
+        suggestions = [str(suggestions)]
+    return reply, suggestions[:4]
+
+
+async def stream_mitra_reply(
+    message: str,
+    user_id: str,
+    region: str,
+    dvi: int,
+    extractor: ReplyExtractor,
+    band: Optional[str] = None,
+    history: Optional[History] = None,
+) -> AsyncIterator[str]:
+    # Yields reply text deltas; extractor.result() has the parsed reply once the stream ends.
+    async for delta in POOL.stream(
+        _messages(message, user_id, region, dvi, band, history),
+        temperature=0.6,
+        response_format={"type": "json_object"},
+        stream_options={"include_usage": True},
+    ):
+        text = extractor.feed(delta)
+        if text:
+            yield text
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+_SENTENCE = re.compile(r"(?<=[.!?])\s")
+
+# (rolling summary, recent turns as (role, text)) - what a prompt is assembled from.
+History = Tuple[str, List[Tuple[str, str]]]
+
+
+def estimate_tokens(text: str) -> int:
+    # About four characters per token for English prose: close enough to budget with, free to compute.
+    return len(text) // 4 + 1
+
+
+def _clip(text: str, tokens: int) -> str:
+    limit = max(tokens, 1) * 4
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def _gist(text: str, limit: int = 160) -> str:
+    first = _SENTENCE.split(text.strip(), maxsplit=1)[0]
+    return first if len(first) <= limit else first[: limit - 1].rstrip() + "…"
+
+
+class Turn(NamedTuple):
+    role: str  # "user" or "assistant"
+    text: str
+    tokens: int
+
+
+class Conversation:
+    __slots__ = ("turns", "recent_tokens", "summary", "summary_tokens", "touched")
+
+    def __init__(self) -> None:
+        self.turns: Deque[Turn] = deque()
+        self.recent_tokens = 0
+        self.summary: Deque[Tuple[str, int]] = deque()  # one gist line per folded turn
+        self.summary_tokens = 0
+        self.touched = time.monotonic()
+
+
+# Per-user Mitra conversations under a fixed token budget: the newest turns are kept verbatim
+# in three quarters of it, and turns pushed out of that window are folded into a rolling summary
+# (one-sentence gists, oldest dropped first) in the remaining quarter. Token counts are kept
+# incrementally, so assembling a prompt only copies the bounded window. Sessions idle for
+# `idle_seconds`, and the least recently used beyond `max_sessions`, are evicted.
+class ConversationStore:
+    def __init__(self, budget_tokens: int = 800, idle_seconds: float = 1800.0, max_sessions: int = 10000) -> None:
+        self.summary_budget = max(budget_tokens // 4, 1)
+        self.recent_budget = max(budget_tokens - self.summary_budget, 2)
+        self.idle_seconds = idle_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self.folded = 0
+        self.evictions = 0
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.touched >= cutoff and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def _session(self, user_id: str, create: bool) -> Optional[Conversation]:
+        self._expire()
+        conversation = self._sessions.get(user_id)
+        if conversation is None:
+            if not create:
+                return None
+            conversation = self._sessions[user_id] = Conversation()
+        conversation.touched = time.monotonic()
+        self._sessions.move_to_end(user_id)
+        return conversation
+
+    def context(self, user_id: str) -> Optional[History]:
+        conversation = self._session(user_id, create=False)
+        if conversation is None or not conversation.turns:
+            return None
+        summary = " ".join(line for line, _ in conversation.summary)
+        return summary, [(turn.role, turn.text) for turn in conversation.turns]
+
+    def record(self, user_id: str, message: str, reply: str) -> None:
+        conversation = self._session(user_id, create=True)
+        for role, text in (("user", message), ("assistant", reply)):
+            # Half the window each, so the latest exchange always fits verbatim.
+            text = _clip(text.strip(), self.recent_budget // 2)
+            turn = Turn(role, text, estimate_tokens(text))
+            conversation.turns.append(turn)
+            conversation.recent_tokens += turn.tokens
+        while conversation.recent_tokens > self.recent_budget:
+            self._fold(conversation, conversation.turns.popleft())
+
+    def _fold(self, conversation: Conversation, turn: Turn) -> None:
+        conversation.recent_tokens -= turn.tokens
+        line = f"{'User' if turn.role == 'user' else 'Mitra'}: {_gist(turn.text)}"
+        tokens = estimate_tokens(line) + 1
+        conversation.summary.append((line, tokens))
+        conversation.summary_tokens += tokens
+        while conversation.summary_tokens > self.summary_budget:
+            _, dropped = conversation.summary.popleft()
+            conversation.summary_tokens -= dropped
+        self.folded += 1
+
+    def clear(self, user_id: str) -> bool:
+        return self._sessions.pop(user_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "budget_tokens": self.summary_budget + self.recent_budget,
+            "folded": self.folded,
+            "evictions": self.evictions,
+        }
+
+
+__all__ = ["ConversationStore", "History", "estimate_tokens"]
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "mitra_rules.json"
+
+
+@dataclass(frozen=True)
+class Tier:
+    low: int
+    high: int
+    name: str
+    guidance: str
+    suggestions: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class HintRule:
+    keyword: str
+    hint: str
+    regions: Optional[FrozenSet[str]]  # None = every region
+    lang: Optional[str]  # None = every language
+    weight: float
+
+
+# Multi-pattern matcher: one pass over the text reports every keyword occurrence.
+class AhoCorasick:
+    def __init__(self, patterns: Iterable[Tuple[str, int]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for pattern, payload in patterns:
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (payload,)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def matches(self, text: str) -> set:
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+# Immutable compiled form of a rules file: tier bounds for bisect, hint rules and the
+# automaton over their keywords.
+class CompiledRules:
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        self.scale_max = int(spec.get("scale_max", 900))
+        self.reply_template: str = spec["reply"]
+        self.progress: Dict[str, str] = spec["progress"]
+        self.tiers: List[Tier] = sorted(
+            (
+                Tier(int(t["low"]), int(t["high"]), t["name"], t["guidance"], tuple(t.get("suggestions", ())))
+                for t in spec["tiers"]
+            ),
+            key=lambda tier: tier.high,
+        )
+        self._highs = [tier.high for tier in self.tiers]
+        ceiling = spec["ceiling"]
+        self.ceiling = Tier(
+            self._highs[-1] if self._highs else 0,
+            self._highs[-1] if self._highs else 0,
+            ceiling["name"],
+            ceiling["guidance"],
+            tuple(ceiling.get("suggestions", ())),
+        )
+        self.hints: List[HintRule] = []
+        for rule in spec.get("hints", []):
+            regions = rule.get("regions")
+            self.hints.append(HintRule(
+                keyword=rule["keyword"].casefold(),
+                hint=rule["hint"],
+                regions=frozenset(r.casefold() for r in regions) if regions and "*" not in regions else None,
+                lang=rule.get("lang"),
+                weight=float(rule.get("weight", 1.0)),
+            ))
+        self.matcher = AhoCorasick((rule.keyword, index) for index, rule in enumerate(self.hints))
+
+    def tier_for(self, dvi: int) -> Tuple[Tier, bool]:
+        # First tier whose (exclusive) upper bound is above dvi; past the last one is the ceiling.
+        index = bisect_right(self._highs, dvi)
+        if index >= len(self.tiers):
+            return self.ceiling, True
+        return self.tiers[index], False
+
+    def matched_hints(self, text: str, region: str = "", lang: Optional[str] = None) -> List[HintRule]:
+        region_key = region.casefold()
+        rules = []
+        for index in sorted(self.matcher.matches(text.casefold())):
+            rule = self.hints[index]
+            if rule.regions is not None and region_key not in rule.regions:
+                continue
+            if lang and rule.lang and rule.lang != lang:
+                continue
+            rules.append(rule)
+        return rules
+
+    def evaluate(
+        self, message: str, dvi: int, region: str = "Global", user_id: str = "explorer", lang: Optional[str] = None
+    ) -> Dict[str, Any]:
+        tier, at_ceiling = self.tier_for(dvi)
+        next_cap = None if at_ceiling or tier.high > self.scale_max else tier.high
+        if next_cap and next_cap > dvi:
+            progress_hint = self.progress["remaining"].format(remaining=max(next_cap - dvi, 0))
+        elif dvi >= self.scale_max:
+            progress_hint = self.progress["top"]
+        else:
+            progress_hint = self.progress["default"]
+
+        reply = self.reply_template.format(
+            user_id=user_id, dvi=dvi, tier=tier.name, region=region, guidance=tier.guidance
+        )
+        matched = self.matched_hints(message, region, lang)
+        suggestions: List[str] = []
+        for rule in matched:
+            if rule.hint not in suggestions:
+                suggestions.append(rule.hint)
+        if not suggestions:
+            suggestions.extend(tier.suggestions)
+        suggestions.append(progress_hint)
+        return {
+            "reply": reply,
+            "suggestions": suggestions[:4],
+            "tier": tier.name,
+            "matched": [rule.keyword for rule in matched],
+            "score": round(sum(rule.weight for rule in matched), 3),
+        }
+
+
+def load_rules(path: Path) -> CompiledRules:
+    with open(path, "r", encoding="utf-8") as handle:
+        return CompiledRules(json.load(handle))
+
+
+# Holds the compiled rules for a file and swaps in a recompiled copy when the file's
+# mtime changes (checked at most every `reload_seconds`). A broken edit keeps the last
+# good rules and records the error.
+class RuleEngine:
+    def __init__(self, path: Path = DEFAULT_RULES_PATH, reload_seconds: float = 5.0) -> None:
+        self.path = Path(path)
+        self.reload_seconds = reload_seconds
+        self._lock = threading.Lock()
+        self._mtime = os.stat(self.path).st_mtime_ns
+        self._checked = time.monotonic()
+        self._rules = load_rules(self.path)
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def rules(self) -> CompiledRules:
+        if self.reload_seconds >= 0 and time.monotonic() - self._checked >= self.reload_seconds:
+            self._maybe_reload()
+        return self._rules
+
+    def _maybe_reload(self) -> None:
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime == self._mtime:
+                    return
+                self._rules = load_rules(self.path)
+                self._mtime = mtime
+                self.reloads += 1
+                self.last_error = None
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                self.last_error = f"{exc.__class__.__name__}: {exc}"
+
+    def evaluate(self, message: str, dvi: int, region: str = "Global", user_id: str = "explorer",
+                 lang: Optional[str] = None) -> Dict[str, Any]:
+        return self.rules.evaluate(message, dvi, region, user_id, lang)
+
+    def evaluate_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        rules = self.rules
+        return [
+            rules.evaluate(
+                item["message"],
+                int(item.get("dvi") or 0),
+                item.get("region") or "Global",
+                item.get("user_id") or "explorer",
+                item.get("lang"),
+            )
+            for item in items
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        rules = self._rules
+        return {
+            "path": str(self.path),
+            "tiers": len(rules.tiers),
+            "hints": len(rules.hints),
+            "reloads": self.reloads,
+            "last_error": self.last_error,
+        }
+
+
+__all__ = ["AhoCorasick", "CompiledRules", "RuleEngine", "Tier", "load_rules"]
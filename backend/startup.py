@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import time
+from typing import List, Tuple
+
+# Cold-start clock, started when the backend package is first imported. Modules mark the end of
+# each startup phase; with settings.profile_startup the app prints the breakdown once it serves.
+STARTED = time.perf_counter()
+_marks: List[Tuple[str, float]] = []
+
+
+def mark(phase: str) -> None:
+    _marks.append((phase, time.perf_counter()))
+
+
+def phases() -> List[Tuple[str, float]]:
+    # (phase, milliseconds since the previous mark)
+    rows = []
+    previous = STARTED
+    for phase, at in _marks:
+        rows.append((phase, (at - previous) * 1000))
+        previous = at
+    return rows
+
+
+def report(budget_ms: float) -> str:
+    rows = phases()
+    total = sum(ms for _, ms in rows)
+    lines = [f"startup phases (cold-start budget {budget_ms:.0f} ms):"]
+    lines += [f"  {phase:34} {ms:8.1f} ms" for phase, ms in rows]
+    verdict = "within" if total <= budget_ms else "OVER"
+    lines.append(f"  {'total':34} {total:8.1f} ms  {verdict} budget")
+    return "\n".join(lines)
+
+
+__all__ = ["STARTED", "mark", "phases", "report"]
@@ -1,8 +1,27 @@
 ﻿from __future__ import annotations
 
-from datetime import datetime, timezone
+import os
+import threading
+import time
+import zlib
+from datetime import date, datetime, timezone
 from itertools import count
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import dvi, startup
+from .banking import RECENT_TRANSACTIONS, BankingLedger, restore_ledger
+from .config import settings
+from .feed_search import FeedSearchIndex
+from .investor import Portfolio, seed_funding_events
+from .likes import LikeBook
+from .opportunity_index import OpportunityIndex
+from .pubsub import Hub, open_broker, user_topic
+from .services.mitra_rules import RuleEngine
+from .storage import Store, open_store
+from .working_set import UserPartition, UserWorkingSet
 
 
 def _utc_iso() -> str:
@@ -20,6 +39,7 @@ STATE: Dict[str, Any] = {
         "name": "Mitra Explorer",
         "role": "Student",
         "region": "Global",
+        # Starting values only; the DVI engine (backend/dvi.py) recomputes both.
         "dvi": 768,
         "band": "Catalyst",
         "headline": "Designing inclusion-ready fintech experiences.",
@@ -130,6 +150,8 @@ STATE: Dict[str, Any] = {
             "type": "Micro-loan",
             "summary": "EUR 5k - 25k flexible micro-loans for high DVI students scaling their impact.",
             "tags": ["Micro-loan", "Europe", "Finance"],
+            "regions": ["Europe"],
+            "min_dvi": 600,
             "deadline": "2025-12-01",
             "link": "https://example.com/opportunity/microloan",
         },
@@ -145,21 +167,16 @@ STATE: Dict[str, Any] = {
         },
     ],
     "banking": {
-        "balance": 12850.72,
-        "income": 4150.00,
-        "spend": 1890.43,
+        # Balance before the seeded transactions; balance, income, spend and categories are
+        # derived from the ledger (see backend/banking.py).
+        "opening_balance": 9881.97,
         "iban_like": "ME00MTRA0001",
-        "categories": {
-            "Housing": 640.0,
-            "Education": 320.5,
-            "Community": 220.75,
-            "Operations": 708.18,
-        },
         "transactions": [
             {
                 "id": "txn-1",
                 "counterparty": "Impact Fellowship",
                 "reference": "Scholarship disbursement",
+                "category": "Income",
                 "amount": 2200.00,
                 "timestamp": _utc_iso(),
             },
@@ -167,6 +184,7 @@ STATE: Dict[str, Any] = {
                 "id": "txn-2",
                 "counterparty": "City Housing Co-op",
                 "reference": "Housing",
+                "category": "Housing",
                 "amount": -640.00,
                 "timestamp": _utc_iso(),
             },
@@ -174,6 +192,7 @@ STATE: Dict[str, Any] = {
                 "id": "txn-3",
                 "counterparty": "Learning Partner",
                 "reference": "Education stipend",
+                "category": "Education",
                 "amount": -320.50,
                 "timestamp": _utc_iso(),
             },
@@ -181,6 +200,7 @@ STATE: Dict[str, Any] = {
                 "id": "txn-4",
                 "counterparty": "Community Kitchen",
                 "reference": "Mutual aid",
+                "category": "Community",
                 "amount": -220.75,
                 "timestamp": _utc_iso(),
             },
@@ -188,6 +208,7 @@ STATE: Dict[str, Any] = {
                 "id": "txn-5",
                 "counterparty": "Inclusive Bank",
                 "reference": "Salary",
+                "category": "Income",
                 "amount": 1950.00,
                 "timestamp": _utc_iso(),
             },
@@ -213,18 +234,21 @@ STATE: Dict[str, Any] = {
         "roi": 7.2,
         "funds": [
             {
+                "id": "fund-data-science",
                 "title": "Scholarship Pool - Data Science",
                 "target": 10000,
                 "funded": 6000,
                 "focus": "STEM scholarships",
             },
             {
+                "id": "fund-eu-microloans",
                 "title": "Micro-loan Tranche - EU Students",
                 "target": 25000,
                 "funded": 8750,
                 "focus": "Micro-loans",
             },
             {
+                "id": "fund-cyber-mentorship",
                 "title": "Mentorship Grants - Cybersecurity",
                 "target": 5000,
                 "funded": 4500,
@@ -234,53 +258,484 @@ STATE: Dict[str, Any] = {
     },
 }
 
+# The seeded aum, active_sponsorships and funded amounts are the starting point only; the
+# dashboard is rebuilt from funding events, seeded here as a dated history summing to them.
+STATE["investor"]["events"] = seed_funding_events(
+    STATE["investor"]["funds"],
+    {
+        "fund-data-science": ["Aurora Foundation", "Northwind Labs"],
+        "fund-eu-microloans": ["Civic Bank EU", "Aurora Foundation"],
+        "fund-cyber-mentorship": ["SecureFuture Trust"],
+    },
+)
+
+
+# Bumped by every mutation so cached serializations of a section can be reused until it changes.
+_versions: Dict[str, int] = {}
+
+
+def section_version(section: str) -> int:
+    return _versions.get(section, 0)
+
+
+def _touch(*sections: str) -> None:
+    for section in sections:
+        _versions[section] = _versions.get(section, 0) + 1
+
+
+STORE: Store = open_store(settings.storage_backend, settings.database_path, settings.feed_retention)
+STORE.seed(STATE)
+startup.mark("store open and seed")
+
+DEFAULT_USER_ID: str = STATE["user"]["user_id"]
+
+# Opportunities live in the store; the index follows its writes by revision, so POST and DELETE
+# /api/opportunities survive restarts and reach every worker on its next read.
+OPPORTUNITIES = OpportunityIndex()
+_opportunity_revision = 0
+_opportunity_lock = threading.Lock()
+
+
+def sync_opportunities() -> int:
+    # Applies opportunity writes past the last revision applied here; returns how many.
+    global _opportunity_revision
+    with _opportunity_lock:
+        changes = STORE.opportunity_changes(_opportunity_revision)
+        if not changes:
+            return 0
+        for _, opportunity_id, opportunity in changes:
+            if opportunity is None:
+                OPPORTUNITIES.remove(opportunity_id)
+            else:
+                OPPORTUNITIES.upsert(opportunity)
+        _opportunity_revision = changes[-1][0]
+    _touch("opportunities")
+    return len(changes)
 
-def get_manifesto() -> Dict[str, Any]:
-    return STATE["manifesto"]
 
+sync_opportunities()
+
+# Full-text search over the feed. Built from the store on the first search and then kept up with
+# new posts (this worker's on add_post, other workers' on the next search). With the SQLite store
+# the first search starts from the snapshot file, if it still matches the store, and only indexes
+# posts newer than it.
+FEED_INDEX = FeedSearchIndex()
+_feed_index_lock = threading.Lock()
+_feed_index_ready = False
+_feed_index_saved_id = -1
+FEED_SNAPSHOT: Optional[Path] = (
+    Path(settings.feed_index_snapshot or Path(settings.database_path).parent / "feed-index.bin")
+    if STORE.name == "sqlite" and settings.feed_index_snapshot != "0"
+    else None
+)
+
+PORTFOLIO = Portfolio(STATE["investor"]["funds"], STATE["investor"]["aum"], STATE["investor"]["roi"])
+# Highest funding event id applied to PORTFOLIO. Reads first apply the events past it, which
+# covers the stored history on the first read and, after that, events other workers record.
+_funding_applied_id = 0
+_funding_lock = threading.Lock()
+
+# Small deltas pushed to connected clients (/api/events): new posts on "feed", and
+# achievements, notifications and score changes on the owner's user topic.
+HUB = Hub(open_broker(settings.push_broker, settings.database_path), settings.push_queue_size)
+
+# Tiers (DVI bands) and Mitra's rule-based replies come from the same rules file.
+RULES = RuleEngine(Path(settings.mitra_rules_path), settings.mitra_rules_reload_seconds)
+
+
+# Likes are deduplicated against each user's partition.liked and written behind to the store.
+LIKES = LikeBook(
+    STORE,
+    settings.likes_log_dir
+    or (str(Path(settings.database_path).parent / "likes") if STORE.name == "sqlite" else None),
+    base_seconds=settings.likes_flush_seconds,
+)
+
+
+def _load_partition(user_id: str) -> Optional[UserPartition]:
+    profile = STORE.get_user(user_id)
+    if profile is None:
+        return None
+    banking = STORE.get_banking(user_id)
+    aggregates = STORE.banking_aggregates(user_id, RECENT_TRANSACTIONS)
+    liked = set(STORE.liked_posts(user_id))
+    for post_id, state in LIKES.pending_for(user_id).items():
+        if state:
+            liked.add(post_id)
+        else:
+            liked.discard(post_id)
+    return UserPartition(
+        profile=profile,
+        achievements=list(STORE.list_achievements(user_id)),
+        banking=banking,
+        notifications=list(STORE.list_notifications(user_id)),
+        ledger=_ledger_for(banking, aggregates),
+        liked=liked,
+    )
+
+
+def _ledger_for(summary: Dict[str, Any], aggregates: Dict[str, Any]) -> BankingLedger:
+    # Built from grouped per-day totals and the newest rows, so a reload costs a GROUP BY rather
+    # than reading the whole transaction history into Python.
+    if "opening_balance" not in summary:
+        # Summaries written before the ledger stored a static balance; keep it as the current one.
+        summary["opening_balance"] = float(summary.get("balance", 0.0)) - sum(
+            income - spend for _, income, spend, _ in aggregates["days"]
+        )
+    for key in ("balance", "income", "spend", "categories"):
+        summary.pop(key, None)
+    return restore_ledger(summary, aggregates)
+
+
+USERS = UserWorkingSet(_load_partition, settings.user_cache_max_bytes, settings.user_cache_max_users)
+
+# Every worker holds its own copies of the partitions, so a write here publishes the users it
+# changed on this topic and the other workers drop theirs (clients never subscribe to it).
+WORKING_SET_TOPIC = "working-set"
+_worker_id = os.getpid()
+
+
+def _drop_changed_partitions(event: Dict[str, Any]) -> None:
+    if event["data"]["worker"] != _worker_id:
+        for user_id in event["data"]["users"]:
+            USERS.invalidate(user_id)
+
+
+HUB.listen(WORKING_SET_TOPIC, _drop_changed_partitions)
+
+
+def _changed(*user_ids: str) -> None:
+    for user_id in user_ids:
+        USERS.refresh(user_id)
+    HUB.publish(WORKING_SET_TOPIC, "invalidate", {"users": list(user_ids), "worker": _worker_id})
+
+startup.mark("state: indexes, portfolio, rules")
+
+
+def _partition(user_id: str) -> UserPartition:
+    partition = USERS.get(user_id)
+    if partition is None:
+        partition = USERS.get(DEFAULT_USER_ID)
+    if partition is None:
+        raise KeyError(f"Unknown user: {user_id}")
+    return partition
+
+
+def resolve_user_id(user_id: Optional[str]) -> str:
+    if user_id and USERS.get(user_id) is not None:
+        return user_id
+    return DEFAULT_USER_ID
+
+
+def register_user(name: str) -> Dict[str, Any]:
+    user_id = name.lower().replace(" ", "-") or "guest"
+    if user_id == DEFAULT_USER_ID:
+        # Reserved for the demo profile every anonymous visitor shares; a member named Mitra gets their own.
+        user_id = f"{user_id}-member"
+    partition = USERS.get(user_id)
+    if partition is None:
+        profile = {
+            "user_id": user_id,
+            "name": name,
+            "role": "Student",
+            "region": "Global",
+            "dvi": 0,
+            "band": "Foundation",
+            "headline": "",
+            "about": "",
+            "skills": [],
+        }
+        STORE.put_user(profile)
+        STORE.put_banking_summary(user_id, {
+            "opening_balance": 0.0,
+            "iban_like": f"ME00MTRA{zlib.crc32(user_id.encode()) % 10000:04d}",
+        })
+        partition = _partition(user_id)
+    elif partition.profile.get("name") != name:
+        partition.profile["name"] = name
+        STORE.put_user(partition.profile)
+        _changed(user_id)
+    return partition.profile
+
+
+def _rescore(partition: UserPartition) -> bool:
+    # True when the score or band changed; the caller publishes the partition change.
+    user_id = partition.profile["user_id"]
+    if user_id == DEFAULT_USER_ID:
+        return False
+    rules = RULES.rules
+    features = dvi.user_features(partition.achievements, STORE.count_posts(user_id), partition.ledger)
+    score = int(dvi.score(features[np.newaxis, :], rules.scale_max)[0])
+    band = str(dvi.bands(rules, np.array([score]))[0])
+    if partition.profile.get("dvi") != score or partition.profile.get("band") != band:
+        partition.profile["dvi"] = score
+        partition.profile["band"] = band
+        STORE.put_scores([(user_id, score, band)])
+        _touch("profile")
+        HUB.publish(user_topic(user_id), "score", {"dvi": score, "band": band})
+        return True
+    return False
+
+
+def rescore_users() -> Dict[str, Any]:
+    # Batch pass over every stored user; only changed scores are written back.
+    started = time.perf_counter()
+    rules = RULES.rules
+    inputs = STORE.scoring_inputs(dvi.window_start())
+    users, features = dvi.feature_matrix(inputs)
+    scores = dvi.score(features, rules.scale_max)
+    names = dvi.bands(rules, scores)
+    # The demo profile is shared by every anonymous visitor and its seed has too little history to
+    # score where its copy (and Mitra's tier replies) place it, so it keeps its seeded DVI and band.
+    seeded = users == DEFAULT_USER_ID
+    scores[seeded] = STATE["user"]["dvi"]
+    names[seeded] = STATE["user"]["band"]
+    stored = {user_id: (score, band) for user_id, score, band in inputs["users"]}
+    changed = [
+        (user_id, score, band)
+        for user_id, score, band in zip(users.tolist(), scores.tolist(), names.tolist())
+        if stored.get(user_id) != (score, band)
+    ]
+    if changed:
+        STORE.put_scores(changed)
+        for user_id, score, band in changed:
+            partition = USERS.peek(user_id)
+            if partition is not None:
+                partition.profile["dvi"] = score
+                partition.profile["band"] = band
+                HUB.publish(user_topic(user_id), "score", {"dvi": score, "band": band})
+        _changed(*(user_id for user_id, _, _ in changed))
+        _touch("profile")
+    return {"users": len(users), "changed": len(changed), "seconds": round(time.perf_counter() - started, 3)}
 
-def get_user() -> Dict[str, Any]:
-    return STATE["user"]
 
+def get_manifesto() -> Dict[str, Any]:
+    return STATE["manifesto"]
 
-def get_feed() -> List[Dict[str, Any]]:
-    return STATE["feed"]
+
+def get_user(user_id: str = DEFAULT_USER_ID) -> Dict[str, Any]:
+    return _partition(user_id).profile
+
+
+def get_feed(before: Optional[int] = None, limit: int = 20, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    posts = LIKES.overlay(STORE.list_posts(before, limit))
+    if user_id is None:
+        return posts
+    liked = _partition(user_id).liked
+    return [{**post, "liked": post["id"] in liked} for post in posts]
+
+
+def _snapshot_tag(post_id: int) -> str:
+    # Identifies the newest indexed post, so a snapshot taken against another database is not used.
+    post = STORE.get_posts([post_id]).get(post_id)
+    if post is None:
+        return ""
+    checksum = zlib.crc32(f"{post['created_at']}|{post['text']}".encode("utf-8"))
+    return f"{post_id}:{checksum:08x}"
+
+
+def _load_feed_snapshot() -> None:
+    global FEED_INDEX, _feed_index_saved_id
+    if FEED_SNAPSHOT is None or not FEED_SNAPSHOT.exists():
+        return
+    try:
+        index, tag = FeedSearchIndex.load(FEED_SNAPSHOT)
+    except (OSError, ValueError, KeyError):
+        return
+    if index.last_id >= 0 and tag == _snapshot_tag(index.last_id):
+        FEED_INDEX = index
+        _feed_index_saved_id = index.last_id
+
+
+def save_feed_index() -> int:
+    # Bytes written; 0 if there is nothing new to snapshot.
+    global _feed_index_saved_id
+    if FEED_SNAPSHOT is None or not _feed_index_ready:
+        return 0
+    with _feed_index_lock:
+        last_id = FEED_INDEX.last_id
+        if last_id < 0 or last_id == _feed_index_saved_id:
+            return 0
+        written = FEED_INDEX.save(FEED_SNAPSHOT, _snapshot_tag(last_id))
+        _feed_index_saved_id = last_id
+        return written
+
+
+def _index_new_posts() -> None:
+    global _feed_index_ready
+    with _feed_index_lock:
+        first = not _feed_index_ready
+        if first:
+            _load_feed_snapshot()
+        indexed = 0
+        while True:
+            batch = STORE.posts_after(FEED_INDEX.last_id, 5000)
+            indexed += FEED_INDEX.extend(batch)
+            if len(batch) < 5000:
+                break
+        _feed_index_ready = True
+    if first and indexed >= 10000:
+        # A long first build is worth keeping before the process ever gets to shut down cleanly.
+        save_feed_index()
+
+
+def search_feed(
+    q: str = "",
+    min_dvi: Optional[int] = None,
+    max_dvi: Optional[int] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    author: Optional[str] = None,
+    limit: int = 20,
+    user_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    _index_new_posts()
+    for _ in range(3):
+        hits = FEED_INDEX.search(q, min_dvi, max_dvi, since, until, author, limit)
+        posts = STORE.get_posts([post_id for post_id, _ in hits])
+        missing = [post_id for post_id, _ in hits if post_id not in posts]
+        if not missing:
+            break
+        # Aged out of the feed since they were indexed.
+        FEED_INDEX.forget(missing)
+    items = LIKES.overlay([{**posts[post_id], "score": score} for post_id, score in hits if post_id in posts])
+    if user_id is None:
+        return items
+    liked = _partition(user_id).liked
+    return [{**post, "liked": post["id"] in liked} for post in items]
+
+
+def like_post(user_id: str, post_id: int, liked: bool = True) -> Optional[Dict[str, Any]]:
+    partition = _partition(user_id)
+    count = LIKES.toggle(partition.liked, partition.profile["user_id"], post_id, liked)
+    if count is None:
+        return None
+    return {"post_id": post_id, "liked": liked, "like_count": count}
+
+
+def flush_likes() -> int:
+    # One write-behind batch; clients learn the new counts as "like" events on the feed topic.
+    counts = LIKES.flush()
+    if counts:
+        _touch("feed")
+        for post_id, count in counts.items():
+            HUB.publish("feed", "like", {"post_id": post_id, "like_count": count})
+    return len(counts)
 
 
 def add_post(user_id: str, text: str) -> Dict[str, Any]:
+    author = get_user(user_id)
     post = {
-        "id": next(_post_id),
         "user_id": user_id,
-        "display_name": get_user().get("name", "Community member"),
-        "dvi": get_user().get("dvi", 0),
+        "display_name": author.get("name", "Community member"),
+        "dvi": author.get("dvi", 0),
         "text": text,
         "created_at": _utc_iso(),
         "like_count": 0,
     }
-    STATE["feed"].insert(0, post)
+    post = STORE.insert_post(post)
+    if _feed_index_ready:
+        _index_new_posts()
+    _touch("feed")
+    HUB.publish("feed", "post", post)
+    if author.get("user_id") == user_id and _rescore(_partition(user_id)):
+        _changed(user_id)
     return post
 
 
-def get_achievements() -> List[Dict[str, Any]]:
-    return get_user().get("achievements", [])
+def get_achievements(user_id: str = DEFAULT_USER_ID) -> List[Dict[str, Any]]:
+    return _partition(user_id).achievements
 
 
-def add_achievement(title: str, year: int) -> Dict[str, Any]:
-    record = {"id": next(_achievement_id), "title": title, "year": year}
-    get_user().setdefault("achievements", []).insert(0, record)
+def add_achievement(title: str, year: int, user_id: str = DEFAULT_USER_ID) -> Dict[str, Any]:
+    partition = _partition(user_id)
+    user_id = partition.profile["user_id"]
+    record = STORE.insert_achievement(user_id, {"title": title, "year": year})
+    partition.achievements.insert(0, record)
+    _rescore(partition)
+    _changed(user_id)
+    _touch("profile")
+    HUB.publish(user_topic(user_id), "achievement", record)
     return record
 
 
-def get_banking() -> Dict[str, Any]:
-    return STATE["banking"]
+def get_banking(user_id: str = DEFAULT_USER_ID) -> Dict[str, Any]:
+    partition = _partition(user_id)
+    return {"iban_like": partition.banking.get("iban_like"), **partition.ledger.summary()}
+
+
+def get_banking_summary(
+    user_id: str = DEFAULT_USER_ID, start: Optional[date] = None, end: Optional[date] = None, bucket: str = "day"
+) -> Dict[str, Any]:
+    return _partition(user_id).ledger.range_summary(start, end, bucket)
+
+
+def add_transactions(user_id: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    partition = _partition(user_id)
+    user_id = partition.profile["user_id"]
+    inserted = STORE.insert_transactions(user_id, rows)
+    if inserted:
+        partition.ledger.append(inserted)
+        _rescore(partition)
+        _changed(user_id)
+    return inserted
 
 
 def get_opportunities() -> List[Dict[str, Any]]:
-    return STATE["opportunities"]
+    sync_opportunities()
+    return OPPORTUNITIES.items()
+
+
+def search_opportunities(
+    q: str = "",
+    type: Optional[str] = None,
+    before: Optional[date] = None,
+    limit: int = 20,
+    user_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    profile = get_user(user_id) if user_id else None
+    sync_opportunities()
+    return OPPORTUNITIES.search(q, type, before, limit, profile)
+
 
+def upsert_opportunity(record: Dict[str, Any]) -> Dict[str, Any]:
+    STORE.put_opportunity(record)
+    sync_opportunities()
+    return record
+
+
+def remove_opportunity(opportunity_id: str) -> bool:
+    removed = STORE.delete_opportunity(opportunity_id)
+    sync_opportunities()
+    return removed
+
+
+def get_notifications(user_id: str = DEFAULT_USER_ID) -> List[Dict[str, Any]]:
+    return _partition(user_id).notifications
 
-def get_notifications() -> List[Dict[str, Any]]:
-    return STATE["notifications"]
+
+def add_notification(user_id: str, title: str, body: str) -> Dict[str, Any]:
+    partition = _partition(user_id)
+    user_id = partition.profile["user_id"]
+    record = STORE.insert_notification(user_id, {"title": title, "body": body, "created_at": _utc_iso()})
+    partition.notifications.insert(0, record)
+    _changed(user_id)
+    _touch("profile")
+    HUB.publish(user_topic(user_id), "notification", record)
+    return record
+
+
+def deliver_notification(user_id: str, title: str, body: str) -> Dict[str, Any]:
+    # For batch jobs: written to the store for a known user_id without loading their partition;
+    # one already in the working set picks the notification up as well.
+    record = STORE.insert_notification(user_id, {"title": title, "body": body, "created_at": _utc_iso()})
+    partition = USERS.peek(user_id)
+    if partition is not None:
+        partition.notifications.insert(0, record)
+    _changed(user_id)
+    _touch("profile")
+    HUB.publish(user_topic(user_id), "notification", record)
+    return record
 
 
 def get_mitra_tips() -> Dict[str, List[str]]:
@@ -290,22 +745,72 @@ def get_mitra_tips() -> Dict[str, List[str]]:
     }
 
 
+def sync_funding() -> int:
+    # Applies funding events recorded since the last call (here or on another worker); returns how many.
+    global _funding_applied_id
+    with _funding_lock:
+        events = STORE.funding_events_after(_funding_applied_id)
+        if not events:
+            return 0
+        PORTFOLIO.record(events)
+        _funding_applied_id = max(event["id"] for event in events)
+    _touch("investor")
+    return len(events)
+
+
 def get_investor_dashboard() -> Dict[str, Any]:
-    return STATE["investor"]
+    sync_funding()
+    return PORTFOLIO.snapshot()
+
+
+def record_funding(fund_id: str, amount: float, sponsor: str = "") -> Optional[Dict[str, Any]]:
+    if fund_id not in PORTFOLIO.funds:
+        return None
+    record = STORE.insert_funding_event(
+        {"fund_id": fund_id, "sponsor": sponsor, "amount": round(amount, 2), "timestamp": _utc_iso()}
+    )
+    sync_funding()
+    return record
+
+
+def get_investor_history(
+    resolution: str = "day", fund_id: Optional[str] = None, start: Optional[float] = None, end: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    sync_funding()
+    return PORTFOLIO.history(resolution, fund_id, start, end)
 
 
 __all__ = [
     "get_manifesto",
     "get_user",
     "get_feed",
+    "search_feed",
+    "save_feed_index",
     "add_post",
+    "like_post",
+    "flush_likes",
     "get_achievements",
     "add_achievement",
     "get_banking",
+    "get_banking_summary",
+    "add_transactions",
     "get_opportunities",
+    "search_opportunities",
+    "upsert_opportunity",
+    "remove_opportunity",
     "get_notifications",
+    "add_notification",
+    "deliver_notification",
+    "register_user",
+    "resolve_user_id",
     "get_mitra_tips",
     "get_investor_dashboard",
+    "record_funding",
+    "get_investor_history",
+    "section_version",
+    "sync_funding",
+    "sync_opportunities",
+    "rescore_users",
 ]
 
 
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .response_cache import encoded_etag, etag_matches, pick_encoding
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built
+    brotli = None
+
+COMPRESS_MIN_BYTES = 512
+COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# assets/... references in index.html (src="assets/js/app.js", href="/assets/css/main.css").
+_ASSET_REF = re.compile(r"""(?P<prefix>["'(]/?assets/)(?P<path>[^"'()?#]+)""")
+
+
+@dataclass(frozen=True)
+class Asset:
+    content_type: str
+    etag: str
+    body: bytes
+    gzipped: Optional[bytes]
+    brotli: Optional[bytes]
+
+
+def _content_type(path: str) -> str:
+    if path.endswith(".js"):
+        return "application/javascript; charset=utf-8"
+    guessed = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return f"{guessed}; charset=utf-8" if guessed.startswith("text/") else guessed
+
+
+def _compressed(cache_dir: Optional[Path], name: str, compress: Callable[[], bytes]) -> bytes:
+    # Variants are named by content hash, so a cached one is valid for as long as it exists.
+    if cache_dir is None:
+        return compress()
+    cached = cache_dir / name
+    try:
+        return cached.read_bytes()
+    except OSError:
+        pass
+    body = compress()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # Workers starting together compress the same variants: each writes a temp file of its own
+        # and os.replace swaps in a complete one.
+        fd, partial = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(body)
+            os.replace(partial, cached)
+        except BaseException:
+            os.unlink(partial)
+            raise
+    except OSError:
+        pass  # read-only or full disk: serve from memory and compress again next start
+    return body
+
+
+def build_asset(body: bytes, content_type: str, cache_dir: Optional[Path] = None) -> Asset:
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    gzipped = compressed = None
+    if len(body) >= COMPRESS_MIN_BYTES and content_type.startswith(COMPRESSIBLE):
+        gzipped = _compressed(cache_dir, f"{digest}.gz", lambda: gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            compressed = _compressed(cache_dir, f"{digest}.br", lambda: brotli.compress(body, quality=11))
+    return Asset(content_type, f'"{digest}"', body, gzipped, compressed)
+
+
+def fingerprint(path: str, body: bytes) -> str:
+    # css/main.css -> css/main.3f2a9c1e0b.css
+    digest = hashlib.sha256(body).hexdigest()[:10]
+    stem, dot, suffix = path.rpartition(".")
+    return f"{stem}.{digest}.{suffix}" if dot and "/" not in suffix else f"{path}.{digest}"
+
+
+# The SPA bundle, built once at startup: every file under assets/ is served under its
+# content-hashed name (cached forever) and its original name (revalidated), each with gzip and
+# brotli variants, and index.html is rewritten to point at the hashed names and kept in memory.
+# With a cache_dir, the compressed variants are kept on disk so a restart does not redo them.
+class AssetBundle:
+    def __init__(self, frontend_dir: Path, cache_dir: Optional[Path] = None) -> None:
+        self.frontend_dir = frontend_dir
+        self.cache_dir = cache_dir
+        self.assets: Dict[str, Asset] = {}
+        self.immutable: Dict[str, Asset] = {}
+        self.names: Dict[str, str] = {}
+        self.index: Optional[Asset] = None
+
+    def build(self) -> "AssetBundle":
+        assets_dir = self.frontend_dir / "assets"
+        if assets_dir.is_dir():
+            for file in sorted(assets_dir.rglob("*")):
+                if not file.is_file():
+                    continue
+                path = file.relative_to(assets_dir).as_posix()
+                body = file.read_bytes()
+                asset = build_asset(body, _content_type(path), self.cache_dir)
+                hashed = fingerprint(path, body)
+                self.assets[path] = asset
+                self.immutable[hashed] = asset
+                self.names[path] = hashed
+        index_file = self.frontend_dir / "index.html"
+        if index_file.is_file():
+            html = index_file.read_text(encoding="utf-8")
+            html = _ASSET_REF.sub(lambda m: m["prefix"] + self.names.get(m["path"], m["path"]), html)
+            self.index = build_asset(html.encode("utf-8"), "text/html; charset=utf-8", self.cache_dir)
+        return self
+
+    def lookup(self, path: str) -> Tuple[Optional[Asset], bool]:
+        # (asset, immutable) for a path under /assets/.
+        asset = self.immutable.get(path)
+        if asset is not None:
+            return asset, True
+        return self.assets.get(path), False
+
+    def stats(self) -> Dict[str, int]:
+        assets = list(self.assets.values()) + ([self.index] if self.index else [])
+        return {
+            "files": len(self.assets),
+            "bytes": sum(len(asset.body) for asset in assets),
+            "gzip_bytes": sum(len(asset.gzipped or asset.body) for asset in assets),
+            "brotli_bytes": sum(len(asset.brotli or asset.gzipped or asset.body) for asset in assets),
+        }
+
+
+def asset_response(request: Request, asset: Asset, immutable: bool = False) -> Response:
+    offered = tuple(name for name, body in (("br", asset.brotli), ("gzip", asset.gzipped)) if body is not None)
+    encoding = pick_encoding(request.headers.get("accept-encoding", ""), offered) if offered else None
+    etag = encoded_etag(asset.etag, encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE if immutable else "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    body = asset.body
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        body = asset.brotli if encoding == "br" else asset.gzipped
+    return Response(body, media_type=asset.content_type, headers=headers)
+
+
+__all__ = ["Asset", "AssetBundle", "asset_response", "build_asset", "fingerprint"]
@@ -0,0 +1,972 @@
+from __future__ import annotations
+
+import heapq
+import json
+import sqlite3
+import threading
+from bisect import bisect_right
+from itertools import count, islice, takewhile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .banking import category_of
+from .feedlog import FeedLog
+
+# Persistence for the mutable parts of the app state (feed, achievements, banking).
+class Store:
+    name = "base"
+
+    def seed(self, state: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def list_posts(self, before: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def insert_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def posts_after(self, after_id: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        # Oldest first: the posts with ids above `after_id`, for indexes that follow the feed.
+        raise NotImplementedError
+
+    def get_posts(self, post_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        # Posts by id; ids that do not exist (or have aged out of the feed) are left out.
+        raise NotImplementedError
+
+    def list_achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def insert_achievement(self, user_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def put_user(self, profile: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def list_users(self, after: Optional[str] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        # Profiles in user_id order starting past `after`, so batch jobs can page through everyone.
+        raise NotImplementedError
+
+    def list_notifications(self, user_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def insert_notification(self, user_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get_banking(self, user_id: str) -> Dict[str, Any]:
+        # The stored summary (opening balance, iban); transactions are read with list_transactions
+        # or, to build a ledger, as banking_aggregates.
+        raise NotImplementedError
+
+    def banking_aggregates(self, user_id: str, recent: int = 50) -> Dict[str, Any]:
+        # Grouped totals for BankingLedger.restore: (day, income, spend, count) per calendar day,
+        # (category, spend) per spending category, and the newest `recent` transactions, oldest first.
+        raise NotImplementedError
+
+    def put_banking_summary(self, user_id: str, summary: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def list_transactions(self, user_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def insert_transactions(self, user_id: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Returns the rows actually stored: ids already on the ledger (or repeated in `rows`) are skipped.
+        raise NotImplementedError
+
+    def count_posts(self, user_id: str) -> int:
+        raise NotImplementedError
+
+    def scoring_inputs(self, since_month: str) -> Dict[str, List[tuple]]:
+        # Grouped aggregates for the batch DVI job (backend/dvi.py:feature_matrix): every user
+        # with their stored (dvi, band), achievements per (user, year), posts per user, income/spend per (user, month)
+        # from `since_month` ("YYYY-MM") on, and lifetime income/spend per user.
+        raise NotImplementedError
+
+    def put_scores(self, rows: List[tuple]) -> None:
+        # Writes (user_id, dvi, band) into the stored profiles.
+        raise NotImplementedError
+
+    def nudge_inputs(self, user_ids: List[str], since_month: str) -> Dict[str, Dict[str, Any]]:
+        # Per-user context for the weekly Mitra nudges (backend/nudges.py): the three latest
+        # achievement titles, the post count and (month, income, spend) from `since_month` on.
+        raise NotImplementedError
+
+    def liked_posts(self, user_id: str) -> List[int]:
+        raise NotImplementedError
+
+    def list_funding_events(self) -> List[Dict[str, Any]]:
+        # Oldest first.
+        raise NotImplementedError
+
+    def funding_events_after(self, after_id: int) -> List[Dict[str, Any]]:
+        # Events with an id above after_id (recorded since, by any worker), oldest first.
+        raise NotImplementedError
+
+    def opportunity_changes(self, after_revision: int) -> List[Tuple[int, str, Optional[Dict[str, Any]]]]:
+        # (revision, id, opportunity or None once removed) for every write past after_revision, in order.
+        raise NotImplementedError
+
+    def put_opportunity(self, opportunity: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def delete_opportunity(self, opportunity_id: str) -> bool:
+        raise NotImplementedError
+
+    def insert_funding_event(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def like_counts(self, post_ids: List[int]) -> Dict[int, int]:
+        # Stored like_count of each post that exists; unknown ids are left out.
+        raise NotImplementedError
+
+    def apply_likes(self, ops: List[tuple]) -> Dict[int, int]:
+        # Sets (user_id, post_id, liked) in one batch and moves each post's like_count by the likes
+        # that actually changed, so replaying a batch is a no-op. Returns the new counts.
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+def _next_after(items: List[Dict[str, Any]], floor: int) -> count:
+    ids = [item["id"] for item in items if isinstance(item.get("id"), int)]
+    return count(max(ids, default=floor - 1) + 1)
+
+
+# The original behaviour: everything lives in the module-level STATE dict of one process.
+class MemoryStore(Store):
+    name = "memory"
+
+    def __init__(self, feed_retention: int = 50_000) -> None:
+        self._state: Dict[str, Any] = {}
+        self._feed = FeedLog(retention=feed_retention)
+        self._users: Dict[str, Dict[str, Any]] = {}
+        self._achievements: Dict[str, List[Dict[str, Any]]] = {}
+        self._notifications: Dict[str, List[Dict[str, Any]]] = {}
+        self._banking: Dict[str, Dict[str, Any]] = {}
+        self._transactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._transaction_ids: Dict[str, set] = {}
+        # user_id -> day -> [income, spend, count] and user_id -> category -> spend, kept on insert
+        self._transaction_days: Dict[str, Dict[str, List[float]]] = {}
+        self._transaction_categories: Dict[str, Dict[str, float]] = {}
+        self._post_counts: Dict[str, int] = {}
+        self._likes: Dict[str, set] = {}
+        self._funding: List[Dict[str, Any]] = []
+        self._funding_id = count(1)
+        # id -> (revision, opportunity or None once removed)
+        self._opportunities: Dict[str, Tuple[int, Optional[Dict[str, Any]]]] = {}
+        self._opportunity_revision = count(1)
+        self._post_id = count(1000)
+        self._achievement_id = count(2000)
+        self._notification_id = count(3000)
+        self._lock = threading.Lock()
+
+    def seed(self, state: Dict[str, Any]) -> None:
+        self._state = state
+        user = state["user"]
+        user_id = user["user_id"]
+        self._users[user_id] = {k: v for k, v in user.items() if k != "achievements"}
+        self._achievements[user_id] = user.setdefault("achievements", [])
+        self._notifications[user_id] = state["notifications"]
+        self._banking[user_id] = {k: v for k, v in state["banking"].items() if k != "transactions"}
+        self._transactions[user_id] = state["banking"].setdefault("transactions", [])
+        self._transaction_ids[user_id] = {txn["id"] for txn in self._transactions[user_id]}
+        self._roll_up(user_id, self._transactions[user_id])
+        self._feed.extend(state["feed"])
+        for post in state["feed"]:
+            self._post_counts[post["user_id"]] = self._post_counts.get(post["user_id"], 0) + 1
+        self._post_id = _next_after(state["feed"], 1000)
+        self._achievement_id = _next_after(user["achievements"], 2000)
+        self._notification_id = _next_after(state["notifications"], 3000)
+        self._funding = list(state["investor"].get("events", []))
+        self._funding_id = _next_after(self._funding, 1)
+        for opportunity in state["opportunities"]:
+            self._opportunities[opportunity["id"]] = (next(self._opportunity_revision), opportunity)
+
+    def list_posts(self, before: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._feed.page(before, limit)
+
+    def insert_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            post = {"id": next(self._post_id), **post}
+            self._feed.append(post)
+            self._post_counts[post["user_id"]] = self._post_counts.get(post["user_id"], 0) + 1
+        return post
+
+    def posts_after(self, after_id: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        return list(islice(self._feed.oldest_first(after_id), limit))
+
+    def get_posts(self, post_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        posts = (self._feed.get(post_id) for post_id in post_ids)
+        return {post["id"]: post for post in posts if post is not None}
+
+    def list_achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        return self._achievements.get(user_id, [])
+
+    def insert_achievement(self, user_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            record = {"id": next(self._achievement_id), **record}
+            self._achievements.setdefault(user_id, []).insert(0, record)
+        return record
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        profile = self._users.get(user_id)
+        return dict(profile) if profile is not None else None
+
+    def put_user(self, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._users[profile["user_id"]] = dict(profile)
+
+    def list_users(self, after: Optional[str] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        user_ids = sorted(self._users)
+        start = bisect_right(user_ids, after) if after is not None else 0
+        return [dict(self._users[user_id]) for user_id in user_ids[start:start + limit]]
+
+    def list_notifications(self, user_id: str) -> List[Dict[str, Any]]:
+        return self._notifications.get(user_id, [])
+
+    def insert_notification(self, user_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            record = {"id": next(self._notification_id), **record}
+            self._notifications.setdefault(user_id, []).insert(0, record)
+        return record
+
+    def get_banking(self, user_id: str) -> Dict[str, Any]:
+        return dict(self._banking.get(user_id, {}))
+
+    def banking_aggregates(self, user_id: str, recent: int = 50) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._transactions.get(user_id, [])
+            days = sorted((day, *totals) for day, totals in self._transaction_days.get(user_id, {}).items())
+            categories = sorted(self._transaction_categories.get(user_id, {}).items())
+            # Newest by timestamp, ties in insertion order, as a stable sort would leave them.
+            newest = heapq.nlargest(recent, range(len(rows)), key=lambda i: (rows[i]["timestamp"], i))
+        return {"days": days, "categories": categories, "recent": [rows[i] for i in reversed(newest)]}
+
+    def _roll_up(self, user_id: str, rows: List[Dict[str, Any]]) -> None:
+        days = self._transaction_days.setdefault(user_id, {})
+        categories = self._transaction_categories.setdefault(user_id, {})
+        for txn in rows:
+            amount = float(txn["amount"])
+            day = days.setdefault(txn["timestamp"][:10], [0.0, 0.0, 0])
+            day[0] += max(amount, 0.0)
+            day[1] += max(-amount, 0.0)
+            day[2] += 1
+            if amount < 0:
+                category = category_of(txn)
+                categories[category] = categories.get(category, 0.0) - amount
+
+    def put_banking_summary(self, user_id: str, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            self._banking[user_id] = {k: v for k, v in summary.items() if k != "transactions"}
+
+    def list_transactions(self, user_id: str) -> List[Dict[str, Any]]:
+        return self._transactions.get(user_id, [])
+
+    def insert_transactions(self, user_id: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with self._lock:
+            ledger = self._transactions.setdefault(user_id, [])
+            known = self._transaction_ids.setdefault(user_id, set())
+            fresh = []
+            for row in rows:
+                if row["id"] not in known:
+                    known.add(row["id"])
+                    fresh.append(row)
+            ledger.extend(fresh)
+            self._roll_up(user_id, fresh)
+        return fresh
+
+    def count_posts(self, user_id: str) -> int:
+        return self._post_counts.get(user_id, 0)
+
+    def scoring_inputs(self, since_month: str) -> Dict[str, List[tuple]]:
+        achievements: Dict[tuple, int] = {}
+        for user_id, items in self._achievements.items():
+            for item in items:
+                key = (user_id, int(item["year"]))
+                achievements[key] = achievements.get(key, 0) + 1
+        months: Dict[tuple, List[float]] = {}
+        totals = []
+        for user_id, rows in self._transactions.items():
+            income = spend = 0.0
+            for txn in rows:
+                amount = float(txn["amount"])
+                income += max(amount, 0.0)
+                spend += max(-amount, 0.0)
+                month = txn["timestamp"][:7]
+                if month >= since_month:
+                    bucket = months.setdefault((user_id, month), [0.0, 0.0])
+                    bucket[0] += max(amount, 0.0)
+                    bucket[1] += max(-amount, 0.0)
+            totals.append((user_id, income, spend))
+        return {
+            "users": [(user_id, p.get("dvi"), p.get("band")) for user_id, p in self._users.items()],
+            "achievements": [(user_id, year, n) for (user_id, year), n in achievements.items()],
+            "posts": list(self._post_counts.items()),
+            "months": [(user_id, month, income, spend) for (user_id, month), (income, spend) in months.items()],
+            "totals": totals,
+        }
+
+    def nudge_inputs(self, user_ids: List[str], since_month: str) -> Dict[str, Dict[str, Any]]:
+        inputs = {}
+        for user_id in user_ids:
+            months: Dict[str, List[float]] = {}
+            for txn in self._transactions.get(user_id, []):
+                month = txn["timestamp"][:7]
+                if month >= since_month:
+                    amount = float(txn["amount"])
+                    bucket = months.setdefault(month, [0.0, 0.0])
+                    bucket[0] += max(amount, 0.0)
+                    bucket[1] += max(-amount, 0.0)
+            latest = sorted(self._achievements.get(user_id, []), key=lambda item: (item["year"], item["id"]), reverse=True)
+            inputs[user_id] = {
+                "achievements": [item["title"] for item in latest[:3]],
+                "posts": self._post_counts.get(user_id, 0),
+                "months": [(month, income, spend) for month, (income, spend) in sorted(months.items())],
+            }
+        return inputs
+
+    def put_scores(self, rows: List[tuple]) -> None:
+        with self._lock:
+            for user_id, dvi, band in rows:
+                profile = self._users.get(user_id)
+                if profile is not None:
+                    profile["dvi"] = dvi
+                    profile["band"] = band
+
+    def liked_posts(self, user_id: str) -> List[int]:
+        return list(self._likes.get(user_id, ()))
+
+    def list_funding_events(self) -> List[Dict[str, Any]]:
+        return list(self._funding)
+
+    def funding_events_after(self, after_id: int) -> List[Dict[str, Any]]:
+        newer = list(takewhile(lambda event: event["id"] > after_id, reversed(self._funding)))
+        return sorted(newer, key=lambda event: (event["timestamp"], event["id"]))
+
+    def opportunity_changes(self, after_revision: int) -> List[Tuple[int, str, Optional[Dict[str, Any]]]]:
+        return sorted(
+            (revision, opportunity_id, opportunity)
+            for opportunity_id, (revision, opportunity) in self._opportunities.items()
+            if revision > after_revision
+        )
+
+    def put_opportunity(self, opportunity: Dict[str, Any]) -> None:
+        with self._lock:
+            self._opportunities[opportunity["id"]] = (next(self._opportunity_revision), opportunity)
+
+    def delete_opportunity(self, opportunity_id: str) -> bool:
+        with self._lock:
+            current = self._opportunities.get(opportunity_id)
+            if current is None or current[1] is None:
+                return False
+            self._opportunities[opportunity_id] = (next(self._opportunity_revision), None)
+            return True
+
+    def insert_funding_event(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            record = {"id": next(self._funding_id), **record}
+            self._funding.append(record)
+        return record
+
+    def like_counts(self, post_ids: List[int]) -> Dict[int, int]:
+        posts = (self._feed.get(post_id) for post_id in post_ids)
+        return {post["id"]: post.get("like_count", 0) for post in posts if post is not None}
+
+    def apply_likes(self, ops: List[tuple]) -> Dict[int, int]:
+        with self._lock:
+            for user_id, post_id, liked in ops:
+                post = self._feed.get(post_id)
+                liked_set = self._likes.setdefault(user_id, set())
+                if post is None or (post_id in liked_set) == liked:
+                    continue
+                if liked:
+                    liked_set.add(post_id)
+                    post["like_count"] = post.get("like_count", 0) + 1
+                else:
+                    liked_set.discard(post_id)
+                    post["like_count"] = max(post.get("like_count", 0) - 1, 0)
+        return self.like_counts(list({post_id for _, post_id, _ in ops}))
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    display_name TEXT NOT NULL,
+    dvi INTEGER NOT NULL DEFAULT 0,
+    text TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    like_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_posts_created ON posts (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_posts_user ON posts (user_id);
+CREATE TABLE IF NOT EXISTS achievements (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    year INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_achievements_user ON achievements (user_id, year DESC, id DESC);
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS notifications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications (user_id, id DESC);
+CREATE TABLE IF NOT EXISTS banking (
+    user_id TEXT PRIMARY KEY,
+    summary TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    counterparty TEXT NOT NULL,
+    reference TEXT NOT NULL DEFAULT '',
+    amount REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (user_id, id)
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_time ON transactions (user_id, timestamp);
+-- Per-day and per-category totals, updated in the same write as the transactions they cover, so
+-- rebuilding a ledger reads one row per day instead of the whole history.
+CREATE TABLE IF NOT EXISTS transaction_days (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    income REAL NOT NULL,
+    spend REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user_id, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS transaction_categories (
+    user_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    spend REAL NOT NULL,
+    PRIMARY KEY (user_id, category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS likes (
+    post_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    PRIMARY KEY (post_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_likes_user ON likes (user_id, post_id);
+CREATE TABLE IF NOT EXISTS funding_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fund_id TEXT NOT NULL,
+    sponsor TEXT NOT NULL DEFAULT '',
+    amount REAL NOT NULL,
+    timestamp TEXT NOT NULL
+);
+-- Removed opportunities keep their row with a NULL record, so a removed seed entry stays removed
+-- and every worker sees the removal as a change past the revision it last applied.
+CREATE TABLE IF NOT EXISTS opportunities (
+    id TEXT PRIMARY KEY,
+    record TEXT,
+    revision INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_opportunities_revision ON opportunities (revision);
+"""
+
+# Adds the totals of the transactions matching `where` onto the rollup tables; callers hold the write lock.
+def _roll_up(conn: sqlite3.Connection, where: str, params: Any = ()) -> None:
+    conn.execute(
+        "INSERT INTO transaction_days (user_id, day, income, spend, count) "
+        "SELECT user_id, substr(timestamp, 1, 10) AS day, total(CASE WHEN amount > 0 THEN amount END), "
+        f"total(CASE WHEN amount < 0 THEN -amount END), count(*) FROM transactions WHERE {where} "
+        "GROUP BY user_id, day ON CONFLICT (user_id, day) DO UPDATE SET income = income + excluded.income, "
+        "spend = spend + excluded.spend, count = count + excluded.count",
+        params,
+    )
+    conn.execute(
+        "INSERT INTO transaction_categories (user_id, category, spend) "
+        "SELECT user_id, CASE WHEN category != '' THEN category ELSE 'Uncategorized' END AS name, total(-amount) "
+        f"FROM transactions WHERE amount < 0 AND ({where}) GROUP BY user_id, name "
+        "ON CONFLICT (user_id, category) DO UPDATE SET spend = spend + excluded.spend",
+        params,
+    )
+
+
+# Bump when seed data gains new tables; seeding is idempotent (explicit ids, INSERT OR IGNORE).
+SEED_VERSION = 5
+
+# Columns added after the first release, created on open for databases that predate them.
+MIGRATIONS = (
+    ("transactions", "category", "ALTER TABLE transactions ADD COLUMN category TEXT NOT NULL DEFAULT ''"),
+)
+
+
+# SQLite in WAL mode so several uvicorn workers can share one database file.
+class SQLiteStore(Store):
+    name = "sqlite"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        for table, column, ddl in MIGRATIONS:
+            columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column not in columns:
+                conn.execute(ddl)
+        # Databases from before the rollup tables get them filled once from the full history.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'transaction_rollups'").fetchone() is None:
+                conn.execute("DELETE FROM transaction_days")
+                conn.execute("DELETE FROM transaction_categories")
+                _roll_up(conn, "1")
+                conn.execute("INSERT INTO meta (key, value) VALUES ('transaction_rollups', '1')")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            # Large enough for the transaction indexes touched by a bulk import batch.
+            conn.execute("PRAGMA cache_size=-32768")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql: str, params: Any = ()) -> sqlite3.Cursor:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute(sql, params)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return cur
+
+    def seed(self, state: Dict[str, Any]) -> None:
+        # Every worker calls this on import; BEGIN IMMEDIATE makes exactly one of them load the seed.
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'seed_version'").fetchone()
+            if row is not None:
+                version = int(row["value"])
+            else:
+                version = 1 if conn.execute("SELECT 1 FROM meta WHERE key = 'seeded'").fetchone() else 0
+            if version >= SEED_VERSION:
+                conn.execute("COMMIT")
+                return
+            user = state["user"]
+            user_id = user["user_id"]
+            conn.execute(
+                "INSERT OR IGNORE INTO users (user_id, profile) VALUES (?, ?)",
+                (user_id, json.dumps({k: v for k, v in user.items() if k != "achievements"})),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO notifications (id, user_id, title, body, created_at) "
+                "VALUES (:id, :user_id, :title, :body, :created_at)",
+                [{**item, "user_id": user_id} for item in state["notifications"]],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO posts (id, user_id, display_name, dvi, text, created_at, like_count) "
+                "VALUES (:id, :user_id, :display_name, :dvi, :text, :created_at, :like_count)",
+                state["feed"],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO achievements (id, user_id, title, year) VALUES (:id, :user_id, :title, :year)",
+                [{**item, "user_id": user_id} for item in state["user"].get("achievements", [])],
+            )
+            banking = {k: v for k, v in state["banking"].items() if k != "transactions"}
+            conn.execute(
+                "INSERT OR IGNORE INTO banking (user_id, summary) VALUES (?, ?)",
+                (user_id, json.dumps(banking)),
+            )
+            transactions = [
+                {"category": "", **txn, "user_id": user_id} for txn in state["banking"].get("transactions", [])
+            ]
+            conn.executemany(
+                "INSERT OR IGNORE INTO transactions (id, user_id, counterparty, reference, amount, timestamp, category) "
+                "VALUES (:id, :user_id, :counterparty, :reference, :amount, :timestamp, :category)",
+                transactions,
+            )
+            # Seed rows loaded before categories existed pick theirs up here.
+            conn.executemany(
+                "UPDATE transactions SET category = :category WHERE user_id = :user_id AND id = :id AND category = ''",
+                transactions,
+            )
+            conn.execute("DELETE FROM transaction_days WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM transaction_categories WHERE user_id = ?", (user_id,))
+            _roll_up(conn, "user_id = ?", (user_id,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO funding_events (id, fund_id, sponsor, amount, timestamp) "
+                "VALUES (:id, :fund_id, :sponsor, :amount, :timestamp)",
+                state["investor"].get("events", []),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO opportunities (id, record, revision) "
+                "VALUES (?, ?, (SELECT COALESCE(MAX(revision), 0) + 1 FROM opportunities))",
+                [(item["id"], json.dumps(item)) for item in state["opportunities"]],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('seed_version', ?)", (str(SEED_VERSION),)
+            )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def list_posts(self, before: Optional[int] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        # Keyset pagination on the rowid: each page is an index range scan of `limit` rows.
+        rows = self._conn().execute(
+            "SELECT id, user_id, display_name, dvi, text, created_at, like_count "
+            "FROM posts WHERE id < ? ORDER BY id DESC LIMIT ?",
+            (before if before is not None else 2**63 - 1, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def insert_post(self, post: Dict[str, Any]) -> Dict[str, Any]:
+        cur = self._write(
+            "INSERT INTO posts (user_id, display_name, dvi, text, created_at, like_count) "
+            "VALUES (:user_id, :display_name, :dvi, :text, :created_at, :like_count)",
+            post,
+        )
+        return {"id": cur.lastrowid, **post}
+
+    def posts_after(self, after_id: int, limit: int = 1000) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT id, user_id, display_name, dvi, text, created_at, like_count "
+            "FROM posts WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def get_posts(self, post_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        conn = self._conn()
+        posts: Dict[int, Dict[str, Any]] = {}
+        for start in range(0, len(post_ids), 500):
+            chunk = post_ids[start:start + 500]
+            rows = conn.execute(
+                "SELECT id, user_id, display_name, dvi, text, created_at, like_count "
+                f"FROM posts WHERE id IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            posts.update((row["id"], dict(row)) for row in rows)
+        return posts
+
+    def list_achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT id, title, year FROM achievements WHERE user_id = ? ORDER BY year DESC, id DESC",
+            (user_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def insert_achievement(self, user_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        cur = self._write(
+            "INSERT INTO achievements (user_id, title, year) VALUES (?, ?, ?)",
+            (user_id, record["title"], record["year"]),
+        )
+        return {"id": cur.lastrowid, **record}
+
+    def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT profile FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row["profile"]) if row else None
+
+    def put_user(self, profile: Dict[str, Any]) -> None:
+        self._write(
+            "INSERT INTO users (user_id, profile) VALUES (?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET profile = excluded.profile",
+            (profile["user_id"], json.dumps(profile)),
+        )
+
+    def list_users(self, after: Optional[str] = None, limit: int = 500) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT profile FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?", (after or "", limit)
+        )
+        return [json.loads(row["profile"]) for row in rows]
+
+    def list_notifications(self, user_id: str) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT id, title, body, created_at FROM notifications WHERE user_id = ? ORDER BY id DESC",
+            (user_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def insert_notification(self, user_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        cur = self._write(
+            "INSERT INTO notifications (user_id, title, body, created_at) VALUES (?, ?, ?, ?)",
+            (user_id, record["title"], record["body"], record["created_at"]),
+        )
+        return {"id": cur.lastrowid, **record}
+
+    def get_banking(self, user_id: str) -> Dict[str, Any]:
+        row = self._conn().execute("SELECT summary FROM banking WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row["summary"]) if row else {}
+
+    def banking_aggregates(self, user_id: str, recent: int = 50) -> Dict[str, Any]:
+        conn = self._conn()
+        # One read transaction so the rollups and the recent rows agree; only `recent` raw rows
+        # are read, the totals come from the tables insert_transactions keeps up to date.
+        conn.execute("BEGIN")
+        try:
+            days = conn.execute(
+                "SELECT day, income, spend, count FROM transaction_days WHERE user_id = ? ORDER BY day", (user_id,)
+            ).fetchall()
+            categories = conn.execute(
+                "SELECT category, spend FROM transaction_categories WHERE user_id = ? ORDER BY category", (user_id,)
+            ).fetchall()
+            newest = conn.execute(
+                "SELECT id, counterparty, reference, amount, timestamp, category FROM transactions "
+                "WHERE user_id = ? ORDER BY timestamp DESC, rowid DESC LIMIT ?",
+                (user_id, recent),
+            ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+        return {
+            "days": [tuple(row) for row in days],
+            "categories": [tuple(row) for row in categories],
+            "recent": [dict(row) for row in reversed(newest)],
+        }
+
+    def put_banking_summary(self, user_id: str, summary: Dict[str, Any]) -> None:
+        self._write(
+            "INSERT INTO banking (user_id, summary) VALUES (?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET summary = excluded.summary",
+            (user_id, json.dumps({k: v for k, v in summary.items() if k != "transactions"})),
+        )
+
+    def list_transactions(self, user_id: str) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT id, counterparty, reference, amount, timestamp, category FROM transactions "
+            "WHERE user_id = ? ORDER BY timestamp, rowid",
+            (user_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def insert_transactions(self, user_id: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Under the write lock new rows get rowids above the current maximum, so the ids past
+            # it are exactly the ones this call added (duplicates are ignored by the primary key).
+            start = conn.execute("SELECT coalesce(max(rowid), 0) FROM transactions").fetchone()[0]
+            changes = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO transactions (id, user_id, counterparty, reference, amount, timestamp, category) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (row["id"], user_id, row["counterparty"], row.get("reference", ""), row["amount"],
+                     row["timestamp"], row.get("category", ""))
+                    for row in rows
+                ],
+            )
+            _roll_up(conn, "rowid > ?", (start,))
+            if conn.total_changes - changes == len(rows):
+                fresh = list(rows)
+            else:
+                added = {row["id"] for row in conn.execute("SELECT id FROM transactions WHERE rowid > ?", (start,))}
+                fresh = []
+                for row in rows:
+                    if row["id"] in added:
+                        added.discard(row["id"])
+                        fresh.append(row)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return fresh
+
+    def count_posts(self, user_id: str) -> int:
+        return self._conn().execute("SELECT count(*) FROM posts WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def scoring_inputs(self, since_month: str) -> Dict[str, List[tuple]]:
+        conn = self._conn()
+        # One read transaction so every aggregate sees the same snapshot.
+        conn.execute("BEGIN")
+        try:
+            return {
+                "users": [
+                    tuple(row)
+                    for row in conn.execute(
+                        "SELECT user_id, json_extract(profile, '$.dvi'), json_extract(profile, '$.band') FROM users"
+                    )
+                ],
+                "achievements": [
+                    tuple(row)
+                    for row in conn.execute("SELECT user_id, year, count(*) FROM achievements GROUP BY user_id, year")
+                ],
+                "posts": [tuple(row) for row in conn.execute("SELECT user_id, count(*) FROM posts GROUP BY user_id")],
+                "months": [
+                    tuple(row)
+                    for row in conn.execute(
+                        "SELECT user_id, substr(timestamp, 1, 7) AS month, "
+                        "sum(max(amount, 0)), sum(max(-amount, 0)) FROM transactions "
+                        "WHERE timestamp >= ? GROUP BY user_id, month",
+                        (since_month,),
+                    )
+                ],
+                "totals": [
+                    tuple(row)
+                    for row in conn.execute(
+                        "SELECT user_id, sum(max(amount, 0)), sum(max(-amount, 0)) FROM transactions GROUP BY user_id"
+                    )
+                ],
+            }
+        finally:
+            conn.execute("COMMIT")
+
+    def put_scores(self, rows: List[tuple]) -> None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "UPDATE users SET profile = json_set(profile, '$.dvi', ?, '$.band', ?) WHERE user_id = ?",
+                [(int(dvi), band, user_id) for user_id, dvi, band in rows],
+            )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def nudge_inputs(self, user_ids: List[str], since_month: str) -> Dict[str, Dict[str, Any]]:
+        conn = self._conn()
+        inputs = {user_id: {"achievements": [], "posts": 0, "months": []} for user_id in user_ids}
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for row in conn.execute(
+                "SELECT user_id, title FROM (SELECT user_id, title, row_number() OVER "
+                "(PARTITION BY user_id ORDER BY year DESC, id DESC) AS n "
+                f"FROM achievements WHERE user_id IN ({marks})) WHERE n <= 3",
+                chunk,
+            ):
+                inputs[row[0]]["achievements"].append(row[1])
+            for row in conn.execute(
+                f"SELECT user_id, count(*) FROM posts WHERE user_id IN ({marks}) GROUP BY user_id", chunk
+            ):
+                inputs[row[0]]["posts"] = row[1]
+            for row in conn.execute(
+                "SELECT user_id, substr(timestamp, 1, 7) AS month, sum(max(amount, 0)), sum(max(-amount, 0)) "
+                f"FROM transactions WHERE user_id IN ({marks}) AND timestamp >= ? "
+                "GROUP BY user_id, month ORDER BY user_id, month",
+                [*chunk, since_month],
+            ):
+                inputs[row[0]]["months"].append((row[1], row[2], row[3]))
+        return inputs
+
+    def list_funding_events(self) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT id, fund_id, sponsor, amount, timestamp FROM funding_events ORDER BY timestamp, id"
+        )
+        return [dict(row) for row in rows]
+
+    def funding_events_after(self, after_id: int) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT id, fund_id, sponsor, amount, timestamp FROM funding_events WHERE id > ? ORDER BY timestamp, id",
+            (after_id,),
+        )
+        return [dict(row) for row in rows]
+
+    def opportunity_changes(self, after_revision: int) -> List[Tuple[int, str, Optional[Dict[str, Any]]]]:
+        rows = self._conn().execute(
+            "SELECT revision, id, record FROM opportunities WHERE revision > ? ORDER BY revision", (after_revision,)
+        )
+        return [(row[0], row[1], json.loads(row[2]) if row[2] is not None else None) for row in rows]
+
+    def put_opportunity(self, opportunity: Dict[str, Any]) -> None:
+        self._write(
+            "INSERT OR REPLACE INTO opportunities (id, record, revision) "
+            "VALUES (?, ?, (SELECT COALESCE(MAX(revision), 0) + 1 FROM opportunities))",
+            (opportunity["id"], json.dumps(opportunity)),
+        )
+
+    def delete_opportunity(self, opportunity_id: str) -> bool:
+        cur = self._write(
+            "UPDATE opportunities SET record = NULL, "
+            "revision = (SELECT COALESCE(MAX(revision), 0) + 1 FROM opportunities) "
+            "WHERE id = ? AND record IS NOT NULL",
+            (opportunity_id,),
+        )
+        return cur.rowcount > 0
+
+    def insert_funding_event(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        cur = self._write(
+            "INSERT INTO funding_events (fund_id, sponsor, amount, timestamp) "
+            "VALUES (:fund_id, :sponsor, :amount, :timestamp)",
+            record,
+        )
+        return {"id": cur.lastrowid, **record}
+
+    def liked_posts(self, user_id: str) -> List[int]:
+        rows = self._conn().execute("SELECT post_id FROM likes WHERE user_id = ?", (user_id,))
+        return [row[0] for row in rows]
+
+    def like_counts(self, post_ids: List[int]) -> Dict[int, int]:
+        conn = self._conn()
+        counts: Dict[int, int] = {}
+        for start in range(0, len(post_ids), 500):
+            chunk = post_ids[start:start + 500]
+            rows = conn.execute(
+                f"SELECT id, like_count FROM posts WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            counts.update((row[0], row[1]) for row in rows)
+        return counts
+
+    def apply_likes(self, ops: List[tuple]) -> Dict[int, int]:
+        # One write transaction per flush however many likes it carries; each post row is updated once.
+        conn = self._conn()
+        changes: Dict[int, int] = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for user_id, post_id, liked in ops:
+                if liked:
+                    cur = conn.execute(
+                        "INSERT OR IGNORE INTO likes (post_id, user_id) SELECT id, ? FROM posts WHERE id = ?",
+                        (user_id, post_id),
+                    )
+                else:
+                    cur = conn.execute("DELETE FROM likes WHERE post_id = ? AND user_id = ?", (post_id, user_id))
+                if cur.rowcount > 0:
+                    changes[post_id] = changes.get(post_id, 0) + (1 if liked else -1)
+            conn.executemany(
+                "UPDATE posts SET like_count = MAX(like_count + ?, 0) WHERE id = ?",
+                [(delta, post_id) for post_id, delta in changes.items() if delta],
+            )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return self.like_counts(list({post_id for _, post_id, _ in ops}))
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def open_store(backend: str, path: str, feed_retention: int = 50_000) -> Store:
+    if backend == "memory":
+        return MemoryStore(feed_retention=feed_retention)
+    if backend == "sqlite":
+        return SQLiteStore(path)
+    raise ValueError(f"Unknown storage backend: {backend!r}")
+
+
+__all__ = ["Store", "MemoryStore", "SQLiteStore", "open_store"]
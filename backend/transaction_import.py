@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import json
+import math
+import re
+import time
+from datetime import date
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional
+
+FORMATS = ("ndjson", "csv")
+REQUIRED = ("id", "counterparty", "amount", "timestamp")
+# The ledger buckets rows by the first ten characters as numpy datetime64[D], which only takes
+# calendar dates; date.fromisoformat alone would also let ISO week dates ("2024-W01-1") through.
+_DAY = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def detect_format(content_type: Optional[str], explicit: Optional[str] = None) -> str:
+    if explicit:
+        return explicit
+    return "csv" if content_type and "csv" in content_type else "ndjson"
+
+
+def normalize_row(raw: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        ident, counterparty, amount, timestamp = raw["id"], raw["counterparty"], raw["amount"], raw["timestamp"]
+    except KeyError:
+        ident = counterparty = amount = timestamp = None
+    if ident in (None, "") or counterparty in (None, "") or amount in (None, "") or not timestamp:
+        missing = [key for key in REQUIRED if raw.get(key) in (None, "")]
+        raise ValueError(f"missing {', '.join(missing)}")
+    amount = float(amount)
+    if not math.isfinite(amount):
+        raise ValueError("amount is not a finite number")
+    timestamp = str(timestamp).strip()
+    if not _DAY.fullmatch(timestamp[:10]):
+        raise ValueError("timestamp must start with a YYYY-MM-DD date")
+    date.fromisoformat(timestamp[:10])
+    return {
+        "id": str(ident).strip(),
+        "counterparty": str(counterparty),
+        "reference": str(raw.get("reference") or ""),
+        "amount": round(amount, 2),
+        "timestamp": timestamp,
+        "category": str(raw.get("category") or ""),
+    }
+
+
+# Splits an arbitrarily chunked byte stream into decoded lines without holding more than
+# one partial line between chunks.
+class LineSplitter:
+    def __init__(self) -> None:
+        self._tail = b""
+        self._first = True
+
+    def feed(self, chunk: bytes) -> List[str]:
+        data = self._tail + chunk
+        lines = data.split(b"\n")
+        self._tail = lines.pop()
+        return self._decode(lines)
+
+    def close(self) -> List[str]:
+        tail, self._tail = self._tail, b""
+        return self._decode([tail]) if tail else []
+
+    def _decode(self, lines: List[bytes]) -> List[str]:
+        if self._first and lines:
+            self._first = False
+            if lines[0].startswith(b"\xef\xbb\xbf"):
+                lines[0] = lines[0][3:]
+        return [line.decode("utf-8", errors="replace").rstrip("\r") for line in lines]
+
+
+# Counts and the first few rejected lines of one import.
+class ImportReport:
+    def __init__(self, fmt: str, max_rejects: int = 100) -> None:
+        self.format = fmt
+        self.max_rejects = max_rejects
+        self.lines = 0
+        self.accepted = 0
+        self.inserted = 0
+        self.batches = 0
+        self.rejected = 0
+        self.rejected_lines: List[Dict[str, Any]] = []
+        self._started = time.perf_counter()
+
+    def reject(self, line: int, error: str, text: str = "") -> None:
+        self.rejected += 1
+        if len(self.rejected_lines) < self.max_rejects:
+            self.rejected_lines.append({"line": line, "error": error, "text": text[:200]})
+
+    def as_dict(self) -> Dict[str, Any]:
+        seconds = time.perf_counter() - self._started
+        return {
+            "format": self.format,
+            "lines": self.lines,
+            "accepted": self.accepted,
+            "inserted": self.inserted,
+            "duplicates": self.accepted - self.inserted,
+            "rejected": self.rejected,
+            "rejected_lines": self.rejected_lines,
+            "batches": self.batches,
+            "seconds": round(seconds, 3),
+            "rows_per_sec": round(self.lines / seconds) if seconds > 0 else 0,
+        }
+
+
+def _ndjson_rows(lines: List[str], first_line: int, report: ImportReport) -> Iterator[Dict[str, Any]]:
+    for offset, text in enumerate(lines):
+        if not text.strip():
+            continue
+        number = first_line + offset
+        try:
+            raw = json.loads(text)
+            if not isinstance(raw, dict):
+                raise ValueError("expected a JSON object")
+            yield normalize_row(raw)
+        except (ValueError, TypeError) as exc:
+            report.reject(number, str(exc), text)
+
+
+def _csv_rows(
+    lines: List[str], first_line: int, header: List[str], report: ImportReport
+) -> Iterator[Dict[str, Any]]:
+    # One record per line; a quoted field spanning lines is rejected rather than stitched.
+    for offset, fields in enumerate(csv.reader(lines)):
+        if not fields:
+            continue
+        number = first_line + offset
+        try:
+            if len(fields) != len(header):
+                raise ValueError(f"expected {len(header)} fields, got {len(fields)}")
+            yield normalize_row(dict(zip(header, fields)))
+        except (ValueError, TypeError) as exc:
+            report.reject(number, str(exc), lines[offset])
+
+
+async def import_transactions(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    write: Callable[[List[Dict[str, Any]]], Awaitable[int]],
+    batch_size: int = 20000,
+    max_rejects: int = 100,
+) -> Dict[str, Any]:
+    # Parsing the next batch overlaps with the store write of the previous one; at most one
+    # write is outstanding, so memory stays at about two batches whatever the upload size.
+    report = ImportReport(fmt, max_rejects)
+    splitter = LineSplitter()
+    header: Optional[List[str]] = None
+    batch: List[Dict[str, Any]] = []
+    pending: Optional[asyncio.Task] = None
+
+    async def flush() -> None:
+        nonlocal batch, pending
+        if pending is not None:
+            report.inserted += await pending
+            pending = None
+        if batch:
+            report.batches += 1
+            pending = asyncio.ensure_future(write(batch))
+            batch = []
+
+    async def consume(lines: List[str]) -> None:
+        nonlocal header
+        first_line = report.lines + 1
+        report.lines += len(lines)
+        if fmt == "csv":
+            if header is None:
+                while lines and not lines[0].strip():
+                    lines, first_line = lines[1:], first_line + 1
+                if not lines:
+                    return
+                header = [name.strip().lower() for name in next(csv.reader([lines[0]]))]
+                lines, first_line = lines[1:], first_line + 1
+                report.lines -= 1
+            rows = _csv_rows(lines, first_line, header, report)
+        else:
+            rows = _ndjson_rows(lines, first_line, report)
+        for row in rows:
+            report.accepted += 1
+            batch.append(row)
+            if len(batch) >= batch_size:
+                await flush()
+
+    try:
+        async for chunk in chunks:
+            if chunk:
+                await consume(splitter.feed(chunk))
+        await consume(splitter.close())
+        await flush()
+        await flush()
+    finally:
+        if pending is not None and not pending.done():
+            await asyncio.wait([pending])
+    return report.as_dict()
+
+
+__all__ = ["FORMATS", "ImportReport", "LineSplitter", "detect_format", "import_transactions", "normalize_row"]
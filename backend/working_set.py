@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .banking import BankingLedger
+
+
+@dataclass
+class UserPartition:
+    profile: Dict[str, Any]
+    achievements: List[Dict[str, Any]] = field(default_factory=list)
+    banking: Dict[str, Any] = field(default_factory=dict)
+    notifications: List[Dict[str, Any]] = field(default_factory=list)
+    ledger: BankingLedger = field(default_factory=BankingLedger)
+    liked: Set[int] = field(default_factory=set)  # ids of posts this user likes
+
+
+def approx_size(obj: Any) -> int:
+    # Rough deep size of JSON-like data; only used to budget the working set.
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += approx_size(key) + approx_size(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            size += approx_size(value)
+    return size
+
+
+def partition_size(partition: UserPartition) -> int:
+    return (
+        approx_size(partition.profile)
+        + approx_size(partition.achievements)
+        + approx_size(partition.banking)
+        + approx_size(partition.notifications)
+        + partition.ledger.nbytes
+        + approx_size(list(partition.ledger.recent))
+        + sys.getsizeof(partition.liked)
+    )
+
+
+# One in-flight load; concurrent misses for the same user wait on it instead of loading again.
+@dataclass
+class _Load:
+    done: threading.Event = field(default_factory=threading.Event)
+    partition: Optional[UserPartition] = None
+    error: Optional[BaseException] = None
+    stale: bool = False  # invalidated while loading, so the result is returned but not cached
+
+
+# Bounded LRU of hot user partitions in front of the store. Evicts least recently used
+# users once either the entry cap or the approximate byte budget is exceeded.
+class UserWorkingSet:
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[UserPartition]],
+        max_bytes: int = 64 * 1024 * 1024,
+        max_users: int = 5000,
+    ) -> None:
+        self._loader = loader
+        self.max_bytes = max_bytes
+        self.max_users = max_users
+        self._entries: "OrderedDict[str, tuple[UserPartition, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._loading: Dict[str, _Load] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: str) -> Optional[UserPartition]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            load = self._loading.get(user_id)
+            leader = load is None
+            if leader:
+                load = self._loading[user_id] = _Load()
+        if not leader:
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+            return load.partition
+        try:
+            load.partition = self._loader(user_id)
+        except BaseException as exc:
+            load.error = exc
+            raise
+        finally:
+            with self._lock:
+                if self._loading.get(user_id) is load:
+                    del self._loading[user_id]
+                if load.partition is not None and not load.stale:
+                    self.put(user_id, load.partition)
+            load.done.set()
+        return load.partition
+
+    def peek(self, user_id: str) -> Optional[UserPartition]:
+        # Cached partition without loading it or touching recency.
+        with self._lock:
+            entry = self._entries.get(user_id)
+            return entry[0] if entry is not None else None
+
+    def put(self, user_id: str, partition: UserPartition) -> None:
+        size = partition_size(partition)
+        with self._lock:
+            previous = self._entries.pop(user_id, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[user_id] = (partition, size)
+            self._bytes += size
+            self._evict()
+
+    def refresh(self, user_id: str) -> None:
+        # Re-measure a partition after it was mutated in place. A load still in flight may have read
+        # the store before the change, so it is not cached.
+        with self._lock:
+            self._abandon(user_id)
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self.put(user_id, entry[0])
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self._abandon(user_id)
+            entry = self._entries.pop(user_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def _abandon(self, user_id: str) -> None:
+        load = self._loading.pop(user_id, None)
+        if load is not None:
+            load.stale = True
+
+    def _evict(self) -> None:
+        while len(self._entries) > 1 and (len(self._entries) > self.max_users or self._bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "users": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+__all__ = ["UserPartition", "UserWorkingSet", "approx_size"]
@@ -26,6 +26,8 @@ const DVI_BANDS = [
   { grade: 'E', min: 0, max: 449, label: 'Foundation', message: 'Start logging milestones. Complete ID checks to unlock the next tier.' },
 ];
 
+const FEED_PAGE_SIZE = 20;
+
 const state = {
   route: 'manifesto',
   mode: localStorage.getItem('mm_mode_v5') || 'student',
@@ -49,10 +51,14 @@ function toast(message) {
   }, 2500);
 }
 
+function userHeaders() {
+  return state.user?.user_id ? { 'X-User-Id': state.user.user_id } : {};
+}
+
 async function fetchJSON(path, options = {}) {
   const res = await fetch(`${API_BASE}${path}`, {
-    headers: { 'Content-Type': 'application/json', ...(options.headers || {}) },
     ...options,
+    headers: { 'Content-Type': 'application/json', ...userHeaders(), ...(options.headers || {}) },
   });
   if (!res.ok) {
     const text = await res.text();
@@ -139,8 +145,9 @@ async function handleSignIn() {
     toast(`Welcome, ${user.name.split(' ')[0]}!`);
     closeAuth();
     Object.keys(state.cache).forEach(key => { if (key !== 'manifesto') delete state.cache[key]; });
-    await loaders.profile(true);
-    navigate(state.route, true);
+    await loadBootstrap(Object.keys(bootstrapTargets).filter(name => name !== 'manifesto'));
+    navigate(state.route);
+    connectEvents();
   } catch (err) {
     console.error(err);
     toast('Unable to sign in. Try again.');
@@ -207,8 +214,9 @@ const loaders = {
   },
   async feed(force = false) {
     if (!force && state.cache.feed) return;
-    const data = await fetchJSON('/api/feed');
+    const data = await fetchJSON(`/api/feed?limit=${FEED_PAGE_SIZE}`);
     state.cache.feed = data.items || [];
+    state.cache.feedNext = data.next_before ?? null;
   },
   async opportunities(force = false) {
     if (!force && state.cache.opportunities) return;
@@ -221,7 +229,13 @@ const loaders = {
   },
   async investor(force = false) {
     if (!force && state.cache.investor) return;
-    state.cache.investor = await fetchJSON('/api/investor');
+    const resolution = state.cache.investorResolution || 'day';
+    const [dashboard, history] = await Promise.all([
+      fetchJSON('/api/investor'),
+      fetchJSON(`/api/investor/history?resolution=${resolution}`),
+    ]);
+    state.cache.investor = dashboard;
+    state.cache.investorHistory = history;
   },
   async mitra(force = false) {
     if (!force && state.cache.mitra) return;
@@ -229,6 +243,37 @@ const loaders = {
   },
 };
 
+// /api/bootstrap resources and where each lands in state.cache; one request fills them all.
+const bootstrapTargets = {
+  manifesto: data => { state.cache.manifesto = data; },
+  profile: data => { state.cache.profile = data; },
+  feed: data => {
+    state.cache.feed = data.items || [];
+    state.cache.feedNext = data.next_before ?? null;
+  },
+  opportunities: data => { state.cache.opportunities = data.items || []; },
+  banking: data => { state.cache.banking = data; },
+  investor: data => { state.cache.investor = data; },
+  investor_history: data => { state.cache.investorHistory = data; },
+  mitra: data => { state.cache.mitra = data; },
+};
+
+// Only the fields the banking and history views read; other resources come whole.
+const BOOTSTRAP_FIELDS = [
+  'banking.balance', 'banking.iban_like', 'banking.income', 'banking.spend', 'banking.window_30d', 'banking.categories',
+  'banking.transactions.counterparty', 'banking.transactions.reference', 'banking.transactions.timestamp', 'banking.transactions.amount',
+  'investor_history.resolution', 'investor_history.points.level',
+].join(',');
+
+async function loadBootstrap(names = Object.keys(bootstrapTargets)) {
+  const params = new URLSearchParams({ include: names.join(','), fields: BOOTSTRAP_FIELDS });
+  const data = await fetchJSON(`/api/bootstrap?${params}`);
+  names.forEach(name => {
+    if (name in data) bootstrapTargets[name](data[name]);
+  });
+  Object.entries(data.errors || {}).forEach(([name, detail]) => console.warn(`bootstrap: ${name} failed (${detail})`));
+}
+
 function renderManifesto() {
   const manifesto = state.cache.manifesto || {};
   const profile = state.cache.profile?.user || state.user || {};
@@ -332,6 +377,30 @@ function renderManifesto() {
   animateSections();
 }
 
+function renderFeedCard(post, band) {
+  return `
+    <article class="feed-card">
+      <header>
+        <div class="author">
+          <div class="avatar">${computeAvatar(post.display_name || post.user_id)}</div>
+          <div>
+            <h4>${post.display_name || post.user_id}</h4>
+            <div class="meta-hint">DVI ${post.dvi ?? band.dvi}</div>
+          </div>
+        </div>
+        <time>${formatTime(post.created_at)}</time>
+      </header>
+      <p>${(post.text || '').replace(/\n/g, '<br>')}</p>
+      ${post.photo ? `<div class="post-media"><img src="${post.photo}" alt="Post attachment" /></div>` : ''}
+      <footer>
+        <button class="like-btn${post.liked ? ' liked' : ''}" type="button" data-like="${post.id}">?? <span>${post.like_count || 0}</span></button>
+        <span>?? Share</span>
+        <span>?? Save</span>
+      </footer>
+    </article>
+  `;
+}
+
 function renderFeed() {
   const feed = state.cache.feed || [];
   const profile = state.cache.profile?.user || state.user || {};
@@ -359,27 +428,7 @@ function renderFeed() {
     </div>
   `;
 
-  const cards = feed.map(post => `
-    <article class="feed-card">
-      <header>
-        <div class="author">
-          <div class="avatar">${computeAvatar(post.display_name || post.user_id)}</div>
-          <div>
-            <h4>${post.display_name || post.user_id}</h4>
-            <div class="meta-hint">DVI ${post.dvi ?? band.dvi}</div>
-          </div>
-        </div>
-        <time>${formatTime(post.created_at)}</time>
-      </header>
-      <p>${(post.text || '').replace(/\n/g, '<br>')}</p>
-      ${post.photo ? `<div class="post-media"><img src="${post.photo}" alt="Post attachment" /></div>` : ''}
-      <footer>
-        <span>?? ${post.like_count || 0}</span>
-        <span>?? Share</span>
-        <span>?? Save</span>
-      </footer>
-    </article>
-  `).join('');
+  const cards = feed.map(post => renderFeedCard(post, band)).join('');
 
   view.innerHTML = `
     <section class="section">
@@ -403,6 +452,7 @@ function renderFeed() {
           <div class="feed-main">
             ${form}
             <div class="feed-list">${cards}</div>
+            <div id="feedSentinel" class="meta-hint">${state.cache.feedNext ? 'Loading more…' : ''}</div>
           </div>
         </div>
       </div>
@@ -410,9 +460,72 @@ function renderFeed() {
   `;
 
   setupComposer();
+  setupLikes();
+  setupFeedScroll();
   animateSections();
 }
 
+function setupLikes() {
+  document.querySelector('.feed-list')?.addEventListener('click', async event => {
+    const button = event.target.closest('[data-like]');
+    if (!button) return;
+    const postId = Number(button.dataset.like);
+    const liked = !button.classList.contains('liked');
+    button.classList.toggle('liked', liked);
+    try {
+      const result = await fetchJSON(`/api/feed/${postId}/like`, { method: liked ? 'POST' : 'DELETE' });
+      const post = (state.cache.feed || []).find(item => item.id === postId);
+      if (post) Object.assign(post, { liked: result.liked, like_count: result.like_count });
+      button.querySelector('span').textContent = result.like_count;
+    } catch (err) {
+      console.error(err);
+      button.classList.toggle('liked', !liked);
+      toast('Could not update like');
+    }
+  });
+}
+
+let feedObserver = null;
+let feedLoading = false;
+
+function setupFeedScroll() {
+  feedObserver?.disconnect();
+  const sentinel = document.querySelector('#feedSentinel');
+  if (!sentinel || !state.cache.feedNext) return;
+  feedObserver = new IntersectionObserver(entries => {
+    if (entries.some(entry => entry.isIntersecting)) loadMoreFeed();
+  }, { rootMargin: '400px 0px' });
+  feedObserver.observe(sentinel);
+}
+
+async function loadMoreFeed() {
+  if (feedLoading || !state.cache.feedNext || state.route !== 'feed') return;
+  feedLoading = true;
+  try {
+    const data = await fetchJSON(`/api/feed?limit=${FEED_PAGE_SIZE}&before=${state.cache.feedNext}`);
+    const items = data.items || [];
+    state.cache.feed = (state.cache.feed || []).concat(items);
+    state.cache.feedNext = data.next_before ?? null;
+    const profile = state.cache.profile?.user || state.user || {};
+    const band = computeBand(Number(profile.dvi || 0));
+    document.querySelector('.feed-list')?.insertAdjacentHTML('beforeend', items.map(post => renderFeedCard(post, band)).join(''));
+    const sentinel = document.querySelector('#feedSentinel');
+    if (sentinel && !state.cache.feedNext) {
+      sentinel.textContent = '';
+      feedObserver?.disconnect();
+    } else if (sentinel) {
+      // Re-observing fires again if the sentinel is still on screen after a short page.
+      feedObserver?.unobserve(sentinel);
+      feedObserver?.observe(sentinel);
+    }
+  } catch (err) {
+    console.error(err);
+    toast('Could not load older posts.');
+  } finally {
+    feedLoading = false;
+  }
+}
+
 function setupComposer() {
   const text = document.querySelector('#composerText');
   const file = document.querySelector('#composerFile');
@@ -449,7 +562,7 @@ function setupComposer() {
       body.append('user_id', state.user?.user_id || 'guest');
       body.append('text', content);
       if (photoFile) body.append('photo', photoFile);
-      const res = await fetch(`${API_BASE}/api/feed`, { method: 'POST', body });
+      const res = await fetch(`${API_BASE}/api/feed`, { method: 'POST', body, headers: userHeaders() });
       if (!res.ok) throw new Error('Could not publish');
       text.value = '';
       if (preview) preview.style.display = 'none';
@@ -542,8 +655,22 @@ function renderProfile() {
   animateSections();
 }
 
+function renderOppCard(item) {
+  return `
+    <article class="opps-card">
+      <span class="pill">${item.type || 'Opportunity'}</span>
+      <h3>${item.title}</h3>
+      <div class="org">${item.org} · ${item.location || (item.regions || []).join(', ') || 'Global'}</div>
+      <p>${item.summary || 'No description'}</p>
+      <div class="meta"><span>Deadline</span><span>${item.deadline || 'Rolling'}</span></div>
+      <a href="${item.link}" target="_blank" rel="noopener">View details</a>
+    </article>
+  `;
+}
+
 function renderOpportunities() {
   const items = state.cache.opportunities || [];
+  const search = state.cache.oppsSearch || {};
   view.innerHTML = `
     <section class="section">
       <div class="section-inner">
@@ -554,24 +681,42 @@ function renderOpportunities() {
             <p class="section-sub">Scholarships, internships, fellowships, and inclusive employers that recognize DVI as proof of potential. Region-aware and mentor-reviewed.</p>
           </div>
         </div>
-        <div class="opps-grid">
-          ${items.map(item => `
-            <article class="opps-card">
-              <span class="pill">${item.type || 'Opportunity'}</span>
-              <h3>${item.title}</h3>
-              <div class="org">${item.org} · ${item.location || 'Global'}</div>
-              <p>${item.summary || 'No description'}</p>
-              <div class="meta"><span>Deadline</span><span>${item.deadline || 'Rolling'}</span></div>
-              <a href="${item.link}" target="_blank" rel="noopener">View details</a>
-            </article>
-          `).join('')}
+        <form class="opps-search" id="oppsSearch">
+          <input name="q" type="search" placeholder="Search scholarships, grants, micro-loans" value="${search.q || ''}" />
+          <input name="type" type="text" placeholder="Type" value="${search.type || ''}" />
+          <button type="submit" class="post-submit">Search</button>
+        </form>
+        <div class="opps-grid" id="oppsGrid">
+          ${items.map(renderOppCard).join('')}
         </div>
       </div>
     </section>
   `;
+  setupOppsSearch();
   animateSections();
 }
 
+function setupOppsSearch() {
+  const form = document.querySelector('#oppsSearch');
+  form?.addEventListener('submit', async event => {
+    event.preventDefault();
+    const q = form.elements.q.value.trim();
+    const type = form.elements.type.value.trim();
+    state.cache.oppsSearch = { q, type };
+    try {
+      // Ranked server-side against the signed-in user's skills, region and DVI band.
+      const params = new URLSearchParams({ q, limit: '50' });
+      if (type) params.set('type', type);
+      const data = await fetchJSON(`/api/opportunities/search?${params}`);
+      state.cache.opportunities = data.items || [];
+      document.querySelector('#oppsGrid').innerHTML = state.cache.opportunities.map(renderOppCard).join('');
+    } catch (err) {
+      console.error(err);
+      toast('Search is unavailable right now.');
+    }
+  });
+}
+
 function renderBanking() {
   const data = state.cache.banking || {};
   const txns = data.transactions || [];
@@ -596,12 +741,12 @@ function renderBanking() {
         <div class="bank-stats">
           <div class="stat-card">
             <div class="trend">Income 30d</div>
-            <div class="value positive">${formatEUR(data.income || 0)}</div>
+            <div class="value positive">${formatEUR(data.window_30d?.income ?? data.income ?? 0)}</div>
             <div class="meta-hint">Attach payslips or sponsor briefs to supercharge DVI.</div>
           </div>
           <div class="stat-card">
             <div class="trend">Spend 30d</div>
-            <div class="value negative">${formatEUR(data.spend || 0)}</div>
+            <div class="value negative">${formatEUR(data.window_30d?.spend ?? data.spend ?? 0)}</div>
             <div class="meta-hint">Healthy repayment streak boosts your banking reputation.</div>
           </div>
           <div class="stat-card">
@@ -631,9 +776,25 @@ function renderBanking() {
   animateSections();
 }
 
+function renderHistoryChart(history) {
+  const points = history?.points || [];
+  if (points.length < 2) return '<div class="meta-hint">No history yet.</div>';
+  const levels = points.map(p => p.level);
+  const min = Math.min(...levels);
+  const span = Math.max(...levels) - min || 1;
+  const path = levels.map((level, i) => `${(i / (levels.length - 1) * 100).toFixed(2)},${(38 - (level - min) / span * 36).toFixed(2)}`).join(' ');
+  return `
+    <svg class="history-chart" viewBox="0 0 100 40" preserveAspectRatio="none" role="img" aria-label="AUM history">
+      <polyline points="${path}" fill="none" stroke="currentColor" stroke-width="0.6" vector-effect="non-scaling-stroke" />
+    </svg>
+    <div class="meta-hint">${formatEUR(levels[0])} → ${formatEUR(levels[levels.length - 1])} · ${points.length} ${history.resolution === 'hour' ? 'hours' : 'days'}</div>
+  `;
+}
+
 function renderInvestor() {
   const data = state.cache.investor || {};
   const funds = data.funds || [];
+  const resolution = state.cache.investorResolution || 'day';
   view.innerHTML = `
     <section class="section">
       <div class="section-inner">
@@ -661,6 +822,14 @@ function renderInvestor() {
             <div class="meta-hint">Inclusive investments with measurable community upside.</div>
           </div>
         </div>
+        <div class="investor-card investor-history">
+          <h3>AUM history</h3>
+          <div class="history-toggle">
+            <button type="button" data-resolution="hour" class="${resolution === 'hour' ? 'active' : ''}">Hourly · 7d</button>
+            <button type="button" data-resolution="day" class="${resolution === 'day' ? 'active' : ''}">Daily · 180d</button>
+          </div>
+          ${renderHistoryChart(state.cache.investorHistory)}
+        </div>
         <div class="investor-stream">
           ${funds.map(fund => {
             const pct = Math.min(100, Math.round((fund.funded / fund.target) * 100));
@@ -668,7 +837,7 @@ function renderInvestor() {
               <div class="fund">
                 <div class="pill">${fund.focus}</div>
                 <h4>${fund.title}</h4>
-                <div class="meta-hint">${formatEUR(fund.funded)} / ${formatEUR(fund.target)} (${pct}%)</div>
+                <div class="meta-hint">${formatEUR(fund.funded)} / ${formatEUR(fund.target)} (${pct}%) · ${fund.sponsors || 0} sponsors</div>
                 <div class="progress"><span style="width:${pct}%"></span></div>
               </div>
             `;
@@ -677,6 +846,13 @@ function renderInvestor() {
       </div>
     </section>
   `;
+  document.querySelectorAll('[data-resolution]').forEach(button => {
+    button.addEventListener('click', async () => {
+      state.cache.investorResolution = button.dataset.resolution;
+      state.cache.investorHistory = await fetchJSON(`/api/investor/history?resolution=${button.dataset.resolution}`);
+      renderInvestor();
+    });
+  });
   animateSections();
 }
 
@@ -737,6 +913,43 @@ function renderMitraPanel() {
   }
 }
 
+function parseSSEFrame(frame) {
+  let event = 'message';
+  let data = '';
+  frame.split('\n').forEach(line => {
+    if (line.startsWith('event:')) event = line.slice(6).trim();
+    else if (line.startsWith('data:')) data += line.slice(5).trim();
+  });
+  return { event, data: data ? JSON.parse(data) : null };
+}
+
+async function streamMitra(body, onToken) {
+  const res = await fetch(`${API_BASE}/api/mitra/chat/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream', ...userHeaders() },
+    body: JSON.stringify(body),
+  });
+  if (!res.ok || !res.body) throw new Error(`Mitra stream failed (${res.status})`);
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let final = null;
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+      const { event, data } = parseSSEFrame(buffer.slice(0, boundary));
+      buffer = buffer.slice(boundary + 2);
+      if (!data) continue;
+      if (event === 'token') onToken(data.text || '');
+      else if (event === 'suggestions') final = data;
+    }
+  }
+  return final || { suggestions: [] };
+}
+
 async function handleMitraSubmit(messageOverride) {
   const input = mitraInput?.value.trim();
   const message = (messageOverride || input);
@@ -746,23 +959,38 @@ async function handleMitraSubmit(messageOverride) {
   renderMitraPanel();
   if (!messageOverride && mitraInput) mitraInput.value = '';
   if (mitraStatus) mitraStatus.textContent = 'Mitra is thinking…';
+  const body = {
+    user_id: state.user?.user_id || 'guest',
+    message,
+    region: state.user?.region || 'Global',
+    dvi: Number(state.user?.dvi || state.cache.profile?.user?.dvi || 0),
+  };
+  const entry = { role: 'ai', text: '' };
+  state.mitraHistory.push(entry);
+  renderMitraPanel();
+  const bubble = mitraStream?.lastElementChild;
   try {
-    const payload = await fetchJSON('/api/mitra/chat', {
-      method: 'POST',
-      body: JSON.stringify({
-        user_id: state.user?.user_id || 'guest',
-        message,
-        region: state.user?.region || 'Global',
-        dvi: Number(state.user?.dvi || state.cache.profile?.user?.dvi || 0),
-      }),
-    });
-    state.mitraHistory.push({ role: 'ai', text: payload.reply || "Let's keep building." });
+    let payload;
+    try {
+      payload = await streamMitra(body, text => {
+        entry.text += text;
+        if (mitraStatus) mitraStatus.textContent = '';
+        if (bubble) bubble.textContent = entry.text;
+        if (mitraStream) mitraStream.scrollTop = mitraStream.scrollHeight;
+      });
+    } catch (streamErr) {
+      if (entry.text) throw streamErr;
+      console.warn(streamErr);
+      payload = await fetchJSON('/api/mitra/chat', { method: 'POST', body: JSON.stringify(body) });
+      entry.text = payload.reply || '';
+    }
+    entry.text = entry.text || "Let's keep building.";
     state.mitraSuggestions = Array.isArray(payload.suggestions) ? payload.suggestions : [];
-    localStorage.setItem('mm_mitra_history_v1', JSON.stringify(state.mitraHistory.slice(-40)));
   } catch (err) {
     console.error(err);
-    state.mitraHistory.push({ role: 'ai', text: 'I could not reach the Mitra AI right now. Try again in a minute.' });
+    entry.text = entry.text || 'I could not reach the Mitra AI right now. Try again in a minute.';
   } finally {
+    localStorage.setItem('mm_mitra_history_v1', JSON.stringify(state.mitraHistory.slice(-40)));
     renderMitraPanel();
     if (mitraStatus) mitraStatus.textContent = '';
   }
@@ -780,6 +1008,64 @@ function toggleMitra(open) {
   }
 }
 
+// Push deltas from /api/events keep the cached sections current without refetching them.
+const pushHandlers = {
+  post(post) {
+    const feed = state.cache.feed;
+    if (!feed || feed.some(item => item.id === post.id)) return;
+    feed.unshift(post);
+    const list = state.route === 'feed' && document.querySelector('.feed-list');
+    if (list) {
+      const profile = state.cache.profile?.user || state.user || {};
+      list.insertAdjacentHTML('afterbegin', renderFeedCard(post, computeBand(Number(profile.dvi || 0))));
+    }
+  },
+  like({ post_id: postId, like_count: count }) {
+    const post = (state.cache.feed || []).find(item => item.id === postId);
+    if (post) post.like_count = count;
+    const counter = state.route === 'feed' && document.querySelector(`[data-like="${postId}"] span`);
+    if (counter) counter.textContent = count;
+  },
+  achievement(record) {
+    const achievements = state.cache.profile?.achievements;
+    if (!achievements || achievements.some(item => item.id === record.id)) return;
+    achievements.unshift(record);
+    if (state.route === 'profile') renderProfile();
+  },
+  notification(record) {
+    const notifications = state.cache.profile?.notifications;
+    if (notifications && !notifications.some(item => item.id === record.id)) notifications.unshift(record);
+    toast(record.title);
+    if (state.route === 'profile') renderProfile();
+  },
+  score(score) {
+    if (state.cache.profile?.user) Object.assign(state.cache.profile.user, score);
+    if (state.user) Object.assign(state.user, score);
+    if (state.route === 'profile') renderProfile();
+  },
+  reset() {
+    delete state.cache.feed;
+    delete state.cache.profile;
+    navigate(state.route, true);
+  },
+};
+
+function connectEvents() {
+  if (!window.EventSource) return;
+  state.events?.close();
+  const user = state.user?.user_id ? `?user=${encodeURIComponent(state.user.user_id)}` : '';
+  state.events = new EventSource(`${API_BASE}/api/events${user}`);
+  Object.entries(pushHandlers).forEach(([type, handler]) => {
+    state.events.addEventListener(type, event => {
+      try {
+        handler(JSON.parse(event.data));
+      } catch (err) {
+        console.error(err);
+      }
+    });
+  });
+}
+
 function bindEvents() {
   routeButtons.forEach(btn => {
     btn.addEventListener('click', () => navigate(btn.dataset.nav));
@@ -808,9 +1094,17 @@ async function bootstrap() {
   }
   setTheme();
   bindEvents();
+  try {
+    await loadBootstrap();
+  } catch (err) {
+    console.error(err);
+  }
+  // Anything the batch did not deliver is fetched on its own by the loaders.
   await loaders.manifesto();
   await loaders.profile();
+  if (!state.user) state.user = state.cache.profile?.user || null;
   navigate('manifesto');
+  connectEvents();
   if (state.mode === 'investor') setMode('investor');
   renderMitraPanel();
 }
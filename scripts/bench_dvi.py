@@ -0,0 +1,88 @@
+"""Benchmark the batch DVI scorer on a synthetic user base.
+
+    python scripts/bench_dvi.py --users 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend import dvi  # noqa: E402
+from backend.banking import BankingLedger  # noqa: E402
+from backend.services.mitra_rules import DEFAULT_RULES_PATH, load_rules  # noqa: E402
+
+
+def synthetic_inputs(users: int, seed: int = 7) -> dict:
+    # Same shape as Store.scoring_inputs: a few grouped rows per user.
+    rng = random.Random(seed)
+    today = date.today()
+    since = dvi.window_start(today)
+    months = [f"{today.year - 1}-{m:02d}" for m in range(1, 13)] + [f"{today.year}-{m:02d}" for m in range(1, today.month + 1)]
+    months = [m for m in months if m >= since]
+    inputs = {"users": [], "achievements": [], "posts": [], "months": [], "totals": []}
+    for i in range(users):
+        user_id = f"user-{i:07d}"
+        inputs["users"].append((user_id, None, None))
+        for year in rng.sample(range(today.year - 5, today.year + 1), rng.randint(0, 3)):
+            inputs["achievements"].append((user_id, year, rng.randint(1, 2)))
+        if rng.random() < 0.6:
+            inputs["posts"].append((user_id, rng.randint(1, 40)))
+        for month in rng.sample(months, rng.randint(0, min(6, len(months)))):
+            inputs["months"].append((user_id, month, rng.uniform(0, 3000), rng.uniform(0, 3000)))
+        income = rng.uniform(0, 50000)
+        inputs["totals"].append((user_id, income, rng.uniform(0, income * 1.2)))
+    return inputs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    args = parser.parse_args()
+    rules = load_rules(DEFAULT_RULES_PATH)
+
+    started = time.perf_counter()
+    inputs = synthetic_inputs(args.users)
+    rows = sum(len(value) for value in inputs.values())
+    print(f"synthetic inputs: {args.users:,} users, {rows:,} grouped rows ({time.perf_counter() - started:.2f}s, not scored)")
+
+    started = time.perf_counter()
+    users, features = dvi.feature_matrix(inputs)
+    built = time.perf_counter()
+    scores = dvi.score(features, rules.scale_max)
+    scored = time.perf_counter()
+    names = dvi.bands(rules, scores)
+    banded = time.perf_counter()
+    print(f"feature matrix   {built - started:8.3f}s")
+    print(f"score            {scored - built:8.3f}s")
+    print(f"bands            {banded - scored:8.3f}s")
+    print(f"batch total      {banded - started:8.3f}s  ({len(users) / (banded - started):,.0f} users/s)")
+    values, counts = np.unique(names, return_counts=True)
+    print("band mix         " + ", ".join(f"{name}: {n:,}" for name, n in zip(values, counts)))
+    print(f"dvi p50/p90/max  {np.percentile(scores, 50):.0f} / {np.percentile(scores, 90):.0f} / {scores.max()}")
+
+    # The incremental path (one user's inputs changed) on a ledger with two years of history.
+    ledger = BankingLedger()
+    ledger.append([
+        {"id": f"t{i}", "amount": (-1) ** i * 120.0, "timestamp": f"{date.today().year - i // 365 % 2}-{i % 12 + 1:02d}-01"}
+        for i in range(730)
+    ])
+    achievements = [{"year": date.today().year - i} for i in range(5)]
+    runs = 2000
+    started = time.perf_counter()
+    for _ in range(runs):
+        feature_row = dvi.user_features(achievements, 12, ledger)
+        score = dvi.score(feature_row[np.newaxis, :], rules.scale_max)
+        dvi.bands(rules, score)
+    print(f"single user      {(time.perf_counter() - started) / runs * 1e6:8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Compare per-endpoint JSON serialization cost: FastAPI's default path vs the fast encoder.
+
+    python scripts/bench_json.py --runs 200
+
+"before" is what a plain dict return cost before the fast pipeline: jsonable_encoder followed by
+JSONResponse.render (stdlib json). "after" is backend.fast_json.dumps on the same payload.
+Payloads come from the in-memory store seeded with demo data plus synthetic posts/transactions.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("MEMETRICS_STORAGE", "memory")
+os.environ["OPENAI_API_KEY"] = ""
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from backend import state  # noqa: E402
+from backend.fast_json import dumps  # noqa: E402
+
+try:
+    import brotli
+except ImportError:  # optional: the br column is skipped without it
+    brotli = None
+
+
+def stdlib_render(payload: Any) -> bytes:
+    # Same settings as starlette's JSONResponse.render.
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def seed(posts: int, transactions: int) -> None:
+    for i in range(posts):
+        state.add_post(state.DEFAULT_USER_ID, f"Benchmark post {i}: shipping the new community hub, thanks all")
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    rows = [
+        {
+            "id": f"bench-{i}",
+            "counterparty": f"Merchant {i % 40}",
+            "reference": f"INV-{i:06d}",
+            "amount": round((-1) ** i * (12.5 + i % 300), 2),
+            "timestamp": (start + timedelta(hours=i * 3)).isoformat(),
+            "category": ("groceries", "salary", "rent", "travel")[i % 4],
+        }
+        for i in range(transactions)
+    ]
+    state.add_transactions(state.DEFAULT_USER_ID, rows)
+
+
+def payloads() -> List[Tuple[str, Callable[[], Any]]]:
+    user_id = state.DEFAULT_USER_ID
+    rules = [{"message": f"how do I grow my dvi score {i}", "dvi": i % 900, "region": "Global"} for i in range(200)]
+    return [
+        ("GET /api/feed?limit=100", lambda: {"items": state.get_feed(None, 100, user_id), "next_before": None}),
+        ("GET /api/profile", lambda: {
+            "user": state.get_user(user_id),
+            "achievements": state.get_achievements(user_id),
+            "notifications": state.get_notifications(user_id),
+        }),
+        ("GET /api/banking", lambda: state.get_banking(user_id)),
+        ("GET /api/banking/summary", lambda: state.get_banking_summary(user_id, None, None, "day")),
+        ("GET /api/opportunities/search", lambda: {"items": state.search_opportunities("", None, None, 100, user_id)}),
+        ("GET /api/investor", state.get_investor_dashboard),
+        ("GET /api/investor/history?hour", lambda: state.get_investor_history("hour")),
+        ("GET /api/investor/history?raw", lambda: state.get_investor_history("raw")),
+        ("POST /api/mitra/rules/evaluate x200", lambda: {"results": state.RULES.evaluate_batch(rules)}),
+    ]
+
+
+def timed(encode: Callable[[Any], bytes], payload: Any, runs: int) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        encode(payload)
+    return (time.perf_counter() - started) / runs * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=150)
+    parser.add_argument("--transactions", type=int, default=2000)
+    args = parser.parse_args()
+    seed(args.posts, args.transactions)
+
+    print(f"{'endpoint':38} {'bytes':>8} {'before us':>10} {'after us':>9} {'speedup':>8} {'gzip':>7} {'br':>7}")
+    totals: Dict[str, float] = {"before": 0.0, "after": 0.0}
+    for name, build in payloads():
+        payload = build()
+        body = dumps(payload)
+        if json.loads(body) != json.loads(stdlib_render(payload)):
+            raise SystemExit(f"{name}: encoders disagree")
+        before = timed(stdlib_render, payload, args.runs)
+        after = timed(dumps, payload, args.runs)
+        totals["before"] += before
+        totals["after"] += after
+        gzipped = len(gzip.compress(body, compresslevel=5))
+        compressed = len(brotli.compress(body, quality=4)) if brotli is not None else 0
+        print(
+            f"{name:38} {len(body):8,} {before:10.1f} {after:9.1f} {before / after:7.1f}x {gzipped:7,} "
+            + (f"{compressed:7,}" if brotli is not None else f"{'-':>7}")
+        )
+    print(f"{'total':38} {'':8} {totals['before']:10.1f} {totals['after']:9.1f} {totals['before'] / totals['after']:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
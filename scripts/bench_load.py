@@ -0,0 +1,356 @@
+"""Load-test the API with a mixed read/write workload and compare against a stored baseline.
+
+    python scripts/bench_load.py --target inproc --duration 20
+    python scripts/bench_load.py --target uvicorn --concurrency 32 --storage sqlite
+    python scripts/bench_load.py --target inproc --save-baseline
+
+The app runs in this process (httpx over ASGI, lifespan included) or as a uvicorn subprocess,
+always against a fresh store and an in-process stub LLM (scripts/stub_llm_server.py). Synthetic
+users, posts and ledgers are loaded through the API first. Per endpoint it reports throughput and
+p50/p95/p99; with a baseline (scripts/bench_baseline.json) it flags any endpoint whose p95 grew or
+throughput fell by more than --tolerance and exits 1. Baselines are machine-specific: re-save
+them on the machine that runs the comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_llm_server import StubConfig, serve  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "bench_baseline.json"
+DEFAULT_MIX = "feed=50,post=15,achievement=5,mitra=10,profile=10,bootstrap=10"
+WORDS = (
+    "shipped mentoring scholarship sponsor budget android portfolio verified milestone community "
+    "workshop internship grant robotics design data climate fintech repayment pitch hackathon"
+).split()
+PROMPTS = [
+    "How do I reach the next DVI band?",
+    "Draft a sponsor update for my robotics project",
+    "Which scholarships fit a data science student?",
+    "Help me plan repayments for a microloan",
+    "What should I log this week to grow my score?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in OPERATIONS:
+            raise SystemExit(f"unknown operation {name!r}; expected one of {', '.join(OPERATIONS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# --- synthetic data -------------------------------------------------------------------------
+
+def synthetic_text(rng: random.Random, words: int = 18) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_ledger(rng: random.Random, user: str, rows: int) -> bytes:
+    # NDJSON for /api/banking/import: a year of mixed income and spend.
+    start = datetime.now(timezone.utc) - timedelta(days=365)
+    lines = []
+    for i in range(rows):
+        income = rng.random() < 0.3
+        lines.append(json.dumps({
+            "id": f"{user}-{i}",
+            "counterparty": rng.choice(["Employer", "Sponsor", "Grocer", "Landlord", "Transit", "Bookstore"]),
+            "reference": f"REF-{i:06d}",
+            "amount": round(rng.uniform(200, 2500) if income else -rng.uniform(3, 400), 2),
+            "timestamp": (start + timedelta(seconds=rng.uniform(0, 365 * 86400))).isoformat(),
+            "category": "income" if income else rng.choice(["groceries", "rent", "transport", "education"]),
+        }))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+async def seed(client: httpx.AsyncClient, users: int, posts: int, transactions: int, rng: random.Random) -> List[str]:
+    ids = []
+    for i in range(users):
+        response = await client.post("/api/auth/login", json={"name": f"Bench User {i:04d}"})
+        response.raise_for_status()
+        ids.append(response.json()["user"]["user_id"])
+    semaphore = asyncio.Semaphore(16)
+
+    async def post(i: int) -> None:
+        async with semaphore:
+            user = ids[i % len(ids)]
+            await client.post("/api/feed", json={"text": synthetic_text(rng)}, headers={"X-User-Id": user})
+
+    await asyncio.gather(*(post(i) for i in range(posts)))
+    per_user = transactions // max(len(ids), 1)
+    if per_user:
+        for user in ids:
+            response = await client.post(
+                "/api/banking/import?format=ndjson",
+                content=synthetic_ledger(rng, user, per_user),
+                headers={"X-User-Id": user, "Content-Type": "application/x-ndjson"},
+            )
+            response.raise_for_status()
+    return ids
+
+
+# --- workload -------------------------------------------------------------------------------
+
+async def op_feed(client: httpx.AsyncClient, user: str, rng: random.Random) -> httpx.Response:
+    return await client.get("/api/feed?limit=20", headers={"X-User-Id": user})
+
+
+async def op_post(client: httpx.AsyncClient, user: str, rng: random.Random) -> httpx.Response:
+    return await client.post("/api/feed", json={"text": synthetic_text(rng)}, headers={"X-User-Id": user})
+
+
+async def op_achievement(client: httpx.AsyncClient, user: str, rng: random.Random) -> httpx.Response:
+    payload = {"title": synthetic_text(rng, 5), "year": rng.randint(2015, 2025)}
+    return await client.post("/api/profile/achievements", json=payload, headers={"X-User-Id": user})
+
+
+async def op_mitra(client: httpx.AsyncClient, user: str, rng: random.Random) -> httpx.Response:
+    message = f"{rng.choice(PROMPTS)} ({rng.randint(1, 50)})"
+    return await client.post("/api/mitra/chat", json={"message": message}, headers={"X-User-Id": user})
+
+
+async def op_profile(client: httpx.AsyncClient, user: str, rng: random.Random) -> httpx.Response:
+    return await client.get("/api/profile", headers={"X-User-Id": user})
+
+
+async def op_bootstrap(client: httpx.AsyncClient, user: str, rng: random.Random) -> httpx.Response:
+    return await client.get("/api/bootstrap", headers={"X-User-Id": user})
+
+
+OPERATIONS = {
+    "feed": ("GET /api/feed", op_feed),
+    "post": ("POST /api/feed", op_post),
+    "achievement": ("POST /api/profile/achievements", op_achievement),
+    "mitra": ("POST /api/mitra/chat", op_mitra),
+    "profile": ("GET /api/profile", op_profile),
+    "bootstrap": ("GET /api/bootstrap", op_bootstrap),
+}
+
+
+async def drive(
+    client: httpx.AsyncClient, users: List[str], mix: Dict[str, float], concurrency: int, duration: float, seed_value: int
+) -> Tuple[Dict[str, Dict[str, Any]], float]:
+    names, weights = list(mix), list(mix.values())
+    samples: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        rng = random.Random(seed_value + index)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await OPERATIONS[name][1](client, rng.choice(users), rng)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            samples[name].append(time.perf_counter() - started)
+            if failed:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    report = {}
+    for name in names:
+        latencies = np.array(samples[name]) * 1000
+        if not len(latencies):
+            continue
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report[name] = {
+            "endpoint": OPERATIONS[name][0],
+            "requests": int(len(latencies)),
+            "errors": errors[name],
+            "rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(latencies.max()), 2),
+        }
+    return report, elapsed
+
+
+# --- targets --------------------------------------------------------------------------------
+
+def app_environment(data_dir: str, storage: str, llm_port: int) -> Dict[str, str]:
+    return {
+        "MEMETRICS_STORAGE": storage,
+        "MEMETRICS_DB_PATH": str(Path(data_dir) / "bench.db"),
+        "MEMETRICS_LIKES_LOG": str(Path(data_dir) / "likes"),
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+    }
+
+
+@asynccontextmanager
+async def inproc_client(env: Dict[str, str]) -> AsyncIterator[httpx.AsyncClient]:
+    # Settings are read at import, so the environment has to be in place before backend loads.
+    os.environ.update(env)
+    from backend.app import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            yield client
+
+
+@asynccontextmanager
+async def uvicorn_client(env: Dict[str, str], workers: int) -> AsyncIterator[httpx.AsyncClient]:
+    port = free_port()
+    command = [sys.executable, "-m", "uvicorn", "backend.app:app", "--port", str(port), "--log-level", "warning"]
+    if workers > 1:
+        command += ["--workers", str(workers)]
+    process = subprocess.Popen(command, cwd=ROOT, env={**os.environ, **env, "PYTHONPATH": str(ROOT)})
+    try:
+        limits = httpx.Limits(max_connections=256, max_keepalive_connections=256)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits) as client:
+            for _ in range(300):
+                if process.poll() is not None:
+                    raise SystemExit(f"uvicorn exited with status {process.returncode}")
+                try:
+                    if (await client.get("/api/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise SystemExit("uvicorn did not become healthy within 30s")
+            yield client
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# --- baseline -------------------------------------------------------------------------------
+
+def compare(report: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    regressions = []
+    for name, row in report.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if row["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{row['endpoint']}: p95 {base['p95_ms']}ms -> {row['p95_ms']}ms")
+        if row["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{row['endpoint']}: throughput {base['rps']}/s -> {row['rps']}/s")
+    return regressions
+
+
+def print_report(report: Dict[str, Dict[str, Any]], elapsed: float, baseline: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'endpoint':32} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'p95 vs base':>12}")
+    for name, row in report.items():
+        base = baseline.get(name)
+        delta = f"{(row['p95_ms'] / base['p95_ms'] - 1) * 100:+11.0f}%" if base and base["p95_ms"] else f"{'-':>12}"
+        print(
+            f"{row['endpoint']:32} {row['requests']:7,} {row['errors']:5} {row['rps']:8.1f} "
+            f"{row['p50_ms']:8.2f} {row['p95_ms']:8.2f} {row['p99_ms']:8.2f} {row['max_ms']:8.2f} {delta}"
+        )
+    total = sum(row["requests"] for row in report.values())
+    print(f"{'total':32} {total:7,} {sum(row['errors'] for row in report.values()):5} {total / elapsed:8.1f}")
+
+
+async def run(args: argparse.Namespace) -> int:
+    mix = parse_mix(args.mix)
+    StubConfig.latency = args.llm_latency
+    llm_port = free_port()
+    stub = serve(port=llm_port)
+    rng = random.Random(args.seed)
+    try:
+        with tempfile.TemporaryDirectory(prefix="memetrics-bench-") as data_dir:
+            env = app_environment(data_dir, args.storage, llm_port)
+            target = inproc_client(env) if args.target == "inproc" else uvicorn_client(env, args.workers)
+            async with target as client:
+                started = time.perf_counter()
+                users = await seed(client, args.users, args.posts, args.transactions, rng)
+                print(
+                    f"seeded {len(users)} users, {args.posts:,} posts, {args.transactions:,} transactions "
+                    f"({time.perf_counter() - started:.1f}s); {args.target}, {args.storage}, "
+                    f"{args.concurrency} clients for {args.duration:.0f}s"
+                )
+                if args.warmup:
+                    await drive(client, users, mix, args.concurrency, args.warmup, args.seed + 1000)
+                report, elapsed = await drive(client, users, mix, args.concurrency, args.duration, args.seed)
+    finally:
+        stub.shutdown()
+
+    key = f"{args.target}-{args.storage}"
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    baseline = stored.get(key, {}).get("endpoints", {})
+    print_report(report, elapsed, baseline)
+    if args.save_baseline:
+        stored[key] = {
+            "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "machine": f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+            "settings": {"concurrency": args.concurrency, "duration": args.duration, "mix": args.mix},
+            "endpoints": report,
+        }
+        args.baseline.write_text(json.dumps(stored, indent=2) + "\n")
+        print(f"baseline saved to {args.baseline} ({key})")
+        return 0
+    if not baseline:
+        print(f"no baseline for {key} in {args.baseline}; run with --save-baseline to record one")
+        return 0
+    regressions = compare(report, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if not regressions:
+        print(f"within {args.tolerance:.0%} of the {key} baseline")
+    return 1 if regressions else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target", choices=["inproc", "uvicorn"], default="inproc")
+    parser.add_argument("--storage", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (uvicorn target only)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights, e.g. feed=50,post=15,mitra=10")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--transactions", type=int, default=20000)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="stub LLM seconds per call")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p95/throughput drift before failing")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
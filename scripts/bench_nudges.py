@@ -0,0 +1,112 @@
+"""Benchmark the offline Mitra nudge job against the stub LLM, including an interrupted run.
+
+    python scripts/bench_nudges.py --users 5000 --concurrency 32 --llm-latency 0.05 --interrupt-after 3
+
+Seeds a temporary store with users who have achievements and transactions, then runs
+backend.nudges against scripts/stub_llm_server.py and reports users/sec. With --interrupt-after,
+the first run is cancelled after that many seconds and a second run resumes from the checkpoint.
+Afterwards every user must hold exactly one nudge for the week; exits 1 otherwise.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_load import app_environment, free_port  # noqa: E402
+from stub_llm_server import StubConfig, serve  # noqa: E402
+
+
+def seed(store, users: int, rng: random.Random) -> None:
+    today = time.strftime("%Y-%m")
+    for i in range(users):
+        user_id = f"nudge-user-{i:06d}"
+        store.put_user({
+            "user_id": user_id, "name": f"Nudge User {i}", "role": "Student", "region": rng.choice(["Global", "MENA", "EU"]),
+            "dvi": rng.randint(0, 1000), "band": rng.choice(["Foundation", "Builder", "Catalyst"]),
+        })
+        for year in rng.sample(range(2020, 2027), rng.randint(0, 3)):
+            store.insert_achievement(user_id, {"title": f"Milestone from {year}", "year": year})
+        store.insert_transactions(user_id, [
+            {"id": f"t{j}", "counterparty": "Bench", "amount": rng.uniform(-300, 500), "timestamp": f"{today}-{j % 28 + 1:02d}T09:00:00"}
+            for j in range(rng.randint(0, 6))
+        ])
+
+
+async def run(args: argparse.Namespace) -> int:
+    StubConfig.latency = args.llm_latency
+    llm_port = free_port()
+    stub = serve(port=llm_port)
+    try:
+        with tempfile.TemporaryDirectory(prefix="memetrics-nudges-") as data_dir:
+            os.environ.update(app_environment(data_dir, args.storage, llm_port))
+            os.environ["MITRA_LLM_CONCURRENCY"] = str(args.concurrency)
+            from backend import nudges
+            from backend.state import STORE
+
+            started = time.perf_counter()
+            seed(STORE, args.users, random.Random(5))
+            print(f"seeded {args.users} users in {time.perf_counter() - started:.1f}s ({args.storage})")
+
+            week = nudges.iso_week()
+            checkpoint = Path(data_dir) / f"nudges-{week}.json"
+            reports = []
+            if args.interrupt_after > 0:
+                job = asyncio.create_task(nudges.run(week, checkpoint, args.concurrency))
+                await asyncio.sleep(args.interrupt_after)
+                job.cancel()
+                await asyncio.gather(job, return_exceptions=True)
+                saved = json.loads(checkpoint.read_text(encoding="utf-8"))
+                print(f"interrupted after {args.interrupt_after}s; checkpoint cursor {saved['cursor']}, {len(saved['done'])} settled past it")
+            reports.append(await nudges.run(week, checkpoint, args.concurrency))
+            await nudges.POOL.aclose()
+
+            title = nudges.nudge_title(week)
+            per_user = Counter()
+            after = None
+            while True:
+                page = STORE.list_users(after, 1000)
+                if not page:
+                    break
+                after = page[-1]["user_id"]
+                for profile in page:
+                    per_user[profile["user_id"]] = sum(
+                        item["title"] == title for item in STORE.list_notifications(profile["user_id"])
+                    )
+    finally:
+        stub.shutdown()
+
+    for report in reports:
+        print(json.dumps({key: value for key, value in report.items() if key != "errors"}))
+        for error in report["errors"]:
+            print(f"  error: {error}")
+    missing = [user_id for user_id, n in per_user.items() if n == 0]
+    duplicated = [user_id for user_id, n in per_user.items() if n > 1]
+    print(f"{len(per_user)} users: {len(per_user) - len(missing) - len(duplicated)} with one nudge, "
+          f"{len(missing)} without, {len(duplicated)} with more than one")
+    return 1 if missing or duplicated else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--storage", choices=["memory", "sqlite"], default="sqlite")
+    parser.add_argument("--interrupt-after", type=float, default=0.0, help="cancel the first run after this many seconds")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Benchmark the feed search index on a synthetic feed: build time, memory per post and query latency.
+
+    python scripts/bench_search.py --posts 1000000
+
+Posts draw their words from a Zipf distribution over a career-flavoured vocabulary, so a few terms
+appear in a large share of posts and most are rare. The report has the bulk build rate, the cost of
+indexing one new post, the index size (postings payload, filter columns and per-term overhead),
+and p50/p95 latency of typical queries next to a linear `in` scan over the same texts. The
+rare-term results are also checked against that scan; exits 1 if they differ.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.feed_search import FeedSearchIndex  # noqa: E402
+
+COMMON = (
+    "the my a to and for of in with on at this is today new first just team"
+    " bootcamp internship offer sponsor mentor portfolio resume visa scholarship fintech android"
+    " python data design bank savings budget launch startup hackathon certificate course project"
+    " interview remote hiring grant milestone community network pitch demo research"
+).split()
+
+
+def synthetic_posts(count: int, vocabulary: int, authors: int, seed: int = 11) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    words = COMMON + [f"term{i}" for i in range(vocabulary - len(COMMON))]
+    lengths = rng.integers(8, 40, size=count)
+    ranks = np.minimum(rng.zipf(1.15, size=int(lengths.sum())) - 1, vocabulary - 1)
+    users = rng.integers(0, authors, size=count)
+    dvis = rng.integers(0, 1000, size=count)
+    start = date.today() - timedelta(days=730)
+    days = np.sort(rng.integers(0, 730, size=count))
+    posts = []
+    offset = 0
+    for i in range(count):
+        end = offset + int(lengths[i])
+        user = int(users[i])
+        posts.append({
+            "id": 1000 + i,
+            "user_id": f"member-{user}",
+            "display_name": f"Member {user}",
+            "dvi": int(dvis[i]),
+            "text": " ".join(words[rank] for rank in ranks[offset:end]),
+            "created_at": (start + timedelta(days=int(days[i]))).isoformat() + "T12:00:00+00:00",
+            "like_count": 0,
+        })
+        offset = end
+    return posts
+
+
+def timed(func: Callable[[], Any], repeat: int) -> tuple:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(samples, [50, 95])
+    return float(p50), float(p95), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--authors", type=int, default=20_000)
+    parser.add_argument("--incremental", type=int, default=10_000, help="posts added one at a time after the bulk build")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    posts = synthetic_posts(args.posts + args.incremental, args.vocabulary, args.authors)
+    bulk, tail = posts[: args.posts], posts[args.posts:]
+    print(f"generated {len(posts)} posts in {time.perf_counter() - started:.1f}s")
+
+    index = FeedSearchIndex()
+    started = time.perf_counter()
+    for start in range(0, len(bulk), 5000):
+        index.extend(bulk[start:start + 5000])
+    build = time.perf_counter() - started
+    print(f"bulk build: {build:.1f}s ({len(bulk) / build:,.0f} posts/s)")
+
+    started = time.perf_counter()
+    for post in tail:
+        index.add(post)
+    if tail:
+        print(f"incremental add: {(time.perf_counter() - started) / len(tail) * 1e6:.1f} us/post")
+
+    stats = index.stats()
+    text_bytes = sum(len(post["text"]) for post in posts)
+    print(
+        f"index: {stats['terms']:,} terms, postings {stats['postings_bytes'] / 2**20:.1f} MiB, "
+        f"total {stats['bytes'] / 2**20:.1f} MiB = {stats['bytes'] / len(posts):.1f} bytes/post "
+        f"(post text averages {text_bytes / len(posts):.0f} bytes)"
+    )
+
+    today = date.today()
+    rare = COMMON[-1] if args.vocabulary <= len(COMMON) else f"term{args.vocabulary // 2}"
+    queries = {
+        "common term": dict(q="the"),
+        "two terms": dict(q="fintech internship"),
+        "three terms": dict(q="python data portfolio"),
+        "rare term": dict(q=rare),
+        "author name": dict(q="member 42"),
+        "term + dvi range": dict(q="sponsor", min_dvi=600, max_dvi=800),
+        "term + last 30 days": dict(q="offer", since=today - timedelta(days=30)),
+        "filters only": dict(min_dvi=900, since=today - timedelta(days=7)),
+        "author filter": dict(author="member-7"),
+    }
+    texts = [post["text"] for post in posts]
+    print(f"{'query':22} {'p50 ms':>9} {'p95 ms':>9} {'hits':>5}")
+    for name, params in queries.items():
+        p50, p95, hits = timed(lambda: index.search(limit=20, **params), args.repeat)
+        print(f"{name:22} {p50:9.2f} {p95:9.2f} {len(hits):5}")
+    p50, _, _ = timed(lambda: [i for i, text in enumerate(texts) if "internship" in text][-20:], max(args.repeat // 5, 1))
+    print(f"{'linear scan (in)':22} {p50:9.2f}")
+
+    expected = {post["id"] for post in posts if rare in post["text"].split()}
+    found = {post_id for post_id, _ in index.search(rare, limit=len(expected) + 1)}
+    if found != expected:
+        print(f"FAIL rare-term hits differ from a linear scan: {len(found)} vs {len(expected)}")
+        sys.exit(1)
+    print(f"rare-term hits match a linear scan ({len(expected)} posts)")
+
+
+if __name__ == "__main__":
+    main()
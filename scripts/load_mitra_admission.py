@@ -0,0 +1,161 @@
+"""Load test for Mitra admission control: a chat burst against a slow LLM, with feed reads alongside.
+
+    python scripts/load_mitra_admission.py --members 30 --guests 20 --llm-latency 0.5
+
+Runs the app in-process (see bench_load.py) with a small LLM concurrency and queue, fires every
+member's and guest's chats at once while a reader polls /api/feed, then checks that:
+- upstream concurrency never exceeds MITRA_LLM_CONCURRENCY and the queue never exceeds its bound,
+- overflow is shed quickly to a rule-based reply with source "shed",
+- members are admitted at least as often as guests,
+- a user over the rate limit gets source "rate_limited" without an upstream call,
+- every chat still gets a reply, and feed reads stay fast during the burst.
+Exits 1 if any check fails.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_load import app_environment, free_port, inproc_client  # noqa: E402
+from stub_llm_server import StubConfig, serve  # noqa: E402
+
+
+async def chat(client: Any, user: str, index: int) -> Tuple[str, str, float]:
+    headers = {"X-User-Id": user} if user else {}
+    started = time.perf_counter()
+    response = await client.post("/api/mitra/chat", json={"message": f"Plan my next milestone #{index}"}, headers=headers)
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    body = response.json()
+    if not body.get("reply"):
+        raise SystemExit(f"empty reply for {user or 'guest'}: {body}")
+    return ("member" if user else "guest"), body["source"], elapsed
+
+
+async def run(args: argparse.Namespace) -> int:
+    StubConfig.latency = args.llm_latency
+    llm_port = free_port()
+    stub = serve(port=llm_port)
+    failures: List[str] = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="memetrics-admission-") as data_dir:
+            env = {
+                **app_environment(data_dir, "memory", llm_port),
+                "MITRA_CACHE": "0",  # every chat goes upstream
+                "MITRA_LLM_CONCURRENCY": str(args.concurrency),
+                "MITRA_QUEUE_SIZE": str(args.queue_size),
+                "MITRA_QUEUE_TIMEOUT": str(args.queue_timeout),
+                "MITRA_RATE_PER_MINUTE": "30",
+                "MITRA_RATE_BURST": "3",
+            }
+            async with inproc_client(env) as client:
+                members = []
+                for i in range(args.members):
+                    response = await client.post("/api/auth/login", json={"name": f"Load Member {i:03d}"})
+                    members.append(response.json()["user"]["user_id"])
+
+                peaks = {"active": 0, "waiting": 0, "in_flight": 0}
+                done = asyncio.Event()
+
+                async def watch() -> None:
+                    while not done.is_set():
+                        health = (await client.get("/api/health")).json()
+                        admission = health["mitra_admission"]
+                        peaks["active"] = max(peaks["active"], admission["active"])
+                        peaks["waiting"] = max(peaks["waiting"], admission["waiting"])
+                        peaks["in_flight"] = max(peaks["in_flight"], health["llm"]["in_flight"])
+                        await asyncio.sleep(0.02)
+
+                reads: List[float] = []
+
+                async def read_feed() -> None:
+                    while not done.is_set():
+                        started = time.perf_counter()
+                        (await client.get("/api/feed?limit=20")).raise_for_status()
+                        reads.append(time.perf_counter() - started)
+                        await asyncio.sleep(0.01)
+
+                # Guests all share one client address, so only their first few get past the rate limit.
+                jobs = [chat(client, user, i) for i, user in enumerate(members)]
+                jobs += [chat(client, "", i) for i in range(args.guests)]
+                background = [asyncio.create_task(watch()), asyncio.create_task(read_feed())]
+                started = time.perf_counter()
+                results = await asyncio.gather(*jobs)
+                burst_seconds = time.perf_counter() - started
+                done.set()
+                await asyncio.gather(*background)
+
+                # One member well past the limit: the rest of the burst is answered locally.
+                limited_user = members[0]
+                await asyncio.sleep(args.queue_timeout)
+                sequential = [(await chat(client, limited_user, 1000 + i))[1] for i in range(6)]
+                final = (await client.get("/api/health")).json()["mitra_admission"]
+    finally:
+        stub.shutdown()
+
+    by_group: Dict[str, Counter] = {"member": Counter(), "guest": Counter()}
+    latency: Dict[str, List[float]] = {}
+    for group, source, elapsed in results:
+        by_group[group][source] += 1
+        latency.setdefault(source, []).append(elapsed)
+
+    print(f"burst of {len(results)} chats in {burst_seconds:.2f}s; LLM concurrency {args.concurrency}, queue {args.queue_size}")
+    print(f"{'source':14} {'members':>8} {'guests':>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for source in sorted(latency):
+        p50, p95 = np.percentile(np.array(latency[source]) * 1000, [50, 95])
+        print(f"{source:14} {by_group['member'][source]:8} {by_group['guest'][source]:8} {p50:9.1f} {p95:9.1f}")
+    read_p95 = float(np.percentile(np.array(reads) * 1000, 95)) if reads else 0.0
+    print(f"feed reads during burst: {len(reads)}, p95 {read_p95:.1f} ms")
+    print(f"peak active {peaks['active']}, peak waiting {peaks['waiting']}, peak upstream in flight {peaks['in_flight']}")
+    print(f"sequential over-limit chats: {', '.join(sequential)}")
+    print(f"admission totals: {final}")
+
+    if peaks["active"] > args.concurrency or peaks["in_flight"] > args.concurrency:
+        failures.append("upstream concurrency exceeded the limit")
+    if peaks["waiting"] > args.queue_size:
+        failures.append("queue grew past its bound")
+    shed = latency.get("shed", [])
+    if len(results) > args.concurrency + args.queue_size and not shed:
+        failures.append("overflow was not shed")
+    if shed and max(shed) > args.queue_timeout + args.llm_latency + 1.0:
+        failures.append(f"a shed reply took {max(shed):.2f}s")
+    member_rate = by_group["member"]["openai"] / max(sum(by_group["member"].values()), 1)
+    guest_rate = by_group["guest"]["openai"] / max(sum(by_group["guest"].values()), 1)
+    if member_rate < guest_rate:
+        failures.append(f"guests were admitted more often ({guest_rate:.0%}) than members ({member_rate:.0%})")
+    if "rate_limited" not in sequential:
+        failures.append("a user over the rate limit was not limited")
+    if read_p95 > args.max_read_p95_ms:
+        failures.append(f"feed p95 {read_p95:.1f} ms during the burst (limit {args.max_read_p95_ms} ms)")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if not failures:
+        print("all admission checks passed")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=30)
+    parser.add_argument("--guests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=8)
+    parser.add_argument("--queue-timeout", type=float, default=2.0)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--max-read-p95-ms", type=float, default=250.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
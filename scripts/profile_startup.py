@@ -0,0 +1,98 @@
+"""Profile the backend's cold start: import times by package and the startup phases, against a budget.
+
+    python scripts/profile_startup.py --budget-ms 2000
+    python scripts/profile_startup.py --fresh --top 15
+
+Each run is a new interpreter that imports backend.app and runs the app's lifespan startup, the
+same work uvicorn does before it serves the first request. The best wall time of --repeat plain
+runs is checked against --budget-ms (exits 1 if over). One more run under `python -X importtime`
+gives the self time of every imported package, and the phase breakdown the app prints with
+MEMETRICS_PROFILE_STARTUP=1. --fresh starts from an empty temporary database instead of the
+configured one, so the seed is included.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+BOOT = """
+import asyncio
+import backend.app as module
+
+async def boot():
+    async with module.lifespan(module.app):
+        pass
+
+asyncio.run(boot())
+"""
+
+
+def boot(env: Dict[str, str], importtime: bool) -> Tuple[float, str]:
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", BOOT]
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True)
+    seconds = time.perf_counter() - started
+    if result.returncode != 0:
+        sys.exit(f"startup failed:\n{result.stderr[-2000:]}")
+    return seconds * 1000, result.stderr
+
+
+def import_times(stderr: str) -> Tuple[Counter, List[str]]:
+    # Self time per top-level package (ms), plus the non-importtime lines (the phase report).
+    by_package: Counter = Counter()
+    other = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            other.append(line)
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        by_package[fields[2].strip().split(".")[0]] += int(fields[0]) / 1000
+    return by_package, other
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12, help="packages to list by import time")
+    parser.add_argument("--fresh", action="store_true", help="start from an empty temporary database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="memetrics-startup-") as data_dir:
+        env = {**os.environ, "PYTHONPATH": str(ROOT), "MEMETRICS_PROFILE_STARTUP": "1"}
+        env["MEMETRICS_STARTUP_BUDGET_MS"] = str(args.budget_ms)
+        walls = []
+        for run in range(max(args.repeat, 1) + 1):
+            if args.fresh:
+                env["MEMETRICS_DB_PATH"] = str(Path(data_dir) / f"run-{run}" / "memetrics.db")
+            if run < max(args.repeat, 1):
+                walls.append(boot(env, importtime=False)[0])
+            else:
+                _, stderr = boot(env, importtime=True)
+
+    by_package, phases = import_times(stderr)
+    total = sum(by_package.values())
+    print(f"imports under -X importtime: {total:.0f} ms in {len(by_package)} top-level packages")
+    for package, ms in by_package.most_common(args.top):
+        print(f"  {package:34} {ms:8.1f} ms  {ms / total:5.1%}")
+    print(f"  openai imported at startup: {'yes' if 'openai' in by_package else 'no'}")
+    print("\n".join(phases))
+    best = min(walls)
+    verdict = "within" if best <= args.budget_ms else "OVER"
+    print(f"cold start (interpreter to app ready), best of {len(walls)}: {best:.0f} ms, {verdict} the {args.budget_ms:.0f} ms budget")
+    sys.exit(0 if best <= args.budget_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""OpenAI-compatible stub for local runs, load tests and breaker checks.
+
+    python scripts/stub_llm_server.py --port 8765 --latency 0.2 --fail-rate 0.1
+    set OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    set OPENAI_API_KEY=stub
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class StubConfig:
+    latency = 0.05
+    token_delay = 0.01
+    fail_rate = 0.0
+    chunk_chars = 6
+    calls = 0
+    lock = threading.Lock()
+
+
+def _reply_for(body: Dict[str, Any]) -> str:
+    user_text = body.get("messages", [{}])[-1].get("content", "")
+    return json.dumps({
+        "reply": f"Stub Mitra here. You said: {user_text[-80:]}",
+        "suggestions": ["Log a milestone", "Share a sponsor update", "Review your banking streak"],
+    })
+
+
+def _usage(body: Dict[str, Any], content: str) -> Dict[str, int]:
+    prompt = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+    completion = len(content) // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data: Optional[bytes]) -> None:
+        if data is None:
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with StubConfig.lock:
+            StubConfig.calls += 1
+        time.sleep(StubConfig.latency)
+        if not self.path.endswith("/chat/completions"):
+            self._json(404, {"error": {"message": "not found"}})
+            return
+        if random.random() < StubConfig.fail_rate:
+            self._json(503, {"error": {"message": "stub upstream failure", "type": "server_error"}})
+            return
+
+        content = _reply_for(body)
+        model = body.get("model", "stub")
+        if not body.get("stream"):
+            self._json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": _usage(body, content),
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        step = StubConfig.chunk_chars
+        for i in range(0, len(content), step):
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[i:i + step]}, "finish_reason": None}],
+            }
+            self._chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            time.sleep(StubConfig.token_delay)
+        if (body.get("stream_options") or {}).get("include_usage"):
+            tail = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model, "choices": [], "usage": _usage(body, content)}
+            self._chunk(f"data: {json.dumps(tail)}\n\n".encode("utf-8"))
+        self._chunk(b"data: [DONE]\n\n")
+        self._chunk(None)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=StubConfig.latency, help="seconds before the first byte")
+    parser.add_argument("--token-delay", type=float, default=StubConfig.token_delay, help="seconds between stream chunks")
+    parser.add_argument("--fail-rate", type=float, default=StubConfig.fail_rate, help="fraction of calls answered with 503")
+    args = parser.parse_args()
+    StubConfig.latency = args.latency
+    StubConfig.token_delay = args.token_delay
+    StubConfig.fail_rate = args.fail_rate
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    print(f"Stub LLM listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Settings are read when backend.config is imported: use a throwaway database and no LLM key
+# (an empty value also keeps backend/.env from supplying one).
+_DATA_DIR = tempfile.mkdtemp(prefix="memetrics-tests-")
+os.environ.update({"OPENAI_API_KEY": "", "MEMETRICS_DB_PATH": os.path.join(_DATA_DIR, "memetrics.db")})
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from backend.app import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(_DATA_DIR, ignore_errors=True)
@@ -0,0 +1,18 @@
+from backend.state import DEFAULT_USER_ID, get_user
+
+
+def test_posts_are_made_as_the_header_user_not_the_body(client):
+    author = client.post("/api/auth/login", json={"name": "Poster One"}).json()["user"]
+    response = client.post(
+        "/api/feed", json={"user_id": "someone-else", "text": "Shipped my first app"}, headers={"X-User-Id": author["user_id"]}
+    )
+    post = response.json()["post"]
+    assert (post["user_id"], post["display_name"]) == (author["user_id"], "Poster One")
+
+
+def test_logging_in_as_mitra_leaves_the_demo_profile_alone(client):
+    demo_name = get_user(DEFAULT_USER_ID)["name"]
+    user = client.post("/api/auth/login", json={"name": "Mitra"}).json()["user"]
+    assert user["user_id"] != DEFAULT_USER_ID
+    assert user["name"] == "Mitra"
+    assert get_user(DEFAULT_USER_ID)["name"] == demo_name
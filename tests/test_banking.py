@@ -0,0 +1,19 @@
+from backend.banking import RECENT_TRANSACTIONS, BankingLedger
+
+
+def _rows(year, count, prefix):
+    return [
+        {"id": f"{prefix}{i}", "counterparty": "Shop", "amount": -1.0, "timestamp": f"{year}-01-01T00:00:{i:02d}"}
+        for i in range(count)
+    ]
+
+
+def test_older_batch_does_not_displace_newer_recent_rows():
+    ledger = BankingLedger()
+    ledger.append(_rows(2018, 30, "new"))
+    ledger.append(_rows(2010, 40, "old"))
+    recent = list(ledger.recent)
+    assert len(recent) == RECENT_TRANSACTIONS
+    assert [row["id"] for row in recent[-30:]] == [f"new{i}" for i in range(30)]
+    assert recent[0]["id"] == "old20"
+    assert recent == sorted(recent, key=lambda row: row["timestamp"])
@@ -0,0 +1,51 @@
+import threading
+
+from backend.feed_search import FeedSearchIndex
+
+
+def _post(post_id, text, user_id="member-1"):
+    return {"id": post_id, "user_id": user_id, "display_name": "", "dvi": 100, "text": text,
+            "created_at": "2026-10-01T12:00:00+00:00"}
+
+
+def test_ties_keep_newest_first_across_the_limit():
+    index = FeedSearchIndex(_post(1000 + i, "data") for i in range(63))
+    hits = index.search("data", limit=5)
+    assert [post_id for post_id, _ in hits] == [1062, 1061, 1060, 1059, 1058]
+    assert len({score for _, score in hits}) == 1
+
+
+def test_higher_scores_are_kept_ahead_of_newer_ties():
+    posts = [_post(1000 + i, "data") for i in range(40)]
+    posts[3] = _post(1003, "data data")
+    index = FeedSearchIndex(posts)
+    assert [post_id for post_id, _ in index.search("data", limit=3)] == [1003, 1039, 1038]
+
+
+def test_forgetting_posts_keeps_common_terms_positive():
+    index = FeedSearchIndex([_post(1, "data")] + [_post(1 + i, "data science") for i in range(1, 10)])
+    index.forget([1])
+    index.add(_post(20, "data data"))
+    hits = index.search("data", limit=20)
+    assert all(score > 0 for _, score in hits)
+    assert hits[0][0] == 20
+
+
+def test_concurrent_snapshots_each_write_a_whole_file(tmp_path):
+    path = tmp_path / "feed-index.bin"
+    indexes = [FeedSearchIndex(_post(1000 + i, "data " * (n + 1)) for i in range(50 * (n + 1))) for n in range(4)]
+    threads = [threading.Thread(target=index.save, args=(path, str(n))) for n, index in enumerate(indexes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    index, tag = FeedSearchIndex.load(path)
+    assert index.last_id == indexes[int(tag)].last_id
+    assert [p.name for p in tmp_path.iterdir()] == ["feed-index.bin"]
+
+
+def test_posts_matching_only_a_common_term_are_still_found():
+    posts = [_post(1000 + i, "data science") for i in range(8)] + [_post(1008, "data"), _post(1009, "rust")]
+    hits = FeedSearchIndex(posts).search("data rust", limit=20)
+    assert {post_id for post_id, _ in hits} == {1000 + i for i in range(10)}
+    assert hits[0][0] == 1009
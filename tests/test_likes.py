@@ -0,0 +1,44 @@
+import os
+import time
+
+import pytest
+
+from backend.likes import ORPHAN_SECONDS, LikeBook
+from backend.storage import SQLiteStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "likes.db"))
+    store.insert_post({"user_id": "ana", "display_name": "Ana", "dvi": 0, "text": "hi", "created_at": "2026-10-01T00:00:00", "like_count": 0})
+    return store
+
+
+def test_counts_pick_up_other_workers_flushes(store):
+    post_id = store.list_posts(None, 1)[0]["id"]
+    first, second = LikeBook(store, base_seconds=0.05), LikeBook(store, base_seconds=0.05)
+    assert second.toggle(set(), "bo", post_id, True) == 1
+    second.flush()
+    assert first.toggle(set(), "ana", post_id, True) == 2
+    first.flush()
+    time.sleep(0.06)
+    assert second.toggle({post_id}, "bo", post_id, False) == 1
+
+
+def test_segments_kept_after_a_failed_flush_are_not_orphans(store, tmp_path, monkeypatch):
+    post_id = store.list_posts(None, 1)[0]["id"]
+    owner, other = LikeBook(store, str(tmp_path / "log")), LikeBook(store, str(tmp_path / "log"))
+    owner.toggle(set(), "ana", post_id, True)
+
+    def broken(ops):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(store, "apply_likes", broken)
+    with pytest.raises(RuntimeError):
+        owner.flush()
+    (segment,) = (tmp_path / "log").glob("*.log")
+    stale = time.time() - 2 * ORPHAN_SECONDS
+    os.utime(segment, (stale, stale))
+    with pytest.raises(RuntimeError):
+        owner.flush()
+    assert other._log.orphans() == []
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+import backend.app as app_module
+from backend.services.mitra_llm import ReplyExtractor, UnparseableReply
+
+
+@pytest.mark.parametrize("raw", ['{"reply": "Keep go', '{"suggestions": ["x"]}', "[]", '"x"', ""])
+def test_bad_streamed_bodies_are_unparseable(raw):
+    extractor = ReplyExtractor()
+    extractor.feed(raw)
+    with pytest.raises(UnparseableReply):
+        extractor.result()
+
+
+def test_streamed_reply_and_suggestions():
+    extractor = ReplyExtractor()
+    text = extractor.feed('{"reply": "Log a mile') + extractor.feed('stone.", "suggestions": ["a", "b"]}')
+    assert text == "Log a milestone."
+    assert extractor.result() == ("Log a milestone.", ["a", "b"])
+
+
+def test_stream_falls_back_on_a_reply_without_text(client, monkeypatch):
+    async def no_reply(message, user_id, region, dvi, extractor, band=None, history=None):
+        extractor.feed('{"suggestions": ["x"]}')
+        return
+        yield
+
+    monkeypatch.setattr(app_module.settings, "openai_api_key", "stub")
+    monkeypatch.setattr(app_module, "stream_mitra_reply", no_reply)
+    response = client.post("/api/mitra/chat/stream", json={"message": "How do I level up?"})
+    events = [json.loads(line[6:]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-2]["source"] == "fallback"
+    assert "detail" not in events[-2]
+    assert events[0]["text"]
+    demo = app_module.get_user()
+    key = app_module._mitra_cache_key("How do I level up?", app_module._tier_name(demo["dvi"]), demo["region"])
+    assert app_module.reply_cache.get(key) is None
@@ -0,0 +1,14 @@
+import asyncio
+
+from backend import nudges
+
+
+def test_a_fresh_checkpoint_does_not_send_the_week_twice(client, tmp_path, monkeypatch):
+    async def reply(profile, activity):
+        return "Log one milestone this week."
+
+    monkeypatch.setattr(nudges, "_nudge_reply", reply)
+    first = asyncio.run(nudges.run("2030-W01", tmp_path / "first.json", concurrency=4))
+    second = asyncio.run(nudges.run("2030-W01", tmp_path / "second.json", concurrency=4))
+    assert first["written"] > 0
+    assert (second["written"], second["skipped"]) == (0, first["written"])
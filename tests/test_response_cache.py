@@ -0,0 +1,43 @@
+import gzip
+import threading
+
+from starlette.requests import Request
+
+from backend.response_cache import ResponseCache
+from backend.static_assets import asset_response, build_asset
+
+
+def _request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_each_encoding_gets_its_own_etag():
+    cache = ResponseCache(lambda section: 1)
+    build = lambda: {"items": ["x" * 40] * 50}
+    identity = cache.respond(_request(), "feed", build)
+    gzipped = cache.respond(_request(accept_encoding="gzip"), "feed", build)
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == identity.headers["etag"][:-1] + '-gzip"'
+    assert cache.respond(_request(accept_encoding="gzip", if_none_match=gzipped.headers["etag"]), "feed", build).status_code == 304
+    assert cache.respond(_request(if_none_match=gzipped.headers["etag"]), "feed", build).status_code == 200
+
+
+def test_asset_304_only_for_the_encoding_it_was_served_in():
+    asset = build_asset(b"body { color: red; }\n" * 200, "text/css; charset=utf-8")
+    gzipped = asset_response(_request(accept_encoding="gzip"), asset)
+    assert gzipped.headers["etag"] != asset.etag
+    assert asset_response(_request(accept_encoding="gzip", if_none_match=gzipped.headers["etag"]), asset).status_code == 304
+    assert asset_response(_request(if_none_match=gzipped.headers["etag"]), asset).status_code == 200
+
+
+def test_compressed_variants_are_cached_whole(tmp_path):
+    body = b"body { color: red; }\n" * 200
+    threads = [threading.Thread(target=build_asset, args=(body, "text/css; charset=utf-8", tmp_path)) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"]
+    cached = build_asset(body, "text/css; charset=utf-8", tmp_path)
+    assert gzip.decompress(cached.gzipped) == body
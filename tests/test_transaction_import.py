@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from backend.transaction_import import normalize_row
+
+
+def _row(timestamp, ident="t1"):
+    return {"id": ident, "counterparty": "Shop", "amount": -12.5, "timestamp": timestamp}
+
+
+@pytest.mark.parametrize("timestamp", ["2024-W01-1T10:00:00", "2024-W011", "20240101T10:00:00", "2024-13-01"])
+def test_timestamps_need_a_calendar_date(timestamp):
+    with pytest.raises(ValueError):
+        normalize_row(_row(timestamp))
+
+
+def test_iso_week_import_is_rejected_and_nothing_is_stored(client):
+    user_id = client.post("/api/auth/login", json={"name": "Week Importer"}).json()["user"]["user_id"]
+    headers = {"X-User-Id": user_id, "Content-Type": "application/x-ndjson"}
+    response = client.post("/api/banking/import", content=json.dumps(_row("2024-W01-1T10:00:00")), headers=headers)
+    assert response.status_code == 422
+    assert response.json()["detail"]["rejected"] == 1
+    assert client.get("/api/banking", headers=headers).json()["transaction_count"] == 0
+
+    body = "\n".join(json.dumps(row) for row in (_row("2024-W01-1", "t2"), _row("2024-01-01T09:30:00", "t3")))
+    response = client.post("/api/banking/import", content=body, headers=headers)
+    assert response.status_code == 200
+    assert (response.json()["inserted"], response.json()["rejected"]) == (1, 1)
+    assert client.get("/api/banking", headers=headers).json()["transaction_count"] == 1
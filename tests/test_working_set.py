@@ -0,0 +1,40 @@
+import threading
+
+from backend.working_set import UserPartition, UserWorkingSet
+
+
+def _slow_loader(calls, release):
+    def load(user_id):
+        calls.append(user_id)
+        release.wait(5)
+        return UserPartition(profile={"user_id": user_id, "loaded": len(calls)})
+    return load
+
+
+def test_concurrent_misses_share_one_load():
+    calls, release = [], threading.Event()
+    users = UserWorkingSet(_slow_loader(calls, release))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(users.get("ana"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == ["ana"]
+    assert len({id(partition) for partition in results}) == 1
+    assert users.peek("ana") is results[0]
+
+
+def test_load_invalidated_in_flight_is_not_cached():
+    calls, release = [], threading.Event()
+    users = UserWorkingSet(_slow_loader(calls, release))
+    loader = threading.Thread(target=users.get, args=("ana",))
+    loader.start()
+    while not calls:
+        pass
+    users.invalidate("ana")
+    release.set()
+    loader.join()
+    assert users.peek("ana") is None
+    assert users.get("ana").profile["loaded"] == 2